@@ -0,0 +1,143 @@
+"""Micro-benchmarks of the ImageProcessor hot paths.
+
+Usage:
+    python -m benchmarks.bench_image_processor
+    python -m benchmarks.bench_image_processor --save-baseline
+    python -m benchmarks.bench_image_processor --compare
+    python -m benchmarks.bench_image_processor --replay landmarks.bin
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from src.headless import HeadlessApp
+from src.image_processor import ImageProcessor
+from src.landmark_recorder import LandmarkReplay
+
+from .common import (
+    RESOLUTIONS,
+    add_result_arguments, environment, measure, parse_resolutions, report_results,
+    SerializedLandmarkList, protobuf_like_landmarks, synthetic_face_landmarks, synthetic_frame,
+)
+
+SUITE = 'image_processor'
+
+BASE_COLOR_BGR = (81, 41, 12)
+
+
+def make_processor(show_camera):
+    """ImageProcessor bound to a GUI-less app state"""
+    app = HeadlessApp()
+    app.app_state.show_camera.set(show_camera)
+    return ImageProcessor(app, {})
+
+
+def benchmark_resolution(width, height, repeats):
+    """Benchmark every hot path at one frame size"""
+    results = {}
+    suffix = f"[{width}x{height}]"
+
+    processor = make_processor(show_camera=False)
+    camera_processor = make_processor(show_camera=True)
+
+    landmarks = synthetic_face_landmarks()
+    protobuf_landmarks = protobuf_like_landmarks(landmarks)
+    serialized_landmarks = SerializedLandmarkList(landmarks)
+    frame = synthetic_frame(width, height)
+    mesh_points = processor._process_landmarks(landmarks, width, height)[0]  # pylint: disable=protected-access
+    center_left, center_right, l_radius, r_radius, eye_distance = (
+        processor._process_eyes(mesh_points))  # pylint: disable=protected-access
+
+    # pylint: disable=protected-access
+    cases = {
+        'create_gradient_background': (
+            lambda: ImageProcessor.create_gradient_background(height, width, BASE_COLOR_BGR, 40), None),
+        '_create_tech_grid': (
+            lambda: ImageProcessor._create_tech_grid(height, width, BASE_COLOR_BGR), None),
+        '_process_landmarks(array)': (
+            lambda: processor._process_landmarks(landmarks, width, height), None),
+        '_process_landmarks(protobuf)': (
+            lambda: processor._process_landmarks(protobuf_landmarks, width, height), None),
+        '_process_landmarks(serialized)': (
+            lambda: processor._process_landmarks(serialized_landmarks, width, height), None),
+        '_process_eyes': (
+            lambda: processor._process_eyes(mesh_points), None),
+        '_center_mesh_points': (
+            processor._center_mesh_points,
+            lambda: (mesh_points.copy(), center_left.copy(), center_right.copy(), width, height)),
+        '_draw_mesh(centered)': (
+            processor._draw_mesh,
+            lambda: (np.zeros((height, width, 3), np.uint8), mesh_points,
+                     center_left, center_right, l_radius, r_radius, False)),
+        '_draw_mesh(camera)': (
+            camera_processor._draw_mesh,
+            lambda: (frame.copy(), mesh_points, center_left, center_right, l_radius, r_radius, True)),
+        '_draw_text': (
+            processor._draw_text,
+            lambda: (frame.copy(), eye_distance)),
+        'enhance_image': (
+            lambda: ImageProcessor.enhance_image(frame), None),
+        'adjust_gamma': (
+            lambda: ImageProcessor.adjust_gamma(frame, 1.2), None),
+    }
+    # pylint: enable=protected-access
+
+    for name, (func, setup) in cases.items():
+        results[name + suffix] = measure(func, setup, repeats=repeats)
+    return results
+
+
+def benchmark_replay(path, repeats):
+    """Benchmark process_face_mesh on recorded landmarks, without running FaceMesh"""
+    replay = LandmarkReplay(path, realtime=False, loop=True)
+    if not replay.recording:
+        raise ValueError(f"Landmark recording is empty: {path}")
+    width, height = replay.recording.frame(0)[1]
+    frames = replay.frames()
+
+    results = {}
+    for name, show_camera in (('centered', False), ('camera', True)):
+        processor = make_processor(show_camera)
+
+        def render(frame, mesh_results, processor=processor):
+            processor.release_frame(processor.process_face_mesh(frame, mesh_results)['frame'])
+        results[f"process_face_mesh(replay, {name})[{width}x{height}]"] = measure(
+            render, lambda: next(frames), repeats=repeats)
+    return results
+
+
+def run(resolutions, repeats, replay=None):
+    """Run the suite and return results in baseline format"""
+    benchmarks = {}
+    for width, height in resolutions:
+        benchmarks.update(benchmark_resolution(width, height, repeats))
+    if replay:
+        benchmarks.update(benchmark_replay(replay, repeats))
+    return {
+        'suite': SUITE,
+        'repeats': repeats,
+        'environment': environment(),
+        'benchmarks': benchmarks,
+    }
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if the comparison found regressions"""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench_image_processor',
+        description="Micro-benchmarks of ImageProcessor hot paths",
+    )
+    parser.add_argument('--resolutions', type=parse_resolutions, default=RESOLUTIONS,
+                        help="comma separated frame sizes, e.g. 640x360,1280x720")
+    parser.add_argument('--repeats', type=int, default=50, help="timed calls per benchmark")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="also time process_face_mesh on a landmark recording (see --record)")
+    add_result_arguments(parser, SUITE)
+    args = parser.parse_args(argv)
+
+    return report_results(args, run(args.resolutions, args.repeats, args.replay))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
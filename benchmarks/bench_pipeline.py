@@ -0,0 +1,227 @@
+"""End-to-end benchmark of the MainModel pipeline with a per-stage latency breakdown.
+
+Usage:
+    python -m benchmarks.bench_pipeline --source video:recording.mp4 --frames 300
+    python -m benchmarks.bench_pipeline --backend synthetic --output pipeline.json
+    python -m benchmarks.bench_pipeline --replay landmarks.bin --compare
+"""
+import argparse
+import sys
+import time
+
+import cv2 as cv
+
+from src.frame_sources import open_capture
+from src.headless import HeadlessApp
+from src.inference_backend import FaceMeshResult, ThreadInferenceBackend, create_inference_backend
+from src.landmark_recorder import LandmarkReplay
+from src.main_model import MainModel
+from src.video_display import DISPLAY_BACKEND_CTKIMAGE, DISPLAY_BACKEND_PHOTOIMAGE, PhotoFrameBuffer
+
+from .common import (
+    add_result_arguments, environment, parse_resolutions, report_results, summarize, synthetic_face_landmarks,
+)
+
+SUITE = 'pipeline'
+
+BACKEND_FACEMESH = 'facemesh'
+BACKEND_SYNTHETIC = 'synthetic'
+
+# Stages in pipeline order: per-frame timings reported by MainModel plus the
+# ones measured here on the consumer side
+STAGES = (
+    'capture_read_ms',
+    'convert_ms',
+    'inference_ms',
+    'render_queue_wait_ms',
+    'render_ms',
+    'result_queue_wait_ms',
+    'display_convert_ms',
+    'frame_age_ms',
+)
+
+
+class SyntheticFaceMesh:
+    """FaceMesh stand-in returning the same synthetic face for every frame"""
+    def __init__(self):
+        self.landmarks = synthetic_face_landmarks()
+
+    def process(self, frame_rgb):  # pylint: disable=unused-argument
+        """Return a copy, the pipeline remaps landmarks in place"""
+        return FaceMeshResult([self.landmarks.copy()])
+
+    def close(self):
+        """Nothing to release"""
+
+
+class ReplayFaceMesh:
+    """FaceMesh stand-in returning recorded landmarks in order, looping"""
+    def __init__(self, path):
+        replay = LandmarkReplay(path, realtime=False, loop=True)
+        if not replay.recording:
+            raise ValueError(f"Landmark recording is empty: {path}")
+        self._frames = iter(replay)
+
+    def process(self, frame_rgb):  # pylint: disable=unused-argument
+        """Return the next recorded frame"""
+        return next(self._frames)[2]
+
+    def close(self):
+        """Nothing to release"""
+
+
+def display_convert(frame, image_module, size):
+    """Display conversion of the 'ctkimage' backend without Tk: BGR to RGB, new PIL image and
+    the resize CTkImage always applies when creating its photo image"""
+    return image_module.fromarray(cv.cvtColor(frame, cv.COLOR_BGR2RGB)).resize(size)
+
+
+def display_convert_buffered(frame, frame_buffer, size):
+    """Display conversion of the 'photoimage' backend without Tk: BGR into the reused buffer
+    PhotoImage.paste copies from as is"""
+    return frame_buffer.convert(frame, size)
+
+
+def create_backend(args):
+    """Inference backend selected on the command line"""
+    if args.replay:
+        return ThreadInferenceBackend(ReplayFaceMesh(args.replay))
+    if args.backend == BACKEND_SYNTHETIC:
+        return ThreadInferenceBackend(SyntheticFaceMesh())
+    return create_inference_backend()
+
+
+def run(args):
+    """Drive the pipeline for the requested number of frames and collect stage latencies"""
+    try:
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        Image = None  # pylint: disable=invalid-name
+        print("Pillow is not installed, skipping the display conversion stage", file=sys.stderr)
+    frame_buffer = PhotoFrameBuffer({'cv2': cv, 'PIL': Image}) if Image is not None else None
+
+    cap = open_capture(args.source, realtime=not args.fast)
+    backend = create_backend(args)
+
+    app = HeadlessApp()
+    app.app_state.show_camera.set(args.show_camera)
+    model = MainModel(app, {'cv2': cv}, cap, backend, render=not args.no_render)
+    model.target_fps = args.target_fps
+    model.pacer.set_target_fps(args.target_fps)
+    # Frames are rendered at the display size like in the app
+    model.set_display_size(*args.display_size)
+    if args.replay or args.backend == BACKEND_SYNTHETIC:
+        # Stand-in results ignore the crop, region tracking would chase its own remapping
+        model.roi_tracker.enabled = False
+
+    samples = {stage: [] for stage in STAGES}
+    frames = 0
+    timeouts = 0
+    start_time = None
+
+    model.start()
+    try:
+        while frames < args.warmup + args.frames:
+            results = model.get_next_result(timeout=1.0)
+            if results is None:
+                timeouts += 1
+                if timeouts > 10:
+                    raise RuntimeError("Pipeline stopped producing results")
+                continue
+
+            received = time.perf_counter()
+            timings = dict(results['timings'])
+            timings['result_queue_wait_ms'] = (received - results['render_done']) * 1000
+
+            if results['frame'] is not None and Image is not None:
+                if args.display_backend == DISPLAY_BACKEND_PHOTOIMAGE:
+                    display_convert_buffered(results['frame'], frame_buffer, args.display_size)
+                else:
+                    display_convert(results['frame'], Image, args.display_size)
+                timings['display_convert_ms'] = (time.perf_counter() - received) * 1000
+            model.release_result(results)
+
+            # Capture to displayed
+            timings['frame_age_ms'] = model.frame_grabber.frame_age(results['frame_timestamp']) * 1000
+
+            frames += 1
+            if frames == args.warmup:
+                start_time = time.perf_counter()
+            if frames > args.warmup:
+                for stage in STAGES:
+                    if stage in timings:
+                        samples[stage].append(timings[stage])
+        duration = time.perf_counter() - (start_time or time.perf_counter())
+        pipeline_stats = model.get_pipeline_stats()
+    finally:
+        model.stop()
+        cap.release()
+
+    return {
+        'suite': SUITE,
+        'config': {
+            'source': args.source,
+            'backend': f"replay:{args.replay}" if args.replay else args.backend,
+            'frames': args.frames,
+            'realtime': not args.fast,
+            'target_fps': args.target_fps,
+            'render': not args.no_render,
+            'show_camera': args.show_camera,
+            'display_size': list(args.display_size),
+            'display_backend': args.display_backend,
+        },
+        'environment': environment(),
+        'duration_s': duration,
+        'throughput_fps': args.frames / duration if duration > 0 else 0.0,
+        'benchmarks': {stage[:-3]: summarize(values) for stage, values in samples.items() if values},
+        'capture': pipeline_stats['capture'],
+        'queues': {
+            'render_queue': pipeline_stats['render_queue'],
+            'result_queue': pipeline_stats['result_queue'],
+        },
+    }
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if the comparison found regressions"""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench_pipeline',
+        description="End-to-end MainModel pipeline benchmark with per-stage latencies",
+    )
+    parser.add_argument('--source', default='synthetic:1280x720',
+                        help="frame source spec (default: %(default)s)")
+    parser.add_argument('--fast', action='store_true',
+                        help="read the source as fast as possible instead of at its frame rate; "
+                             "capture_read then measures decoding only, but the capture thread "
+                             "competes with the other stages for the GIL")
+    parser.add_argument('--backend', choices=(BACKEND_FACEMESH, BACKEND_SYNTHETIC), default=BACKEND_FACEMESH,
+                        help="FaceMesh as configured in the settings, or fixed synthetic landmarks")
+    parser.add_argument('--replay', metavar='PATH', help="answer inference with a landmark recording")
+    parser.add_argument('--frames', type=int, default=300, help="measured frames (default: %(default)s)")
+    parser.add_argument('--warmup', type=int, default=10, help="frames skipped before measuring")
+    parser.add_argument('--target-fps', type=float, default=1000.0,
+                        help="pipeline pacing (default: %(default)s, effectively unpaced)")
+    parser.add_argument('--no-render', action='store_true', help="compute metrics only, skip drawing")
+    parser.add_argument('--show-camera', action='store_true', help="draw on the camera image")
+    parser.add_argument('--display-size', type=lambda text: parse_resolutions(text)[0], default=(640, 480),
+                        help="display conversion target size (default: 640x480)")
+    parser.add_argument('--display-backend', choices=(DISPLAY_BACKEND_PHOTOIMAGE, DISPLAY_BACKEND_CTKIMAGE),
+                        default=DISPLAY_BACKEND_PHOTOIMAGE, help="display path measured by display_convert")
+    add_result_arguments(parser, SUITE)
+    args = parser.parse_args(argv)
+
+    try:
+        results = run(args)
+    except (ImportError, ValueError, RuntimeError, OSError) as e:
+        print(f"Error running pipeline benchmark: {e}", file=sys.stderr)
+        return 2
+
+    return report_results(
+        args, results,
+        summary=f"Throughput: {results['throughput_fps']:.1f} fps over {args.frames} frames "
+                f"({results['capture']['frames_dropped']} capture drops)",
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
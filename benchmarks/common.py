@@ -0,0 +1,302 @@
+"""Shared helpers for the benchmark suite: timing, allocations, baselines and synthetic input"""
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import types
+
+import numpy as np
+
+# Relative slowdown (or allocation growth) reported as a regression
+DEFAULT_TOLERANCE = 0.15
+
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080)]
+
+# Baselines are machine specific and not committed: each environment keeps its own file here
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+
+def parse_resolutions(text):
+    """Parse '640x360,1280x720' into [(640, 360), (1280, 720)]"""
+    return [tuple(int(value) for value in item.lower().split('x')) for item in text.split(',') if item]
+
+
+def percentile(samples, q):
+    """Percentile of a list of samples"""
+    return float(np.percentile(np.asarray(samples, dtype=np.float64), q))
+
+
+def summarize(samples_ms):
+    """Latency summary of samples in milliseconds"""
+    return {
+        'samples': len(samples_ms),
+        'median_ms': percentile(samples_ms, 50),
+        'p95_ms': percentile(samples_ms, 95),
+        'p99_ms': percentile(samples_ms, 99),
+        'mean_ms': float(np.mean(samples_ms)),
+    }
+
+
+def measure(func, setup=None, repeats=50, warmup=5, alloc_repeats=5):
+    """Time func and measure its peak allocations.
+
+    setup, if given, is called before every call (untimed) and returns the
+    positional arguments for func.
+
+    Returns:
+        dict: median/p95/p99/mean time in ms and peak bytes allocated per call
+    """
+    for _ in range(warmup):
+        func(*(setup() if setup else ()))
+
+    samples = []
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # Allocations are measured separately, tracing slows calls down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_repeats):
+            args = setup() if setup else ()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(samples)
+    result['alloc_peak_bytes'] = int(np.median(peaks))
+    return result
+
+
+def environment():
+    """Description of the machine the results were taken on"""
+    import cv2 as cv  # pylint: disable=import-outside-toplevel
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+    }
+
+
+def environment_tag():
+    """File name part identifying this machine and Python version"""
+    env = environment()
+    python = '.'.join(env['python'].split('.')[:2])
+    tag = '-'.join((env['system'], env['machine'], platform.node(), f'py{python}'))
+    return re.sub(r'[^a-z0-9_.-]+', '_', tag.lower())
+
+
+def baseline_path(suite):
+    """Default baseline file of a suite in the current environment"""
+    return os.path.join(BASELINE_DIR, f'{suite}-{environment_tag()}.json')
+
+
+def add_result_arguments(parser, suite):
+    """Add the --output, --save-baseline, --compare and --tolerance options handled by report_results"""
+    default = baseline_path(suite)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--save-baseline', nargs='?', const=default, metavar='PATH',
+                        help=f"store results as this machine's baseline (default: {default})")
+    parser.add_argument('--compare', nargs='?', const=default, metavar='PATH',
+                        help="compare against a baseline saved with --save-baseline and fail on regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown reported as regression (default: %(default)s)")
+
+
+def report_results(args, results, summary=None):
+    """Print results, then save and compare them as the add_result_arguments options request.
+
+    summary, if given, is printed below the table.
+
+    Returns:
+        int: Exit code, 1 on regressions and 2 if the baseline to compare with is missing
+    """
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        baseline = load_results(args.compare)
+    print_table(results, baseline)
+    if summary:
+        print(f"\n{summary}")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if not args.compare:
+        return 0
+    if baseline is None:
+        print(f"\nError: no baseline at {args.compare}, record one on this machine with --save-baseline",
+              file=sys.stderr)
+        return 2
+
+    changed = sorted(key for key, value in results['environment'].items()
+                     if baseline.get('environment', {}).get(key) != value)
+    if changed:
+        print(f"\nNote: the baseline was taken with a different {', '.join(changed)}")
+    regressions = compare(results, baseline, args.tolerance)
+    print_regressions(regressions, args.tolerance)
+    return 1 if regressions else 0
+
+
+def save_results(path, results):
+    """Write results as JSON"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path):
+    """Read results written by save_results"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, time_key='median_ms'):
+    """Compare benchmark results with a baseline.
+
+    Returns:
+        list: (name, metric, baseline value, current value, ratio) of every regression
+    """
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        reference = baseline['benchmarks'].get(name)
+        if reference is None:
+            continue
+        for metric in (time_key, 'alloc_peak_bytes'):
+            if metric not in current or metric not in reference:
+                continue
+            old, new = reference[metric], current[metric]
+            # Ignore noise on tiny values (sub-10us timings, sub-KB allocations)
+            floor = 0.01 if metric.endswith('_ms') else 1024
+            if new > max(old, floor) * (1 + tolerance):
+                regressions.append((name, metric, old, new, new / max(old, floor)))
+    return regressions
+
+
+def print_table(results, baseline=None, time_key='median_ms'):
+    """Print results, with the change against the baseline if given"""
+    show_allocations = any('alloc_peak_bytes' in result for result in results['benchmarks'].values())
+    header = f"{'benchmark':<44} {'median ms':>10} {'p95 ms':>10}"
+    if show_allocations:
+        header += f" {'alloc KB':>10}"
+    if baseline is not None:
+        header += f" {'vs base':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results['benchmarks'].items():
+        line = f"{name:<44} {result[time_key]:>10.3f} {result['p95_ms']:>10.3f}"
+        if show_allocations:
+            line += f" {result.get('alloc_peak_bytes', 0) / 1024:>10.1f}"
+        if baseline is not None:
+            reference = baseline['benchmarks'].get(name)
+            if reference:
+                line += f" {(result[time_key] / reference[time_key] - 1) * 100:>+8.1f}%"
+            else:
+                line += f" {'new':>9}"
+        print(line)
+
+
+def print_regressions(regressions, tolerance):
+    """Print regressions found by compare"""
+    if not regressions:
+        print(f"\nNo regressions (tolerance {tolerance:.0%})")
+        return
+    print(f"\nRegressions (tolerance {tolerance:.0%}):")
+    for name, metric, old, new, ratio in regressions:
+        print(f"  {name}: {metric} {old:.3f} -> {new:.3f} ({(ratio - 1) * 100:+.1f}%)")
+
+
+def synthetic_face_landmarks(seed=0, center=(0.5, 0.5), face_width=0.3):
+    """Plausible FaceMesh output: float32 (478, 3) normalized landmarks.
+
+    Points are scattered over an elliptic face area; cheek points 234/454 and
+    both irises (468-477) sit where the eye metrics expect them.
+    """
+    rng = np.random.default_rng(seed)
+    center_x, center_y = center
+    half_w, half_h = face_width * 0.5, face_width * 0.65
+
+    angles = rng.uniform(0, 2 * np.pi, 478)
+    radii = np.sqrt(rng.uniform(0, 1, 478))
+    landmarks = np.empty((478, 3), dtype=np.float32)
+    landmarks[:, 0] = center_x + np.cos(angles) * radii * half_w
+    landmarks[:, 1] = center_y + np.sin(angles) * radii * half_h
+    landmarks[:, 2] = rng.normal(0, 0.02, 478)
+
+    # Face width reference points
+    landmarks[234, :2] = (center_x - half_w, center_y)
+    landmarks[454, :2] = (center_x + half_w, center_y)
+
+    # Iris centers (468, 473) with four contour points each
+    iris_radius = face_width * 0.04
+    for first, eye_x in ((468, center_x - face_width * 0.2), (473, center_x + face_width * 0.2)):
+        eye_y = center_y - half_h * 0.2
+        landmarks[first, :2] = (eye_x, eye_y)
+        for offset, angle in enumerate(np.linspace(0, 2 * np.pi, 4, endpoint=False), start=1):
+            landmarks[first + offset, :2] = (
+                eye_x + np.cos(angle) * iris_radius,
+                eye_y + np.sin(angle) * iris_radius,
+            )
+    return landmarks
+
+
+def protobuf_like_landmarks(landmarks):
+    """Wrap a landmark array like a MediaPipe NormalizedLandmarkList (objects with x, y, z)"""
+    return types.SimpleNamespace(landmark=[
+        types.SimpleNamespace(x=float(x), y=float(y), z=float(z))
+        for x, y, z in landmarks
+    ])
+
+
+# Wire layout of one landmark: field 1 message of fixed32 fields x=1, y=2, z=3
+LANDMARK_WIRE_DTYPE = np.dtype([
+    ('tag', 'u1'), ('length', 'u1'),
+    ('x_tag', 'u1'), ('x', '<f4'), ('y_tag', 'u1'), ('y', '<f4'), ('z_tag', 'u1'), ('z', '<f4'),
+])
+
+
+class SerializedLandmarkList:
+    """MediaPipe NormalizedLandmarkList stand-in that also has its protobuf wire encoding.
+
+    Like a real message, SerializeToString encodes the points on every call
+    into a new bytes object, in one vectorized pass comparable to the C
+    encoder, so benchmarks pay for the serialization.
+    """
+    def __init__(self, landmarks):
+        self.landmark = protobuf_like_landmarks(landmarks).landmark
+        self._points = np.asarray(landmarks, dtype=np.float32)
+
+    def SerializeToString(self):  # pylint: disable=invalid-name
+        """Wire encoding of the landmark list"""
+        records = np.empty(len(self._points), dtype=LANDMARK_WIRE_DTYPE)
+        records['tag'] = 0x0a
+        records['length'] = LANDMARK_WIRE_DTYPE.itemsize - 2
+        for i, field in enumerate('xyz'):
+            records[f'{field}_tag'] = 0x0d + 8 * i
+            records[field] = self._points[:, i]
+        return records.tobytes()
+
+
+def synthetic_frame(width, height, seed=0):
+    """Noisy BGR camera-like frame"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(30, 200, width, dtype=np.float32)
+    frame = np.repeat(gradient[np.newaxis, :, np.newaxis], height, axis=0).repeat(3, axis=2)
+    frame += rng.normal(0, 8, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
@@ -1,6 +1,7 @@
 # Standard library imports
-import collections
+import argparse
 import tkinter as tk
+import time
 import traceback
 
 # Third-party imports
@@ -10,6 +11,7 @@ from CTkColorPicker import AskColor
 
 # Local imports
 from src.app_types import Size
+from src.chart_feed import LineChartFeed, chart_layout
 from src.component_loader import ComponentLoader
 from src.config import (
     APP_TITLE, APP_FONT, APP_FONT_KEY, APP_FONT_SIZE,
@@ -17,9 +19,10 @@ from src.config import (
     LOADING_WINDOW_WIDTH, LOADING_WINDOW_HEIGHT, LOADING_WINDOW_GEOMETRY,
     REFRESH_DELAY_MS,
     STRABISMUS_RANGE_MIN, STRABISMUS_RANGE_MAX,
-    CHART_BUFFER_SIZE,
+    CHART_BUFFER_SIZE, CHART_BUFFER_SIZE_KEY, CHART_MAX_POINTS, CHART_REFRESH_MS,
     MAIN_WINDOW_POSITION_KEY,
     THRESHOLD_KNOB_STEP, THRESHOLD_KNOB_STEP_PRECISE,
+    PROFILE_HOTKEY, PROFILE_HOTKEY_DURATION_S, PROFILE_HOTKEY_DURATION_S_KEY,
 )
 from src.main_model import MainModel
 from src.overlay import OverlayWindow
@@ -27,6 +30,7 @@ from src.widgets.imageknobex import ImageKnobEx
 from src.color_settings import ColorSettingsWindow
 from src.app_state import AppState
 from src.settings import Settings
+from src.video_display import create_video_display
 
 # Configure matplotlib to use Agg backend which doesn't require GUI
 import matplotlib
@@ -34,7 +38,7 @@ matplotlib.use('Agg')
 
 class App(ctk.CTk):
     """Main application window"""
-    def __init__(self):
+    def __init__(self, source=None, realtime=None, record_path=None, metrics_port=None, profile_duration=None):
         super().__init__()
         self.resizable(False, False)
 
@@ -53,19 +57,22 @@ class App(ctk.CTk):
         self.face_detected = False
         self.overlay = None
         self.chart = None
-        self.chart_data = None
-        self.chart_threshold_data = None
+        self.chart_feed = None
         self.chart_line = None
         self.chart_threshold_line = None
         self.threshold_knob = None
         self.app_geometry = None
         self.video_frame = None
         self.video_label = None
+        self.video_display = None
         self.threshold_inner_frame1 = None
         self.threshold_inner_frame2 = None
         self.threshold_entry = None
         self.eye_distance_entry = None
         self.model = None
+        self.record_path = record_path
+        self.metrics_port = metrics_port
+        self.profile_duration = profile_duration
 
         # Application state initialization
         self.app_state = AppState()
@@ -74,7 +81,7 @@ class App(ctk.CTk):
         ctk.set_appearance_mode("Light" if self.app_state.light_theme.get() else "Dark")
 
         # Create component loader
-        self.loader = ComponentLoader(self)
+        self.loader = ComponentLoader(self, source=source, realtime=realtime)
 
         # Start loading process
         self.loader.start_loading(self._on_components_loaded)
@@ -88,7 +95,9 @@ class App(ctk.CTk):
         self.app_state.threshold_value.trace_add("write", self._update_threshold_by_entry)
 
         # Create main model
-        self.model = MainModel(self, modules, cap, mp_face_mesh, REFRESH_DELAY_MS)
+        self.model = MainModel(self, modules, cap, mp_face_mesh,
+                               record_path=self.record_path, metrics_port=self.metrics_port,
+                               profile_duration=self.profile_duration)
 
         # Initialize window
         self._initialize_main_ui()
@@ -101,16 +110,6 @@ class App(ctk.CTk):
         # Create main UI components
         self._create_main_ui()
 
-        # Create chart
-        self.chart_data = collections.deque(
-            [0.] * CHART_BUFFER_SIZE,
-            maxlen=CHART_BUFFER_SIZE
-        )
-        self.chart_threshold_data = collections.deque(
-            [0.] * CHART_BUFFER_SIZE,
-            maxlen=CHART_BUFFER_SIZE
-        )
-
         # Create chart lines
         self.chart_line = ctkchart.CTkLine(
             master=self.chart,
@@ -120,10 +119,19 @@ class App(ctk.CTk):
             master=self.chart,
             color="red",
         )
+        self.chart_feed = LineChartFeed(
+            self.chart, self.chart_line, self.chart_threshold_line,
+            capacity=Settings.get(CHART_BUFFER_SIZE_KEY, CHART_BUFFER_SIZE),
+            max_points=CHART_MAX_POINTS,
+            refresh_ms=CHART_REFRESH_MS,
+        )
 
         # Set threshold knob value
         self.threshold_knob.set(self.app_state.threshold_value.get())
 
+        # Capture a profile on demand
+        self.bind(PROFILE_HOTKEY, self._on_profile_hotkey)
+
         # Start processing
         self.model.start()
 
@@ -155,6 +163,7 @@ class App(ctk.CTk):
 
         # Create video label
         self.video_label = ctk.CTkLabel(self.video_frame, text="")
+        self.video_display = create_video_display(self.video_label, self.modules)
 
         # Create threshold frame
         threshold_frame = ctk.CTkFrame(self)
@@ -195,7 +204,8 @@ class App(ctk.CTk):
             fg_color=ctk.ThemeManager.theme["CTk"]["fg_color"][1 if is_dark_mode else 0],
 
             x_axis_data="",
-            x_axis_values=tuple([0] * CHART_BUFFER_SIZE),
+            x_axis_values=tuple([0] * chart_layout(
+                Settings.get(CHART_BUFFER_SIZE_KEY, CHART_BUFFER_SIZE), CHART_MAX_POINTS)[1]),
             x_axis_label_count=0,
             x_axis_section_count=0,
             x_space=0,
@@ -306,6 +316,14 @@ class App(ctk.CTk):
             variable=self.app_state.mirror_effect,
         )
 
+        # Create performance overlay switch
+        perf_hud_switch = ctk.CTkSwitch(
+            master=parent,
+            text="Performance HUD",
+            font=font,
+            variable=self.app_state.show_perf_hud,
+        )
+
         theme_switch = ctk.CTkSwitch(
             master=parent,
             text="Light Theme",
@@ -320,6 +338,7 @@ class App(ctk.CTk):
         show_camera_switch.grid(row=0, column=0, padx=5, pady=5, sticky="w")
         mirror_effect_switch.grid(row=1, column=0, padx=5, pady=5, sticky="w")
         theme_switch.grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        perf_hud_switch.grid(row=3, column=0, padx=5, pady=5, sticky="w")
 
     def _create_more_tab(self, parent, font, is_dark_mode):
 
@@ -418,10 +437,6 @@ class App(ctk.CTk):
     def update_video(self, results):
         """Update UI with processed results"""
         try:
-            # Get required modules for display
-            cv = self.modules['cv2']
-            Image = self.modules['PIL']
-
             mesh_results = results['mesh_results']
 
             # Process results
@@ -439,18 +454,18 @@ class App(ctk.CTk):
                 (STRABISMUS_RANGE_MAX - STRABISMUS_RANGE_MIN)
             )
 
-            # Create a line for the line chart
-            self.chart_data.append(100 * eye_distance_percent)
+            # Add a sample to the line chart
+            self.chart_feed.append(100 * eye_distance_percent)
 
             # Calculate and append threshold percentage
             threshold_percent = (
                 (self.app_state.threshold_value.get() - STRABISMUS_RANGE_MIN) /
                 (STRABISMUS_RANGE_MAX - STRABISMUS_RANGE_MIN)
             )
-            self.chart_threshold_data.append(100 * threshold_percent)
+            self.chart_feed.set_threshold(100 * threshold_percent)
 
-            self.chart.show_data(line=self.chart_line, data=list(self.chart_data))
-            self.chart.show_data(line=self.chart_threshold_line, data=list(self.chart_threshold_data))
+            # Draw new points; the threshold line is only redrawn when it changes
+            self.chart_feed.refresh()
 
             # Get processed frame
             frame = results['frame']
@@ -460,18 +475,15 @@ class App(ctk.CTk):
             video_height = self.video_frame.winfo_height()
 
             if video_width > 1 and video_height > 1:  # Check if dimensions are valid
-                # Convert frame to PIL format
-                image = Image.fromarray(cv.cvtColor(frame, cv.COLOR_BGR2RGB))
+                display_start = time.perf_counter()
 
-                # Resize image to match video frame dimensions
-                image = image.resize((video_width, video_height))
+                # Let the render stage draw the next frames at the label size
+                self.model.set_display_size(video_width, video_height)
 
-                # Convert to CTk format
-                ctk_image = ctk.CTkImage(image, size=(video_width, video_height))
+                # Update video label; frames already arrive at the display size
+                self.video_display.show(frame, (video_width, video_height))
 
-                # Update video label
-                self.video_label.configure(image=ctk_image)
-                self.video_label.image = ctk_image
+                self.model.perf_stats.record('display_ms', (time.perf_counter() - display_start) * 1000)
 
         except Exception as e:
             print(f"Error updating video: {e}")
@@ -563,13 +575,23 @@ class App(ctk.CTk):
             scale_image="assets/knob4_scale.png" if is_dark_mode else "assets/knob4_scale_light.png",
             bg=fg_color_ctkframe)
 
+    def _on_profile_hotkey(self, _event=None):
+        """Start a profile capture of the pipeline and UI threads"""
+        self.model.profiler.request(Settings.get(PROFILE_HOTKEY_DURATION_S_KEY, PROFILE_HOTKEY_DURATION_S))
+
     def check_results(self):
         """Check for processed results in main thread"""
         try:
+            # Let a running profile capture include the UI thread
+            self.model.profiler.checkpoint()
+
             # Check for results and update UI
             results = self.model.get_next_result()
             if results is not None:
-                self.update_video(results)
+                try:
+                    self.update_video(results)
+                finally:
+                    self.model.release_result(results)
 
         except Exception as e:
             print(f"Error checking results: {e}")
@@ -586,7 +608,41 @@ class App(ctk.CTk):
             return "N/A"
         return f"{eye_distance:.3f}"
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument(
+        '--source',
+        help="frame source: 'camera:<index>', 'video:<path>', 'images:<directory>' "
+             "or 'synthetic[:<width>x<height>]' (default: camera from settings)",
+    )
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help="play video files and image directories as fast as possible instead of in real time",
+    )
+    parser.add_argument(
+        '--record',
+        metavar='PATH',
+        help="record the detected face landmarks of every frame to PATH",
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='PORT',
+        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        '--profile',
+        type=float,
+        metavar='SECONDS',
+        help="profile the pipeline and UI threads for SECONDS after start (F9 starts a capture any time)",
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    app = App()
+    args = parse_args()
+    app = App(source=args.source, realtime=False if args.fast else None, record_path=args.record,
+              metrics_port=args.metrics_port, profile_duration=args.profile)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
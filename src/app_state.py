@@ -3,6 +3,7 @@ from src.config import (
     APPEARANCE_MODE_LIGHT, APPEARANCE_MODE_KEY,
     MIRROR_EFFECT_ENABLED, MIRROR_EFFECT_KEY,
     SHOW_CAMERA, SHOW_CAMERA_KEY,
+    SHOW_PERF_HUD, SHOW_PERF_HUD_KEY,
     FULLSCREEN_ALERT_ENABLED, FULLSCREEN_ALERT_KEY,
     STRABISMUS_THRESHOLD, STRABISMUS_THRESHOLD_KEY,
     OVERLAY_COLOR, OVERLAY_COLOR_KEY,
@@ -26,6 +27,11 @@ class AppState:
             SHOW_CAMERA_KEY,
             SHOW_CAMERA
         )
+        self.show_perf_hud = self._create_var_with_trace(
+            ctk.BooleanVar,
+            SHOW_PERF_HUD_KEY,
+            SHOW_PERF_HUD
+        )
         self.fullscreen_alert = self._create_var_with_trace(
             ctk.BooleanVar,
             FULLSCREEN_ALERT_KEY,
@@ -0,0 +1,125 @@
+"""Eye-distance chart history kept in a NumPy ring buffer and fed to ctkchart incrementally"""
+import math
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity ring of float samples"""
+    def __init__(self, capacity, fill=None):
+        self._data = np.zeros(capacity, dtype=np.float64)
+        self.total = 0  # Samples appended in total
+        if fill is not None:
+            self._data.fill(fill)
+            self.total = capacity
+
+    def __len__(self):
+        return min(self.total, len(self._data))
+
+    @property
+    def capacity(self):
+        """Maximum number of samples kept"""
+        return len(self._data)
+
+    def append(self, value):
+        """Add a sample, overwriting the oldest one when full"""
+        self._data[self.total % len(self._data)] = value
+        self.total += 1
+
+    def values(self):
+        """Stored samples, oldest first (a copy)"""
+        capacity = len(self._data)
+        if self.total <= capacity:
+            return self._data[:self.total].copy()
+        start = self.total % capacity
+        return np.concatenate((self._data[start:], self._data[:start]))
+
+
+def chart_layout(capacity, max_points):
+    """(samples per drawn point, drawn points) for a history of capacity samples"""
+    decimation = max(1, math.ceil(capacity / max_points))
+    return decimation, max(1, capacity // decimation)
+
+
+class LineChartFeed:
+    """Feeds a CTkLineChart from a RingBuffer without re-sending the history.
+
+    CTkLineChart.show_data appends to what a line already shows, so each
+    refresh only passes the points completed since the previous one. When
+    the history holds more samples than points are drawn, a point is the
+    maximum of its samples so short spikes above the threshold stay
+    visible. The threshold line is extended with a constant and only redrawn
+    across the whole chart when the threshold changes.
+    """
+    def __init__(self, chart, line, threshold_line, capacity, max_points, refresh_ms):
+        self.chart = chart
+        self.line = line
+        self.threshold_line = threshold_line
+        self.refresh_interval = refresh_ms / 1000
+        self.decimation, self.points = chart_layout(capacity, max_points)
+
+        # Starts full of zeros like an idle chart
+        self.samples = RingBuffer(self.points * self.decimation, fill=0.0)
+
+        self._bucket_max = None  # Maximum of the samples of the point being collected
+        self._pending = []  # Completed points not drawn yet
+        self._threshold = 0.0
+        self._drawn_threshold = None
+        self._last_refresh = None
+        self._points_since_trim = 0
+
+    def append(self, value):
+        """Add a sample"""
+        value = float(value)
+        self.samples.append(value)
+        self._bucket_max = value if self._bucket_max is None else max(self._bucket_max, value)
+        if self.samples.total % self.decimation == 0:
+            self._pending.append(self._bucket_max)
+            self._bucket_max = None
+
+    def set_threshold(self, value):
+        """Set the threshold line level"""
+        self._threshold = float(value)
+
+    def refresh(self, now=None):
+        """Draw what changed, at most once per refresh interval. Returns True if the chart was updated"""
+        now = time.perf_counter() if now is None else now
+        if self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+            return False
+
+        if self._threshold != self._drawn_threshold:
+            self.redraw()
+        elif self._pending:
+            self.chart.show_data(line=self.line, data=self._pending)
+            self.chart.show_data(line=self.threshold_line, data=[self._threshold] * len(self._pending))
+            self._points_since_trim += len(self._pending)
+            if self._points_since_trim >= self.points:
+                # Lines keep every point ever shown; drop the ones scrolled out of view
+                self.chart.clear_data()
+                self._points_since_trim = 0
+        else:
+            return False
+
+        self._pending = []
+        self._last_refresh = now
+        return True
+
+    def redraw(self):
+        """Redraw both lines from the history"""
+        points = self._decimated().tolist()
+        self.line.reset()
+        self.threshold_line.reset()
+        self.chart.show_data(line=self.line, data=points)
+        self.chart.show_data(line=self.threshold_line, data=[self._threshold] * len(points))
+        self._drawn_threshold = self._threshold
+        self._pending = []
+        self._points_since_trim = 0
+
+    def _decimated(self):
+        """Points of all completed buckets in the history"""
+        values = self.samples.values()
+        # Leave out the bucket still being collected and a partial one at the start
+        values = values[:len(values) - self.samples.total % self.decimation]
+        values = values[len(values) % self.decimation:]
+        return values.reshape(-1, self.decimation).max(axis=1)
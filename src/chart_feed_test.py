@@ -0,0 +1,135 @@
+import numpy as np
+
+from .chart_feed import LineChartFeed, RingBuffer, chart_layout
+
+
+class FakeLine:
+    def __init__(self):
+        self.data = []
+        self.resets = 0
+
+    def reset(self):
+        self.data = []
+        self.resets += 1
+
+
+class FakeChart:
+    """Records what CTkLineChart would draw"""
+    def __init__(self):
+        self.calls = 0
+        self.clears = 0
+
+    def show_data(self, line, data):
+        line.data.extend(data)
+        self.calls += 1
+
+    def clear_data(self):
+        self.clears += 1
+
+
+def make_feed(capacity=12, max_points=4):
+    chart = FakeChart()
+    line, threshold_line = FakeLine(), FakeLine()
+    feed = LineChartFeed(chart, line, threshold_line, capacity, max_points, refresh_ms=100)
+    return feed, chart, line, threshold_line
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(4)
+    assert len(ring) == 0 and ring.values().size == 0
+    for value in range(3):
+        ring.append(value)
+    assert ring.values().tolist() == [0, 1, 2]
+
+    for value in range(3, 10):
+        ring.append(value)
+    assert len(ring) == 4 and ring.total == 10
+    assert ring.values().tolist() == [6, 7, 8, 9]
+
+    # values() is a copy
+    ring.values()[:] = -1
+    assert ring.values().tolist() == [6, 7, 8, 9]
+
+
+def test_ring_buffer_fill():
+    ring = RingBuffer(3, fill=0.5)
+    assert len(ring) == 3 and ring.values().tolist() == [0.5] * 3
+
+
+def test_chart_layout():
+    assert chart_layout(100, 100) == (1, 100)
+    assert chart_layout(50, 100) == (1, 50)
+    assert chart_layout(1000, 100) == (10, 100)
+    assert chart_layout(250, 100) == (3, 83)
+
+
+def test_points_are_bucket_maxima():
+    feed, _, line, threshold_line = make_feed()
+    assert feed.decimation == 3 and feed.points == 4
+    feed.set_threshold(0.5)
+    feed.refresh(now=0.0)
+    assert line.data == [0.0] * 4
+
+    # A short spike stays visible in its point
+    for value in (0.1, 0.9, 0.2, 0.3, 0.3, 0.1, 0.4):
+        feed.append(value)
+    assert feed.refresh(now=1.0)
+    assert line.data == [0.0] * 4 + [0.9, 0.3]
+    assert threshold_line.data == [0.5] * 6
+
+    # The bucket still being collected is drawn once complete
+    feed.append(0.0)
+    feed.append(0.0)
+    assert feed.refresh(now=2.0)
+    assert line.data[-1] == 0.4
+
+
+def test_refresh_sends_only_new_points():
+    feed, chart, line, _ = make_feed(capacity=4, max_points=4)
+    feed.refresh(now=0.0)
+    calls = chart.calls
+
+    feed.append(1.0)
+    # Too early: nothing is drawn and the point stays pending
+    assert not feed.refresh(now=0.05)
+    assert feed.refresh(now=0.2)
+    assert chart.calls == calls + 2
+    assert line.data[-1] == 1.0
+
+    # Nothing new: no drawing at all
+    assert not feed.refresh(now=1.0)
+    assert chart.calls == calls + 2
+
+
+def test_threshold_change_redraws_once():
+    feed, _, line, threshold_line = make_feed()
+    for value in range(12):
+        feed.append(value)
+    feed.set_threshold(0.5)
+    feed.refresh(now=0.0)
+    assert line.resets == 1
+    assert line.data == [2, 5, 8, 11]
+    assert threshold_line.data == [0.5] * 4
+
+    # Same threshold: lines are extended, not redrawn
+    feed.set_threshold(0.5)
+    for value in (1, 2, 3):
+        feed.append(value)
+    feed.refresh(now=1.0)
+    assert line.resets == 1 and line.data[-1] == 3
+
+    # New threshold: both lines redrawn from the history
+    feed.set_threshold(0.7)
+    feed.refresh(now=2.0)
+    assert line.resets == 2 and threshold_line.resets == 2
+    assert line.data == [5, 8, 11, 3]
+    assert threshold_line.data == [0.7] * 4
+
+
+def test_trims_scrolled_out_points():
+    feed, chart, _, _ = make_feed(capacity=4, max_points=4)
+    feed.refresh(now=0.0)
+    for step, value in enumerate(np.linspace(0, 1, 8)):
+        feed.append(value)
+        feed.refresh(now=step + 1.0)
+    assert chart.clears == 2
@@ -10,10 +10,10 @@ import customtkinter as ctk
 # Local imports
 from .config import (
     APP_FONT, APP_FONT_KEY, APP_FONT_SIZE_TITLE,
-    MIN_DETECTION_CONFIDENCE, MIN_DETECTION_CONFIDENCE_KEY,
-    MIN_TRACKING_CONFIDENCE, MIN_TRACKING_CONFIDENCE_KEY,
-    DEFAULT_WEBCAM
+    FRAME_SOURCE, FRAME_SOURCE_KEY,
+    FRAME_SOURCE_REALTIME, FRAME_SOURCE_REALTIME_KEY,
 )
+from .inference_backend import create_inference_backend
 from .settings import Settings
 
 class LoadingUIComponents:
@@ -48,9 +48,14 @@ class LoadedComponents:
 
 class ComponentLoader:
     """Class for managing application component loading"""
-    def __init__(self, parent):
+    def __init__(self, parent, source=None, realtime=None):
         self.parent = parent
 
+        # Frame source spec and playback mode (command line overrides settings)
+        self.source = source or Settings.get(FRAME_SOURCE_KEY, FRAME_SOURCE)
+        self.realtime = realtime if realtime is not None else Settings.get(
+            FRAME_SOURCE_REALTIME_KEY, FRAME_SOURCE_REALTIME)
+
         # Initialize component groups
         self.ui = LoadingUIComponents(parent)
         self.state = LoadingState()
@@ -84,26 +89,9 @@ class ComponentLoader:
             self.loaded.modules['cv2'] = cv
             self.state.load_queue.put(("progress_update", "camera", 0.4))
 
-            # Initialize camera
-            self.loaded.cap = cv.VideoCapture(DEFAULT_WEBCAM)
-            if not self.loaded.cap.isOpened():
-                raise RuntimeError("Failed to connect to camera")
-            self.state.load_queue.put(("progress_update", "camera", 0.6))
-
-            # Set camera parameters
-            ret1 = self.loaded.cap.set(cv.CAP_PROP_FRAME_WIDTH, 1280)
-            ret2 = self.loaded.cap.set(cv.CAP_PROP_FRAME_HEIGHT, 720)
-            ret3 = self.loaded.cap.set(cv.CAP_PROP_FPS, 30)
-
-            # Verify camera settings
-            if not all([ret1, ret2, ret3]):
-                raise RuntimeError("Failed to set camera parameters")
-
-            # Test camera capture
-            ret, frame = self.loaded.cap.read()
-            if not ret or frame is None:
-                raise RuntimeError("Failed to capture frame from camera")
-
+            # Initialize camera (or another frame source) at the configured frame rate and resolution
+            frame_sources = importlib.import_module('src.frame_sources')
+            self.loaded.cap = frame_sources.open_capture(self.source, self.realtime)
             self.state.load_queue.put(("progress_update", "camera", 0.8))
 
             self.state.components_loaded['camera'] = True
@@ -113,6 +101,8 @@ class ComponentLoader:
             self.state.load_queue.put(("error", f"Failed to import OpenCV: {str(e)}"))
         except (cv.error, OSError) as e:
             self.state.load_queue.put(("error", f"Camera hardware error: {str(e)}"))
+        except ValueError as e:
+            self.state.load_queue.put(("error", f"Invalid frame source: {str(e)}"))
         except RuntimeError as e:
             self.state.load_queue.put(("error", f"Camera initialization error: {str(e)}"))
 
@@ -128,12 +118,7 @@ class ComponentLoader:
             self.state.load_queue.put(("progress_update", "mediapipe", 0.4))
 
             # Initialize FaceMesh
-            self.loaded.mp_face_mesh = mp.solutions.face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=Settings.get(MIN_DETECTION_CONFIDENCE_KEY, MIN_DETECTION_CONFIDENCE),
-                min_tracking_confidence=Settings.get(MIN_TRACKING_CONFIDENCE_KEY, MIN_TRACKING_CONFIDENCE),
-            )
+            self.loaded.mp_face_mesh = create_inference_backend()
             self.state.load_queue.put(("progress_update", "mediapipe", 0.7))
 
             self.state.components_loaded['mediapipe'] = True
@@ -155,6 +140,7 @@ class ComponentLoader:
             self.state.load_queue.put(("progress_update", "other_modules", 0.4))
 
             self.loaded.modules['PIL'] = importlib.import_module('PIL.Image')
+            self.loaded.modules['ImageTk'] = importlib.import_module('PIL.ImageTk')
             self.state.load_queue.put(("progress_update", "other_modules", 0.5))
 
             # Import local modules
@@ -59,12 +59,100 @@ STRABISMUS_THRESHOLD_KEY = 'strabismus.threshold'
 # REFRESH_DELAY_MS: Delay in milliseconds between each frame refresh
 REFRESH_DELAY_MS = 100
 
-# CHART_BUFFER_SIZE: Size of the buffer for the line chart
+# TARGET_FPS: Frame rate the processing pipeline is paced to
+TARGET_FPS = 1000 / REFRESH_DELAY_MS
+TARGET_FPS_KEY = 'pipeline.target_fps'
+
+# CHART_BUFFER_SIZE: Eye distance samples shown in the line chart (one per displayed frame)
+# Histories of minutes are fine: beyond CHART_MAX_POINTS samples are combined into one point
 CHART_BUFFER_SIZE = 100
+CHART_BUFFER_SIZE_KEY = 'chart.buffer_size'
+CHART_MAX_POINTS = 100  # Points drawn in the chart
+CHART_REFRESH_MS = REFRESH_DELAY_MS  # Minimum interval between chart redraws
+
+## Pipeline Configuration
+
+# PIPELINE_QUEUE_SIZE: Capacity of the queues between capture, inference, render and UI stages
+PIPELINE_QUEUE_SIZE = 2
+PIPELINE_QUEUE_SIZE_KEY = 'pipeline.queue_size'
+
+# PIPELINE_DROP_POLICY: What a full stage queue does with new items
+# 'drop_oldest' - discard the oldest queued item, 'keep_latest' - keep only the newest item,
+# 'block' - make the producing stage wait (backpressure)
+PIPELINE_DROP_POLICY = 'keep_latest'
+PIPELINE_DROP_POLICY_KEY = 'pipeline.drop_policy'
+
+# FRAME_RING_SLOTS: Preallocated shared-memory frame slots the camera decodes into.
+# Should cover the frames held by all stages at once (queued, in progress and the latest one),
+# so without a setting it is the configured queue size plus FRAME_RING_SPARE_SLOTS
+FRAME_RING_SPARE_SLOTS = 4
+FRAME_RING_SLOTS_KEY = 'pipeline.ring_slots'
+# LANDMARK_BUFFER_SLOTS: Landmark arrays the thread FaceMesh backend converts into in rotation.
+# Should cover the results held by all stages at once (both queues, the render and UI stages and
+# an inference retried on the full frame), so without a setting it is twice the configured queue
+# size plus LANDMARK_BUFFER_SPARE_SLOTS
+LANDMARK_BUFFER_SPARE_SLOTS = 6
+LANDMARK_BUFFER_SLOTS_KEY = 'pipeline.landmark_slots'
+
+## Recording Configuration
+
+# Record the landmarks of every processed frame to a file (None: recording off).
+# Overridden by the --record command line option.
+LANDMARK_RECORDING_PATH = None
+LANDMARK_RECORDING_PATH_KEY = 'recording.path'
+LANDMARK_RECORDING_QUANTIZATION = 'int16'  # 'int16' (fixed point) or 'float16'
+LANDMARK_RECORDING_QUANTIZATION_KEY = 'recording.quantization'
+LANDMARK_RECORDING_DELTA = False  # Store differences to the previous frame (int16 only)
+LANDMARK_RECORDING_DELTA_KEY = 'recording.delta'
+
+## Metrics Configuration
+
+# Serve pipeline metrics in Prometheus text format on http://127.0.0.1:<port>/metrics
+# (None: endpoint off). Overridden by the --metrics-port command line option.
+METRICS_PORT = None
+METRICS_PORT_KEY = 'metrics.port'
+METRICS_HOST = '127.0.0.1'  # Localhost only, the endpoint has no authentication
+
+## Profiling Configuration
+
+# Capture a profile of the pipeline threads and the UI thread for this many seconds
+# right after start (None: off). Overridden by the --profile command line option.
+PROFILE_DURATION_S = None
+PROFILE_DURATION_S_KEY = 'profiler.duration'
+PROFILE_HOTKEY = '<F9>'  # Starts a capture of PROFILE_HOTKEY_DURATION_S seconds in the main window
+PROFILE_HOTKEY_DURATION_S = 10
+PROFILE_HOTKEY_DURATION_S_KEY = 'profiler.hotkey_duration'
+PROFILE_OUTPUT_DIR = 'profiles'  # .prof (pstats) and .collapsed (flame graph) files
+PROFILE_OUTPUT_DIR_KEY = 'profiler.output_dir'
+PROFILE_SAMPLE_INTERVAL_MS = 5  # Stack sampling interval of the collapsed-stack profile
+
+## Power Saving Configuration
+
+# Switch to low-power mode when no face has been detected for a while
+POWER_SAVING_ENABLED = True
+POWER_SAVING_ENABLED_KEY = 'power.enabled'
+IDLE_TIMEOUT_S = 10  # Seconds without a face before going idle
+IDLE_TIMEOUT_S_KEY = 'power.idle_timeout'
+IDLE_CAPTURE_RESOLUTION = (640, 360)  # Camera resolution while idle (width, height)
+IDLE_CAPTURE_RESOLUTION_KEY = 'power.idle_resolution'
+IDLE_TARGET_FPS = 2  # Processing frame rate while idle
+IDLE_TARGET_FPS_KEY = 'power.idle_fps'
 
 # Display settings
 SHOW_DISTANCE = True
 SHOW_DISTANCE_KEY = 'app.show_distance'
+SHOW_PERF_HUD = False  # Overlay FPS and stage latencies on the video
+SHOW_PERF_HUD_KEY = 'app.show_perf_hud'
+BACKGROUND_CACHE_SIZE = 4  # Rendered camera-off backgrounds kept (size, color and brightness combinations)
+EYE_SPRITE_CACHE_SIZE = 32  # Pre-rendered eyes kept (one per iris radius, style and color combination)
+# DISPLAY_BACKEND: How frames reach the video label
+# 'photoimage' - one Tk photo image updated in place, 'ctkimage' - a new CTkImage per frame
+DISPLAY_BACKEND = 'photoimage'
+DISPLAY_BACKEND_KEY = 'display.backend'
+# Camera-off output frames reused with dirty-region redraw; covers frames queued or shown by the UI
+RENDER_FRAME_POOL_SIZE = PIPELINE_QUEUE_SIZE + 4
+# Restore a reused frame with one full copy when its drawn regions cover more than this share of it
+RENDER_FULL_RESTORE_RATIO = 0.5
 
 # Eye display settings
 EYES_DISPLAY_SCALE = 2.5  # Масштаб отображения глаз
@@ -126,6 +214,20 @@ RED_LIGHT_COLOR = "#F8A0B9"  # RGB(248, 160, 185)
 # DEFAULT_WEBCAM: Default camera source index. '0' usually refers to the built-in webcam.
 DEFAULT_WEBCAM = 0
 
+# CAPTURE_RESOLUTIONS: Camera resolutions (width, height) tried in order until the camera accepts one
+CAPTURE_RESOLUTIONS = [(1280, 720), (960, 540), (640, 480), (640, 360)]
+CAPTURE_RESOLUTIONS_KEY = 'camera.resolutions'
+CAPTURE_FPS = 30
+CAPTURE_FPS_KEY = 'camera.fps'
+
+# FRAME_SOURCE: Where frames come from: 'camera:<index>', 'video:<path>', 'images:<directory>',
+# 'synthetic' or 'synthetic:<width>x<height>'. Overridden by the --source command line option.
+FRAME_SOURCE = f"camera:{DEFAULT_WEBCAM}"
+FRAME_SOURCE_KEY = 'camera.source'
+# Play video files and image directories in real time (False: as fast as possible)
+FRAME_SOURCE_REALTIME = True
+FRAME_SOURCE_REALTIME_KEY = 'camera.realtime'
+
 ## Head Pose Estimation Landmark Indices
 # These indices correspond to the specific facial landmarks used for head pose estimation.
 LEFT_EYE_IRIS = [474, 475, 476, 477]  # Left eye iris
@@ -150,6 +252,35 @@ MIN_DETECTION_CONFIDENCE_KEY = 'model.min_detection_confidence'
 MIN_TRACKING_CONFIDENCE = 0.8  # Minimum tracking confidence
 MIN_TRACKING_CONFIDENCE_KEY = 'model.min_tracking_confidence'
 
+# INFERENCE_BACKEND: Where FaceMesh runs
+# 'thread' - in the pipeline's inference thread, 'process' - in separate worker processes (no shared GIL)
+INFERENCE_BACKEND = 'thread'
+INFERENCE_BACKEND_KEY = 'model.inference_backend'
+INFERENCE_WORKERS = 1  # Number of worker processes for the 'process' backend (one per stream)
+INFERENCE_WORKERS_KEY = 'model.inference_workers'
+
+# INFERENCE_RESOLUTION: Maximum frame size (width, height) fed to FaceMesh.
+# Larger frames are downscaled once before inference, rendering keeps the full resolution.
+INFERENCE_RESOLUTION = (640, 360)
+INFERENCE_RESOLUTION_KEY = 'model.inference_resolution'
+
+# Run FaceMesh on a crop around the previously detected face instead of the full frame
+FACE_ROI_TRACKING = True
+FACE_ROI_TRACKING_KEY = 'model.roi_tracking'
+FACE_ROI_MARGIN = 0.5  # Expansion of the face box on each side, relative to its size
+FACE_ROI_MARGIN_KEY = 'model.roi_margin'
+
+# ENHANCEMENT_MODE: Low-light enhancement (CLAHE and gamma) of the FaceMesh input
+# 'auto' - only while the scene is dark, 'on' - always, 'off' - never
+ENHANCEMENT_MODE = 'auto'
+ENHANCEMENT_MODE_KEY = 'enhancement.mode'
+LOW_LIGHT_ON_LUMINANCE = 60  # Mean luminance (0-255) below which 'auto' enhances
+LOW_LIGHT_OFF_LUMINANCE = 80  # Mean luminance above which 'auto' stops enhancing again
+LOW_LIGHT_SAMPLE_SIZE = (64, 36)  # Downscaled frame size the luminance is measured on
+LOW_LIGHT_CLAHE_CLIP_LIMIT = 3.0
+LOW_LIGHT_CLAHE_TILE_GRID = (8, 8)
+LOW_LIGHT_GAMMA = 1.2
+
 # Iris and eye corners landmarks indices
 LEFT_IRIS = [474, 475, 476, 477]  # Left iris
 RIGHT_IRIS = [469, 470, 471, 472]  # Right iris
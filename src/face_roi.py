@@ -0,0 +1,143 @@
+"""Face region tracking for cropped FaceMesh inference"""
+import numpy as np
+
+
+class FaceRoiTracker:
+    """Keeps the region of interest around the last detected face.
+
+    Once a face has been found, inference for the following frames runs on an
+    expanded bounding box around the previous landmarks instead of the whole
+    frame. The region is only moved when the face gets close to its border, so
+    consecutive crops keep the same geometry. Landmarks detected in the crop
+    are remapped back into normalized full-frame coordinates.
+    """
+    def __init__(self, margin=0.5, min_size=128, enabled=True):
+        self.margin = margin  # Expansion of the face box on each side, relative to its size
+        self.min_size = min_size  # Minimum crop side in pixels
+        self.enabled = enabled
+
+        self.roi = None  # (x0, y0, x1, y1) in pixels
+        self._frame_size = None
+
+        # Statistics
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.tracking_lost = 0
+
+    def reset(self):
+        """Fall back to full-frame detection"""
+        self.roi = None
+
+    def crop(self, frame, mirrored=False):
+        """Get the part of the frame inference should run on.
+
+        With mirrored set, the region is tracked in horizontally flipped
+        coordinates while frame is the raw (unflipped) image: the returned
+        region is the raw counterpart and has to be flipped by the caller.
+
+        Returns:
+            tuple: (region, roi) where roi is None when the full frame is used
+        """
+        frame_size = frame.shape[1], frame.shape[0]
+        if frame_size != self._frame_size:
+            # Capture resolution changed, previous region is meaningless
+            self._frame_size = frame_size
+            self.roi = None
+
+        if self.roi is None:
+            self.full_frames += 1
+            return frame, None
+
+        x0, y0, x1, y1 = self.roi
+        self.roi_frames += 1
+        if mirrored:
+            return frame[y0:y1, frame_size[0] - x1:frame_size[0] - x0], self.roi
+        return frame[y0:y1, x0:x1], self.roi
+
+    def lost(self):
+        """Report that no face was found inside the current region"""
+        self.tracking_lost += 1
+        self.reset()
+
+    @staticmethod
+    def remap(landmarks, roi, frame_w, frame_h):
+        """Convert landmarks normalized to the crop into full-frame normalized coordinates (in place).
+
+        Landmarks are either a protobuf landmark list or an (N, 3) array.
+        """
+        if roi is None:
+            return
+        x0, y0, x1, y1 = roi
+        scale_x = (x1 - x0) / frame_w
+        scale_y = (y1 - y0) / frame_h
+        offset_x = x0 / frame_w
+        offset_y = y0 / frame_h
+
+        if isinstance(landmarks, np.ndarray):
+            landmarks[:, 0] = landmarks[:, 0] * scale_x + offset_x
+            landmarks[:, 1] = landmarks[:, 1] * scale_y + offset_y
+            landmarks[:, 2] *= scale_x
+            return
+
+        for point in landmarks:
+            point.x = point.x * scale_x + offset_x
+            point.y = point.y * scale_y + offset_y
+            point.z = point.z * scale_x
+
+    def update(self, landmarks, frame_w, frame_h):
+        """Update the region from full-frame normalized landmarks"""
+        if not self.enabled:
+            return
+
+        if isinstance(landmarks, np.ndarray):
+            (min_x, min_y), (max_x, max_y) = landmarks[:, :2].min(axis=0), landmarks[:, :2].max(axis=0)
+        else:
+            xs = [point.x for point in landmarks]
+            ys = [point.y for point in landmarks]
+            min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
+        face_box = (min_x * frame_w, min_y * frame_h, max_x * frame_w, max_y * frame_h)
+
+        # Keep the current region while the face stays well inside it
+        if self.roi is not None and self._contains(self.roi, face_box, self.margin * 0.5):
+            return
+
+        self.roi = self._expand(face_box, frame_w, frame_h)
+
+    @staticmethod
+    def _contains(roi, box, margin):
+        """Check that box lies inside roi with the given relative margin"""
+        box_w = box[2] - box[0]
+        box_h = box[3] - box[1]
+        return (
+            box[0] - box_w * margin >= roi[0] and
+            box[1] - box_h * margin >= roi[1] and
+            box[2] + box_w * margin <= roi[2] and
+            box[3] + box_h * margin <= roi[3]
+        )
+
+    def _expand(self, box, frame_w, frame_h):
+        """Expand face box by the margin and clamp it to the frame"""
+        center_x = (box[0] + box[2]) * 0.5
+        center_y = (box[1] + box[3]) * 0.5
+        half_w = max((box[2] - box[0]) * (0.5 + self.margin), self.min_size * 0.5)
+        half_h = max((box[3] - box[1]) * (0.5 + self.margin), self.min_size * 0.5)
+
+        x0 = max(0, int(center_x - half_w))
+        y0 = max(0, int(center_y - half_h))
+        x1 = min(frame_w, int(center_x + half_w))
+        y1 = min(frame_h, int(center_y + half_h))
+
+        # Face outside the frame, or region covering (almost) the whole frame:
+        # nothing to gain over full-frame detection
+        if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) >= 0.8 * frame_w * frame_h:
+            return None
+        return x0, y0, x1, y1
+
+    def get_stats(self):
+        """Get tracking statistics"""
+        return {
+            'roi': self.roi,
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames,
+            'tracking_lost': self.tracking_lost,
+        }
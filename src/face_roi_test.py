@@ -0,0 +1,112 @@
+import numpy as np
+
+from .face_roi import FaceRoiTracker
+
+WIDTH, HEIGHT = 640, 480
+
+
+def face_landmarks(min_x, min_y, max_x, max_y):
+    """Normalized landmarks spanning the given box"""
+    return np.array([[min_x, min_y, 0.0], [max_x, max_y, 0.0], [(min_x + max_x) / 2, max_y, 0.0]], dtype=np.float32)
+
+
+def make_frame():
+    return np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def make_tracker(**kwargs):
+    """Tracker that has seen a full frame, as after the first detection in the pipeline"""
+    tracker = FaceRoiTracker(**kwargs)
+    tracker.crop(make_frame())
+    return tracker
+
+
+def test_roi_expands_the_face_box():
+    tracker = make_tracker(margin=0.5, min_size=128)
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+    # 64x48 face box: widened by half its size on each side, the height raised to min_size
+    assert tracker.roi == (224, 152, 352, 280)
+
+    region, roi = tracker.crop(make_frame())
+    assert roi == tracker.roi
+    assert region.shape[:2] == (128, 128)
+
+
+def test_roi_is_clamped_to_the_frame():
+    tracker = make_tracker(margin=0.5, min_size=128)
+    tracker.update(face_landmarks(0.0, 0.85, 0.1, 1.0), WIDTH, HEIGHT)
+    x0, y0, x1, y1 = tracker.roi
+    assert x0 == 0 and y1 == HEIGHT
+    assert x1 < WIDTH and y0 > 0
+
+    # A face filling most of the frame gains nothing from cropping
+    tracker.update(face_landmarks(0.05, 0.05, 0.95, 0.95), WIDTH, HEIGHT)
+    assert tracker.roi is None
+
+
+def test_roi_stays_while_the_face_is_inside():
+    tracker = make_tracker(margin=0.5, min_size=128)
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+    roi = tracker.roi
+    tracker.update(face_landmarks(0.405, 0.4, 0.505, 0.5), WIDTH, HEIGHT)
+    assert tracker.roi == roi
+    tracker.update(face_landmarks(0.6, 0.4, 0.7, 0.5), WIDTH, HEIGHT)
+    assert tracker.roi != roi
+
+
+def check_remap(mirrored):
+    """A marker found in the crop lands on its full-frame position"""
+    tracker = make_tracker(margin=0.5, min_size=128)
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+
+    frame = make_frame()
+    frame[200, 300] = 255
+    # FaceMesh sees the frame the way it is displayed
+    view = np.fliplr(frame) if mirrored else frame
+    expected_y, expected_x = np.argwhere(view[:, :, 0])[0]
+
+    region, roi = tracker.crop(frame, mirrored)
+    assert roi is not None
+    if mirrored:
+        region = np.fliplr(region)
+    crop_y, crop_x = np.argwhere(region[:, :, 0])[0]
+    landmarks = np.array([[
+        (crop_x + 0.5) / region.shape[1], (crop_y + 0.5) / region.shape[0], 0.1,
+    ]], dtype=np.float32)
+
+    FaceRoiTracker.remap(landmarks, roi, WIDTH, HEIGHT)
+    assert np.allclose(landmarks[0, :2], [(expected_x + 0.5) / WIDTH, (expected_y + 0.5) / HEIGHT])
+    # Depth is relative to the face width, which shrinks with the crop scale
+    assert np.isclose(landmarks[0, 2], 0.1 * region.shape[1] / WIDTH)
+
+
+def test_remap_to_full_frame():
+    check_remap(mirrored=False)
+
+
+def test_remap_to_full_frame_mirrored():
+    check_remap(mirrored=True)
+
+
+def test_full_frame_after_a_miss():
+    tracker = make_tracker()
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+    assert tracker.crop(make_frame())[1] is not None
+
+    tracker.lost()
+    frame = make_frame()
+    region, roi = tracker.crop(frame)
+    assert roi is None and region is frame
+    assert tracker.get_stats()['tracking_lost'] == 1
+
+
+def test_resolution_change_drops_the_roi():
+    tracker = make_tracker()
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+    assert tracker.crop(np.zeros((240, 320, 3), dtype=np.uint8))[1] is None
+
+
+def test_disabled_tracker_uses_the_full_frame():
+    tracker = make_tracker(enabled=False)
+    tracker.update(face_landmarks(0.4, 0.4, 0.5, 0.5), WIDTH, HEIGHT)
+    assert tracker.crop(make_frame())[1] is None
@@ -0,0 +1,235 @@
+"""Background frame capture that keeps only the freshest camera frame"""
+import threading
+import time
+import traceback
+
+import cv2 as cv
+import numpy as np
+
+from .frame_ring import FrameRef, SharedFrameRing
+
+
+class FrameGrabber:
+    """Dedicated capture thread with a latest-frame buffer.
+
+    The thread reads from the capture device as fast as the driver delivers
+    frames, so the driver queue never fills up with stale buffers. Frames are
+    decoded straight into the slots of a SharedFrameRing; only the newest one
+    is handed out to consumers, frames that are overwritten before anyone
+    consumed them are counted as dropped.
+    """
+    def __init__(self, cap, ring_slots=6, read_error_delay_ms=10, on_iteration=None):
+        self.cap = cap
+        self.ring_slots = ring_slots
+        self.read_error_delay_ms = read_error_delay_ms
+        self.on_iteration = on_iteration  # Called from the capture thread once per loop (profiler hook)
+
+        # One ring per capture resolution (see request_resolution)
+        self._rings = {}
+
+        # Latest frame guarded by a condition variable
+        self._condition = threading.Condition()
+        self._latest = None  # (ring, slot_id, ring_sequence, frame, timestamp, read_ms)
+        self._timestamp = 0.0
+        self._sequence = 0
+        self._consumed_sequence = 0
+
+        # Thread control
+        self._thread = None
+        self._running = False
+        self._paused = threading.Event()
+
+        # Set once a source without looping has delivered its last frame
+        self.end_of_stream = False
+
+        # Capture resolution change requested by other threads
+        self._requested_resolution = None
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_copied = 0
+        self.read_failures = 0
+
+    def start(self):
+        """Start capture thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="capture")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop capture thread and free the frame rings"""
+        self._running = False
+        self._paused.clear()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+        with self._condition:
+            self._latest = None
+        for ring in self._rings.values():
+            ring.close()
+        self._rings = {}
+
+    def set_paused(self, paused):
+        """Pause or resume reading from the capture device"""
+        if paused:
+            self._paused.set()
+        else:
+            self._paused.clear()
+
+    def get_resolution(self):
+        """Current capture resolution as (width, height)"""
+        return (
+            int(self.cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+            int(self.cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+        )
+
+    def request_resolution(self, width, height, fps=None):
+        """Ask the capture thread to switch resolution (and frame rate) before its next read"""
+        self._requested_resolution = (int(width), int(height), fps)
+
+    def get_latest(self, timeout=None):
+        """Get the newest frame that has not been consumed yet.
+
+        The returned frame is pinned in its ring slot; call release() on it
+        once it is no longer needed.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a new frame
+
+        Returns:
+            FrameRef: Latest frame or None if no new frame arrived
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self._sequence != self._consumed_sequence or not self._running,
+                    timeout):
+                return None
+            if self._latest is None or self._sequence == self._consumed_sequence:
+                return None
+
+            self._consumed_sequence = self._sequence
+            ring, slot_id, ring_sequence, frame, timestamp, read_ms = self._latest
+            if ring is not None:
+                ring.pin(slot_id)
+            return FrameRef(frame, timestamp, ring_sequence, ring, slot_id, read_ms)
+
+    @property
+    def has_pending_frame(self):
+        """True while the newest frame has not been picked up by get_latest"""
+        with self._condition:
+            return self._sequence != self._consumed_sequence
+
+    def frame_age(self, timestamp=None):
+        """Age in seconds of the given capture timestamp (latest frame by default)"""
+        if timestamp is None:
+            timestamp = self._timestamp
+        if not timestamp:
+            return 0.0
+        return time.monotonic() - timestamp
+
+    def get_stats(self):
+        """Get capture statistics"""
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped,
+            'frames_copied': self.frames_copied,
+            'read_failures': self.read_failures,
+            'frame_age_ms': self.frame_age() * 1000,
+        }
+
+    def _ring_for(self, shape):
+        """Get (or create) the frame ring for a frame shape"""
+        ring = self._rings.get(shape)
+        if ring is None:
+            ring = SharedFrameRing(self.ring_slots, shape)
+            self._rings[shape] = ring
+        return ring
+
+    def _read_into_ring(self, ring):
+        """Read the next frame, decoding directly into a free ring slot when possible.
+
+        Returns:
+            tuple: (ring, slot_id, frame) or None if the read failed. ring and
+            slot_id are None when every slot was pinned and the frame lives in
+            its own array.
+        """
+        slot_id = ring.acquire() if ring is not None else None
+        if slot_id is None:
+            ret, frame = self.cap.read()
+        else:
+            ret, frame = self.cap.read(ring.slot(slot_id))
+
+        if not ret or frame is None:
+            return None
+
+        if slot_id is not None and frame.shape == ring.shape and np.may_share_memory(frame, ring.slot(slot_id)):
+            return ring, slot_id, frame
+
+        # Device returned its own buffer (first frame, resolution change or all slots busy)
+        ring = self._ring_for(frame.shape)
+        slot_id = ring.acquire()
+        if slot_id is None:
+            return None, None, frame
+
+        slot = ring.slot(slot_id)
+        np.copyto(slot, frame)
+        self.frames_copied += 1
+        return ring, slot_id, slot
+
+    def _capture_loop(self):
+        """Background thread for continuous frame capture"""
+        ring = None
+        while self._running:
+            try:
+                if self.on_iteration is not None:
+                    self.on_iteration()
+
+                if self._paused.is_set():
+                    time.sleep(self.read_error_delay_ms / 1000)
+                    continue
+
+                # Capture device is only touched from this thread
+                if self._requested_resolution is not None:
+                    width, height, fps = self._requested_resolution
+                    self._requested_resolution = None
+                    self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+                    self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+                    if fps is not None:
+                        self.cap.set(cv.CAP_PROP_FPS, fps)
+
+                read_start = time.perf_counter()
+                captured = self._read_into_ring(ring)
+                timestamp = time.monotonic()
+                read_ms = (time.perf_counter() - read_start) * 1000
+
+                if captured is None:
+                    if getattr(self.cap, 'ended', False):
+                        self.end_of_stream = True
+                        break
+                    self.read_failures += 1
+                    time.sleep(self.read_error_delay_ms / 1000)
+                    continue
+
+                ring, slot_id, frame = captured
+                ring_sequence = ring.publish(slot_id) if ring is not None else 0
+
+                with self._condition:
+                    # Previous frame was never picked up by a consumer
+                    if self._sequence != self._consumed_sequence:
+                        self.frames_dropped += 1
+
+                    self._latest = (ring, slot_id, ring_sequence, frame, timestamp, read_ms)
+                    self._timestamp = timestamp
+                    self._sequence += 1
+                    self.frames_captured += 1
+                    self._condition.notify_all()
+
+            except Exception as e:
+                print(f"Error in capture loop: {e}")
+                traceback.print_exc()
+                time.sleep(self.read_error_delay_ms / 1000)
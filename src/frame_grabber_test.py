@@ -0,0 +1,133 @@
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from .frame_grabber import FrameGrabber
+
+SHAPE = (4, 6, 3)
+
+
+class FakeCapture:
+    """Capture delivering the frames the test pushes; None ends the stream"""
+    def __init__(self):
+        self.values = queue.Queue()
+        self.ended = False
+
+    def push(self, *values):
+        for value in values:
+            self.values.put(value)
+
+    def read(self, image=None):
+        value = self.values.get(timeout=5)
+        if value is None:
+            self.ended = True
+            return False, None
+        if image is not None and image.shape == SHAPE:
+            image[:] = value
+            return True, image
+        return True, np.full(SHAPE, value, dtype=np.uint8)
+
+    def set(self, prop, value):  # pylint: disable=unused-argument
+        return False
+
+    def get(self, prop):  # pylint: disable=unused-argument
+        return 0.0
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+@pytest.fixture(name="grabber")
+def grabber_fixture():
+    cap = FakeCapture()
+    grabber = FrameGrabber(cap, ring_slots=2)
+    grabber.start()
+    yield grabber
+    cap.push(None)
+    grabber.stop()
+
+
+def capture(grabber, *values):
+    """Push frames and wait until the capture thread has published all of them"""
+    expected = grabber.frames_captured + len(values)
+    grabber.cap.push(*values)
+    wait_until(lambda: grabber.frames_captured == expected)
+
+
+def test_only_the_latest_frame_is_handed_out(grabber):
+    capture(grabber, 1, 2, 3)
+    frame = grabber.get_latest(timeout=0)
+    assert frame.frame[0, 0, 0] == 3
+    # Frames overwritten before anyone consumed them
+    assert grabber.frames_dropped == 2
+    assert grabber.get_latest(timeout=0) is None
+    frame.release()
+
+    capture(grabber, 4)
+    frame = grabber.get_latest(timeout=0)
+    assert frame.frame[0, 0, 0] == 4
+    assert grabber.frames_dropped == 2
+    frame.release()
+
+
+def test_frames_are_decoded_into_ring_slots(grabber):
+    sequences = []
+    for value in (1, 2, 3):
+        capture(grabber, value)
+        frame = grabber.get_latest(timeout=0)
+        assert frame.ring is not None and frame.is_valid()
+        assert np.shares_memory(frame.frame, frame.ring.slot(frame.slot_id))
+        sequences.append(frame.sequence)
+        frame.release()
+
+    assert sequences == [1, 2, 3]
+    # Only the first frame, read before the ring existed, was copied
+    assert grabber.frames_copied == 1
+
+
+def test_copy_fallback_when_every_slot_is_pinned(grabber):
+    capture(grabber, 1)
+    first = grabber.get_latest(timeout=0)
+    capture(grabber, 2)
+    second = grabber.get_latest(timeout=0)
+    assert {first.slot_id, second.slot_id} == {0, 1}
+
+    # Both slots pinned: the frame lives in its own array instead of overwriting one
+    capture(grabber, 3)
+    third = grabber.get_latest(timeout=0)
+    assert third.ring is None and third.frame[0, 0, 0] == 3
+    assert first.frame[0, 0, 0] == 1 and second.frame[0, 0, 0] == 2
+    third.release()
+
+    first.release()
+    capture(grabber, 4)
+    fourth = grabber.get_latest(timeout=0)
+    assert fourth.slot_id == first.slot_id and fourth.frame[0, 0, 0] == 4
+    fourth.release()
+    second.release()
+
+
+def test_end_of_stream_and_shutdown_free_the_ring():
+    cap = FakeCapture()
+    grabber = FrameGrabber(cap, ring_slots=2)
+    grabber.start()
+    capture(grabber, 1)
+    frame = grabber.get_latest(timeout=0)
+    name = frame.ring.name
+    frame.release()
+    del frame
+
+    cap.push(None)
+    wait_until(lambda: grabber.end_of_stream)
+    assert grabber.read_failures == 0
+
+    grabber.stop()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,99 @@
+"""Deadline-based frame pacing"""
+import collections
+import math
+import time
+
+
+class FramePacer:
+    """Keeps a loop running at a target frame rate.
+
+    Deadlines are computed from a monotonic clock, so only the remaining slack
+    of each frame period is slept instead of a fixed delay after the work.
+    When a frame overruns its period the schedule skips ahead to the next
+    future deadline rather than trying to catch up with a burst of frames.
+    """
+    def __init__(self, target_fps, window=60):
+        self.target_fps = None
+        self.period = None
+        self.set_target_fps(target_fps)
+
+        self._next_deadline = None
+        self._last_tick = None
+        self._intervals = collections.deque(maxlen=window)
+
+        # Statistics
+        self.frames_paced = 0
+        self.frames_skipped = 0
+
+    def set_target_fps(self, target_fps):
+        """Change target frame rate. The new period applies from the next frame"""
+        if target_fps <= 0:
+            raise ValueError(f"Target FPS must be positive: {target_fps}")
+        self.target_fps = target_fps
+        self.period = 1.0 / target_fps
+
+    def reset(self):
+        """Forget the current schedule (e.g. after the loop was paused)"""
+        self._next_deadline = None
+        self._last_tick = None
+        self._intervals.clear()
+
+    def wait(self):
+        """Sleep until the next frame deadline.
+
+        Returns:
+            float: Time in seconds spent sleeping
+        """
+        now = time.monotonic()
+        slept = 0.0
+
+        if self._next_deadline is None:
+            # First frame starts immediately
+            self._next_deadline = now + self.period
+        else:
+            slack = self._next_deadline - now
+            if slack > 0:
+                time.sleep(slack)
+                slept = slack
+                self._next_deadline += self.period
+            else:
+                # Overrun: skip the missed deadlines and keep the phase
+                missed = math.floor(-slack / self.period) + 1
+                self.frames_skipped += missed - 1
+                self._next_deadline += missed * self.period
+
+            now = time.monotonic()
+
+        self._record_tick(now)
+        return slept
+
+    def _record_tick(self, now):
+        """Remember the interval between consecutive frame starts"""
+        if self._last_tick is not None:
+            self._intervals.append(now - self._last_tick)
+        self._last_tick = now
+        self.frames_paced += 1
+
+    def achieved_fps(self):
+        """Average frame rate over the recent window"""
+        if not self._intervals:
+            return 0.0
+        mean_interval = sum(self._intervals) / len(self._intervals)
+        return 1.0 / mean_interval if mean_interval > 0 else 0.0
+
+    def jitter_ms(self):
+        """Standard deviation of frame intervals from the target period, in ms"""
+        if not self._intervals:
+            return 0.0
+        variance = sum((i - self.period) ** 2 for i in self._intervals) / len(self._intervals)
+        return math.sqrt(variance) * 1000
+
+    def get_stats(self):
+        """Get pacing statistics"""
+        return {
+            'target_fps': self.target_fps,
+            'achieved_fps': self.achieved_fps(),
+            'jitter_ms': self.jitter_ms(),
+            'frames_paced': self.frames_paced,
+            'frames_skipped': self.frames_skipped,
+        }
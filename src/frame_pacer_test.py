@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+
+from . import frame_pacer
+from .frame_pacer import FramePacer
+
+# Binary fraction, so deadlines add up exactly
+PERIOD = 0.125
+
+
+class FakeClock:
+    """Stand-in for the time module: sleeping advances the clock"""
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture(name="clock")
+def clock_fixture():
+    clock = FakeClock()
+    with mock.patch.object(frame_pacer, 'time', clock):
+        yield clock
+
+
+def run_frames(pacer, clock, work_times):
+    """Pace one frame per work time and return the frame start times"""
+    starts = []
+    for work in work_times:
+        pacer.wait()
+        starts.append(clock.now)
+        clock.now += work
+    return starts
+
+
+def test_frames_start_on_the_deadline_grid(clock):
+    pacer = FramePacer(1 / PERIOD)
+    # Varying work within the period must not shift later frames
+    starts = run_frames(pacer, clock, [0.01, 0.1, 0.03, 0.12, 0.0] * 200)
+
+    assert starts == [i * PERIOD for i in range(1000)]
+    assert pacer.frames_skipped == 0
+    assert pacer.achieved_fps() == pytest.approx(1 / PERIOD)
+    assert pacer.jitter_ms() == pytest.approx(0.0)
+
+
+def test_overrun_skips_ahead_and_keeps_the_phase(clock):
+    pacer = FramePacer(1 / PERIOD)
+    # The second frame overruns by more than two periods
+    starts = run_frames(pacer, clock, [0.05, 0.3, 0.05, 0.05])
+
+    # The late frame starts right away, the next one on the following grid deadline
+    assert starts == [0.0, PERIOD, 0.425, 4 * PERIOD]
+    assert pacer.frames_skipped == 1
+    assert pacer.frames_paced == 4
+
+
+def test_reset_and_rate_change_restart_the_schedule(clock):
+    pacer = FramePacer(1 / PERIOD)
+    run_frames(pacer, clock, [0.0, 0.0])
+
+    # After a pause the schedule starts over instead of counting the pause as skipped frames
+    clock.now += 10.0
+    pacer.reset()
+    pacer.set_target_fps(1 / (2 * PERIOD))
+    start = clock.now
+    starts = run_frames(pacer, clock, [0.0, 0.0, 0.0])
+    assert starts == [start, start + 2 * PERIOD, start + 4 * PERIOD]
+    assert pacer.frames_skipped == 0
+
+
+def test_target_fps_must_be_positive():
+    with pytest.raises(ValueError):
+        FramePacer(0)
@@ -0,0 +1,152 @@
+"""Reusable output frames for dirty-region rendering"""
+import threading
+
+import numpy as np
+
+
+class PooledFrame:
+    """A pooled frame buffer and what was last drawn into it"""
+    def __init__(self, array, key):
+        self.array = array
+        self.key = key  # Background the buffer was last restored from
+        self.dirty = []  # (x0, y0, x1, y1) regions drawn over the background
+        self.in_use = True  # Handed out and not released yet
+
+
+class FramePool:
+    """Frame buffers reused once their consumer releases them.
+
+    Rendered frames travel to the UI thread through queues, so a buffer may
+    only be overwritten after the result holding it has been displayed or
+    dropped; whoever finishes with a frame calls release(). A frame that is
+    never released only costs its slot: once the pool is full, acquire()
+    returns None and the caller falls back to a plain copy.
+
+    Reused buffers are restored from the background only inside their
+    previous dirty regions, merged where they overlap. When the regions
+    cover more than full_restore_ratio of the frame, one full copy is
+    cheaper than many small ones.
+    """
+    def __init__(self, max_frames=6, full_restore_ratio=0.5):
+        self.max_frames = max_frames
+        self.full_restore_ratio = full_restore_ratio
+        self._frames = []
+        self._lock = threading.Lock()  # acquire() runs in the render thread, release() in the UI thread
+
+        # Statistics
+        self.frames_reused = 0
+        self.frames_allocated = 0
+        self.full_restores = 0
+        self.pixels_restored = 0
+
+    def acquire(self, background, key):
+        """Frame showing background, reusing a released buffer when possible.
+
+        Returns a PooledFrame, or None when all buffers are in use and the
+        pool is full (the caller falls back to a plain copy).
+        """
+        with self._lock:
+            frame = next((frame for frame in self._frames
+                          if not frame.in_use and frame.array.shape == background.shape), None)
+            if frame is None:
+                if len(self._frames) >= self.max_frames:
+                    # Drop a released buffer of another size to make room, otherwise give up
+                    stale = next((frame for frame in self._frames if not frame.in_use), None)
+                    if stale is None:
+                        return None
+                    self._frames.remove(stale)
+                frame = PooledFrame(np.empty_like(background), None)
+                self._frames.append(frame)
+                self.frames_allocated += 1
+            else:
+                self.frames_reused += 1
+            frame.in_use = True
+
+        self._restore(frame, background, key)
+        return frame
+
+    def _restore(self, frame, background, key):
+        """Copy the background back over what was drawn into frame"""
+        height, width = background.shape[:2]
+        rects = merge_rects(frame.dirty) if frame.key == key else None
+        if rects is None or sum(rect_area(rect) for rect in rects) > self.full_restore_ratio * width * height:
+            np.copyto(frame.array, background)
+            self.full_restores += 1
+            self.pixels_restored += width * height
+        else:
+            for x0, y0, x1, y1 in rects:
+                np.copyto(frame.array[y0:y1, x0:x1], background[y0:y1, x0:x1])
+                self.pixels_restored += (x1 - x0) * (y1 - y0)
+        frame.key = key
+        frame.dirty = []
+
+    def release(self, array):
+        """Return the buffer of array to the pool. Returns False if the pool does not own it"""
+        with self._lock:
+            for frame in self._frames:
+                if frame.array is array:
+                    frame.in_use = False
+                    return True
+        return False
+
+    def detach(self, array):
+        """Hand the buffer of array over to its holder for good; release() then ignores it"""
+        with self._lock:
+            self._frames = [frame for frame in self._frames if frame.array is not array]
+
+    def clear(self):
+        """Forget all buffers (arrays still in use stay valid for their holders)"""
+        with self._lock:
+            self._frames = []
+
+    def get_stats(self):
+        """Reuse statistics"""
+        with self._lock:
+            in_use = sum(frame.in_use for frame in self._frames)
+            frames = len(self._frames)
+        return {
+            'frames': frames,
+            'frames_in_use': in_use,
+            'frames_reused': self.frames_reused,
+            'frames_allocated': self.frames_allocated,
+            'full_restores': self.full_restores,
+            'pixels_restored': self.pixels_restored,
+        }
+
+
+def union_rect(a, b):
+    """Bounding box of two (x0, y0, x1, y1) rectangles, either may be None"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def rect_area(rect):
+    """Area of an (x0, y0, x1, y1) rectangle"""
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+
+def _overlaps(a, b):
+    """True if two rectangles share any pixel"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def merge_rects(rects):
+    """Replace overlapping rectangles by their bounding boxes until none overlap.
+
+    The result covers every input pixel exactly once, so restoring it copies
+    no pixel twice.
+    """
+    merged = []
+    for rect in rects:
+        # A grown box may now overlap boxes merged earlier, so keep absorbing until it is stable
+        overlapping = [other for other in merged if _overlaps(rect, other)]
+        while overlapping:
+            for other in overlapping:
+                merged.remove(other)
+                rect = union_rect(rect, other)
+            overlapping = [other for other in merged if _overlaps(rect, other)]
+        merged.append(rect)
+    return merged
@@ -0,0 +1,186 @@
+"""Shared-memory ring of preallocated frame slots"""
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Header layout (int64 values): [write_sequence, latest_slot, slot sequences...]
+_HEADER_WRITE_SEQUENCE = 0
+_HEADER_LATEST_SLOT = 1
+_HEADER_FIELDS = 2
+_HEADER_ALIGNMENT = 64
+
+
+class SharedFrameRing:
+    """Fixed number of frame slots backed by one multiprocessing.shared_memory block.
+
+    Frames are exchanged by slot id: a writer fills a slot in place and
+    publishes it, readers in this or another process map the same slot as a
+    NumPy view. Every slot carries the sequence number it was published with,
+    so a reader can tell whether the slot was overwritten meanwhile.
+
+    Slots are pinned while a reader of the owning process uses them (the owner
+    pins on behalf of worker processes too); the writer never reuses a pinned
+    slot or the latest published one.
+    """
+    def __init__(self, slots, shape, dtype=np.uint8, name=None, create=True):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = create
+
+        self._slot_size = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_size = (_HEADER_FIELDS + slots) * 8
+        self._header_size = -(-header_size // _HEADER_ALIGNMENT) * _HEADER_ALIGNMENT
+
+        self._shm = shared_memory.SharedMemory(
+            name=name,
+            create=create,
+            size=self._header_size + slots * self._slot_size if create else 0,
+        )
+        self._header = np.ndarray((_HEADER_FIELDS + slots,), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray(
+            (slots,) + self.shape,
+            dtype=self.dtype,
+            buffer=self._shm.buf,
+            offset=self._header_size,
+        )
+
+        if create:
+            self._header[:] = 0
+            self._header[_HEADER_LATEST_SLOT] = -1
+
+        # Process-local pin counts and writer cursor
+        self._lock = threading.Lock()
+        self._pins = [0] * slots
+        self._cursor = 0
+
+    @property
+    def name(self):
+        """Shared memory block name"""
+        return self._shm.name
+
+    def descriptor(self):
+        """Picklable description used by other processes to attach to the ring"""
+        return self.name, self.slots, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Attach to a ring created by another process"""
+        name, slots, shape, dtype = descriptor
+        return cls(slots, shape, dtype, name=name, create=False)
+
+    def slot(self, slot_id, shape=None):
+        """NumPy view of a slot. A smaller shape maps only the beginning of the slot"""
+        frame = self._frames[slot_id]
+        if shape is None or tuple(shape) == self.shape:
+            return frame
+        count = int(np.prod(shape))
+        if count > frame.size:
+            raise ValueError(f"Shape {shape} does not fit into ring slot {self.shape}")
+        return frame.reshape(-1)[:count].reshape(shape)
+
+    def fits(self, shape):
+        """True if a frame of the given shape fits into a slot"""
+        return int(np.prod(shape)) <= int(np.prod(self.shape))
+
+    def acquire(self):
+        """Get a slot the writer may fill: not pinned and not the latest published one.
+
+        Returns:
+            int: Slot id or None if every slot is in use
+        """
+        with self._lock:
+            latest = int(self._header[_HEADER_LATEST_SLOT])
+            for offset in range(self.slots):
+                slot_id = (self._cursor + offset) % self.slots
+                if self._pins[slot_id] == 0 and slot_id != latest:
+                    self._cursor = (slot_id + 1) % self.slots
+                    # Invalidate readers still holding the old contents
+                    self._header[_HEADER_FIELDS + slot_id] = 0
+                    return slot_id
+        return None
+
+    def publish(self, slot_id):
+        """Mark a filled slot as the latest frame.
+
+        Returns:
+            int: Sequence number of the published frame
+        """
+        with self._lock:
+            sequence = int(self._header[_HEADER_WRITE_SEQUENCE]) + 1
+            self._header[_HEADER_WRITE_SEQUENCE] = sequence
+            self._header[_HEADER_FIELDS + slot_id] = sequence
+            self._header[_HEADER_LATEST_SLOT] = slot_id
+        return sequence
+
+    def latest(self):
+        """Latest published slot as (slot_id, sequence), or None"""
+        slot_id = int(self._header[_HEADER_LATEST_SLOT])
+        if slot_id < 0:
+            return None
+        return slot_id, int(self._header[_HEADER_FIELDS + slot_id])
+
+    def sequence(self, slot_id):
+        """Sequence number the slot was last published with (0 while being written)"""
+        return int(self._header[_HEADER_FIELDS + slot_id])
+
+    def is_valid(self, slot_id, sequence):
+        """True if the slot still holds the frame published with sequence"""
+        return self.sequence(slot_id) == sequence
+
+    def pin(self, slot_id):
+        """Protect a slot from being reused by the writer"""
+        with self._lock:
+            self._pins[slot_id] += 1
+
+    def unpin(self, slot_id):
+        """Release a slot pinned with pin()"""
+        with self._lock:
+            self._pins[slot_id] = max(0, self._pins[slot_id] - 1)
+
+    def close(self):
+        """Unmap the ring from this process and free it if this process created it"""
+        self._header = None
+        self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views are still referenced somewhere; the mapping goes away with them
+            pass
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameRef:
+    """A captured frame living in a ring slot (or a standalone array).
+
+    The slot stays pinned until release() is called.
+    """
+    def __init__(self, frame, timestamp, sequence, ring=None, slot_id=None, read_ms=0.0):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.read_ms = read_ms  # Time the capture device took to deliver the frame
+        self.sequence = sequence
+        self.ring = ring
+        self.slot_id = slot_id
+        self._released = ring is None
+
+    @property
+    def age(self):
+        """Seconds since the frame was captured"""
+        return time.monotonic() - self.timestamp
+
+    def is_valid(self):
+        """True unless the slot was overwritten"""
+        return self.ring is None or self.ring.is_valid(self.slot_id, self.sequence)
+
+    def release(self):
+        """Unpin the slot so the writer can reuse it"""
+        if not self._released:
+            self._released = True
+            self.ring.unpin(self.slot_id)
@@ -0,0 +1,106 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from .frame_ring import FrameRef, SharedFrameRing
+
+SHAPE = (4, 6, 3)
+
+
+@pytest.fixture(name="ring")
+def ring_fixture():
+    ring = SharedFrameRing(3, SHAPE)
+    yield ring
+    ring.close()
+
+
+def write(ring, value):
+    """Fill a free slot and publish it; returns (slot_id, sequence)"""
+    slot_id = ring.acquire()
+    ring.slot(slot_id)[:] = value
+    return slot_id, ring.publish(slot_id)
+
+
+def test_publish_numbers_frames(ring):
+    assert ring.latest() is None
+    published = [write(ring, value) for value in (1, 2, 3)]
+
+    assert [sequence for _, sequence in published] == [1, 2, 3]
+    assert ring.latest() == published[-1]
+    slot_id, sequence = published[-1]
+    assert ring.is_valid(slot_id, sequence)
+    assert ring.slot(slot_id)[0, 0, 0] == 3
+
+
+def test_acquire_skips_pinned_and_latest_slots(ring):
+    first, _ = write(ring, 1)
+    ring.pin(first)
+    second, _ = write(ring, 2)
+    # Free slots only: the first is pinned and the second is the latest frame
+    third = ring.acquire()
+    assert third not in (first, second)
+    ring.publish(third)
+
+    ring.pin(third)
+    assert ring.acquire() == second
+
+    # Pins are counted
+    ring.pin(first)
+    ring.unpin(first)
+    ring.publish(second)
+    assert ring.acquire() is None
+    ring.unpin(first)
+    assert ring.acquire() == first
+
+
+def test_acquire_invalidates_the_old_frame(ring):
+    slot_id, sequence = write(ring, 1)
+    write(ring, 2)
+    write(ring, 3)
+    assert ring.is_valid(slot_id, sequence)
+
+    # The writer wraps around to the first slot again
+    assert ring.acquire() == slot_id
+    assert not ring.is_valid(slot_id, sequence)
+    assert ring.sequence(slot_id) == 0
+
+
+def test_frame_ref_unpins_once(ring):
+    slot_id, sequence = write(ring, 1)
+    ring.pin(slot_id)
+    ref = FrameRef(ring.slot(slot_id), 0.0, sequence, ring, slot_id)
+    write(ring, 2)
+    assert ref.is_valid()
+
+    ref.release()
+    ref.release()
+    write(ring, 3)
+    assert ring.acquire() == slot_id
+    assert not ref.is_valid()
+
+
+def test_smaller_frames_map_the_slot_start(ring):
+    slot_id = ring.acquire()
+    assert ring.fits((2, 6, 3)) and not ring.fits((8, 6, 3))
+    small = ring.slot(slot_id, (2, 6, 3))
+    assert np.shares_memory(small, ring.slot(slot_id))
+    with pytest.raises(ValueError):
+        ring.slot(slot_id, (8, 6, 3))
+
+
+def test_attached_ring_shares_frames_and_close_unlinks():
+    ring = SharedFrameRing(2, SHAPE)
+    slot_id, sequence = write(ring, 7)
+
+    attached = SharedFrameRing.attach(ring.descriptor())
+    assert attached.latest() == (slot_id, sequence)
+    assert attached.slot(slot_id)[0, 0, 0] == 7
+    # Only the creating process frees the block
+    attached.close()
+    shared_memory.SharedMemory(name=ring.name).close()
+
+    name = ring.name
+    ring.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
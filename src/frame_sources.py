@@ -0,0 +1,331 @@
+"""Frame sources feeding the processing pipeline"""
+import os
+
+import cv2 as cv
+import numpy as np
+
+from .config import (
+    CAPTURE_RESOLUTIONS, CAPTURE_RESOLUTIONS_KEY,
+    CAPTURE_FPS, CAPTURE_FPS_KEY,
+)
+from .frame_pacer import FramePacer
+from .settings import Settings
+
+SOURCE_CAMERA = 'camera'
+SOURCE_VIDEO = 'video'
+SOURCE_IMAGES = 'images'
+SOURCE_SYNTHETIC = 'synthetic'
+
+IMAGE_EXTENSIONS = ('.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp')
+
+# Frame size of the synthetic source when none is given
+SYNTHETIC_RESOLUTION = (1280, 720)
+
+
+class FrameSource:
+    """Base class of frame sources.
+
+    Sources implement the part of the cv.VideoCapture interface the pipeline
+    uses (read, set, get, isOpened, release), so FrameGrabber and the
+    resolution negotiation work the same for a live camera and for recorded
+    or generated input. read() accepts an optional preallocated image and
+    fills it in place when its shape matches.
+    """
+    # Whether the capture resolution ladder should be negotiated on open
+    negotiate_resolution = False
+
+    def __init__(self, fps, realtime=True):
+        self.fps = fps
+        self.realtime = realtime
+        self._pacer = FramePacer(fps) if realtime else None
+        self._opened = True
+        self.ended = False  # A source that does not loop ran out of frames
+
+    def isOpened(self):  # pylint: disable=invalid-name
+        """True while frames can be read"""
+        return self._opened
+
+    def read(self, image=None):
+        """Read the next frame.
+
+        Returns:
+            tuple: (success, frame) like cv.VideoCapture.read
+        """
+        if not self._opened:
+            return False, None
+        if self._pacer is not None:
+            self._pacer.wait()
+        return self._read(image)
+
+    def set(self, prop, value):
+        """Set a capture property. Returns False if the source cannot change it"""
+        if prop == cv.CAP_PROP_FPS and value:
+            self.fps = value
+            if self._pacer is not None:
+                self._pacer.set_target_fps(value)
+            return True
+        return False
+
+    def get(self, prop):
+        """Get a capture property"""
+        if prop == cv.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv.CAP_PROP_FRAME_WIDTH:
+            return float(self.frame_size()[0])
+        if prop == cv.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frame_size()[1])
+        return 0.0
+
+    def release(self):
+        """Release the source"""
+        self._opened = False
+
+    def frame_size(self):
+        """Current frame size as (width, height)"""
+        raise NotImplementedError
+
+    def _read(self, image):
+        """Produce the next frame, into image if possible"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _output(frame, image):
+        """Return frame, copied into image when a matching buffer was given"""
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return image
+        return frame
+
+
+class CameraSource(FrameSource):
+    """Live camera; the driver sets the pace"""
+    negotiate_resolution = True
+
+    def __init__(self, index):
+        super().__init__(fps=0, realtime=False)
+        self.cap = cv.VideoCapture(index)
+
+    def isOpened(self):  # pylint: disable=invalid-name
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        # The driver paces the camera, no pacer needed
+        return self._read(image)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+    def frame_size(self):
+        return int(self.cap.get(cv.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+
+    def _read(self, image):
+        return self.cap.read(image)
+
+
+class VideoFileSource(FrameSource):
+    """Video file played back in real time or as fast as it decodes, optionally looping at the end"""
+    def __init__(self, path, realtime=True, loop=True):
+        self.cap = cv.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Failed to open video file: {path}")
+        super().__init__(self.cap.get(cv.CAP_PROP_FPS) or 30, realtime)
+        self.path = path
+        self.loop = loop
+
+    def frame_size(self):
+        return int(self.cap.get(cv.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv.CAP_PROP_FRAME_HEIGHT))
+
+    def set(self, prop, value):  # pylint: disable=unused-argument
+        # Playback speed and size follow the file, not the requested camera settings
+        return False
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+    def _read(self, image):
+        ret, frame = self.cap.read(image)
+        if not ret:
+            if not self.loop:
+                self.ended = True
+                return False, None
+            self.cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        return ret, frame
+
+
+class ImageDirectorySource(FrameSource):
+    """Images of a directory in name order, shown at a fixed frame rate"""
+    def __init__(self, path, fps=30, realtime=True, loop=True):
+        super().__init__(fps, realtime)
+        self.paths = sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise RuntimeError(f"No images found in directory: {path}")
+        self.loop = loop
+        self._index = 0
+        self._size = None
+
+    def frame_size(self):
+        if self._size is None:
+            frame = cv.imread(self.paths[0])
+            self._size = (frame.shape[1], frame.shape[0]) if frame is not None else (0, 0)
+        return self._size
+
+    def _read(self, image):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                self.ended = True
+                return False, None
+            self._index = 0
+
+        frame = cv.imread(self.paths[self._index])
+        self._index += 1
+        if frame is None:
+            return False, None
+
+        self._size = (frame.shape[1], frame.shape[0])
+        return True, self._output(frame, image)
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames: a gradient with a moving disc, for runs without any input device"""
+    def __init__(self, width, height, fps=30, realtime=True):
+        super().__init__(fps, realtime)
+        self._background = None
+        self._size = (int(width), int(height))
+        self._frame_index = 0
+
+    def frame_size(self):
+        return self._size
+
+    def set(self, prop, value):
+        if prop == cv.CAP_PROP_FRAME_WIDTH:
+            self._size = (int(value), self._size[1])
+            return True
+        if prop == cv.CAP_PROP_FRAME_HEIGHT:
+            self._size = (self._size[0], int(value))
+            return True
+        return super().set(prop, value)
+
+    def _read(self, image):
+        width, height = self._size
+        if self._background is None or self._background.shape[:2] != (height, width):
+            gradient = np.linspace(40, 200, width, dtype=np.uint8)
+            self._background = np.repeat(gradient[np.newaxis, :, np.newaxis], height, axis=0).repeat(3, axis=2)
+
+        if image is not None and image.shape == self._background.shape:
+            frame = image
+            np.copyto(frame, self._background)
+        else:
+            frame = self._background.copy()
+
+        # Disc circling around the frame center
+        angle = self._frame_index * 2 * np.pi / 120
+        radius = min(width, height) // 6
+        center = (
+            int(width / 2 + np.cos(angle) * width / 4),
+            int(height / 2 + np.sin(angle) * height / 4),
+        )
+        cv.circle(frame, center, radius, (60, 120, 220), -1, cv.LINE_AA)
+        self._frame_index += 1
+        return True, frame
+
+
+def parse_source_spec(spec):
+    """Split a source spec into (kind, argument).
+
+    Accepted forms: 'camera:0', 'video:<path>', 'images:<dir>',
+    'synthetic' or 'synthetic:<width>x<height>'. A bare camera index, video
+    file or directory path is recognized as well.
+    """
+    spec = str(spec)
+    kind, separator, argument = spec.partition(':')
+    if separator and kind in (SOURCE_CAMERA, SOURCE_VIDEO, SOURCE_IMAGES, SOURCE_SYNTHETIC):
+        return kind, argument
+    if spec == SOURCE_SYNTHETIC:
+        return SOURCE_SYNTHETIC, ''
+    if spec.isdigit():
+        return SOURCE_CAMERA, spec
+    if os.path.isdir(spec):
+        return SOURCE_IMAGES, spec
+    if os.path.isfile(spec):
+        return SOURCE_VIDEO, spec
+    raise ValueError(f"Unknown frame source: {spec}")
+
+
+def open_frame_source(spec, realtime=True, fps=30, loop=True):
+    """Create the frame source described by spec (see parse_source_spec).
+
+    loop restarts video files and image directories at their end; otherwise
+    they report ended once all frames were read.
+    """
+    kind, argument = parse_source_spec(spec)
+
+    if kind == SOURCE_CAMERA:
+        return CameraSource(int(argument or 0))
+    if kind == SOURCE_VIDEO:
+        return VideoFileSource(argument, realtime=realtime, loop=loop)
+    if kind == SOURCE_IMAGES:
+        return ImageDirectorySource(argument, fps=fps, realtime=realtime, loop=loop)
+
+    width, height = SYNTHETIC_RESOLUTION
+    if argument:
+        try:
+            width, height = (int(value) for value in argument.lower().split('x'))
+        except ValueError as e:
+            raise ValueError(f"Invalid synthetic frame size: {argument}") from e
+    return SyntheticSource(width, height, fps=fps, realtime=realtime)
+
+
+def negotiate_resolution(cap):
+    """Try capture resolutions in order and keep the first one the camera delivers.
+
+    If the camera refuses all of them, its own resolution is used instead of failing.
+
+    Returns:
+        tuple: Actual capture resolution (width, height)
+    """
+    frame = None
+    for width, height in Settings.get(CAPTURE_RESOLUTIONS_KEY, CAPTURE_RESOLUTIONS):
+        cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+
+        # Test camera capture
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            continue
+        if frame.shape[1] == width and frame.shape[0] == height:
+            return width, height
+
+    if frame is None:
+        raise RuntimeError("Failed to capture frame from camera")
+
+    print(f"Camera does not support requested resolutions, using {frame.shape[1]}x{frame.shape[0]}")
+    return frame.shape[1], frame.shape[0]
+
+
+def open_capture(spec, realtime=True, loop=True):
+    """Open a frame source and apply the configured frame rate and resolution"""
+    capture_fps = Settings.get(CAPTURE_FPS_KEY, CAPTURE_FPS)
+    cap = open_frame_source(spec, realtime, capture_fps, loop)
+    if not cap.isOpened():
+        raise RuntimeError("Failed to connect to camera")
+
+    # Set camera parameters, falling back to lower resolutions
+    cap.set(cv.CAP_PROP_FPS, capture_fps)
+    if cap.negotiate_resolution:
+        negotiate_resolution(cap)
+    return cap
@@ -0,0 +1,118 @@
+import os
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from .frame_sources import (
+    ImageDirectorySource, SyntheticSource, VideoFileSource, open_frame_source, parse_source_spec,
+)
+
+WIDTH, HEIGHT = 64, 48
+FRAMES = 5
+
+
+def make_frame(index):
+    return np.full((HEIGHT, WIDTH, 3), index * 40, dtype=np.uint8)
+
+
+@pytest.fixture(name="image_dir")
+def image_dir_fixture(tmp_path):
+    for index in range(FRAMES):
+        cv.imwrite(os.path.join(tmp_path, f"{index:03d}.png"), make_frame(index))
+    # Not an image, skipped
+    (tmp_path / "notes.txt").write_text("")
+    return str(tmp_path)
+
+
+@pytest.fixture(name="video_path")
+def video_path_fixture(tmp_path):
+    path = os.path.join(tmp_path, "clip.avi")
+    writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*'MJPG'), 30, (WIDTH, HEIGHT))
+    if not writer.isOpened():
+        pytest.skip("OpenCV cannot write MJPG video here")
+    for index in range(FRAMES):
+        writer.write(make_frame(index))
+    writer.release()
+    return path
+
+
+def read_all(source, limit=3 * FRAMES):
+    """Read until the source fails, at most limit frames"""
+    frames = []
+    for _ in range(limit):
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
+
+def test_image_directory_ends_without_loop(image_dir):
+    source = ImageDirectorySource(image_dir, realtime=False, loop=False)
+    frames = read_all(source)
+    assert [int(frame[0, 0, 0]) for frame in frames] == [index * 40 for index in range(FRAMES)]
+    assert source.ended
+    assert source.read() == (False, None)
+
+
+def test_image_directory_loops(image_dir):
+    source = ImageDirectorySource(image_dir, realtime=False)
+    frames = read_all(source, 2 * FRAMES + 1)
+    assert len(frames) == 2 * FRAMES + 1
+    assert int(frames[FRAMES][0, 0, 0]) == 0
+    assert not source.ended
+
+
+def test_video_file_ends_without_loop(video_path):
+    source = VideoFileSource(video_path, realtime=False, loop=False)
+    assert source.frame_size() == (WIDTH, HEIGHT)
+    assert len(read_all(source)) == FRAMES
+    assert source.ended
+
+
+def test_video_file_loops(video_path):
+    source = VideoFileSource(video_path, realtime=False)
+    assert len(read_all(source, 2 * FRAMES + 1)) == 2 * FRAMES + 1
+    assert not source.ended
+
+
+def test_read_fills_the_given_image(image_dir):
+    source = ImageDirectorySource(image_dir, realtime=False)
+    image = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    ret, frame = source.read(image)
+    assert ret and frame is image
+
+
+def test_synthetic_source_follows_size_changes():
+    source = SyntheticSource(WIDTH, HEIGHT, realtime=False)
+    first = source.read()[1]
+    second = source.read()[1]
+    assert first.shape == (HEIGHT, WIDTH, 3)
+    # The disc moves between frames
+    assert not np.array_equal(first, second)
+
+    source.set(cv.CAP_PROP_FRAME_WIDTH, 32)
+    source.set(cv.CAP_PROP_FRAME_HEIGHT, 24)
+    assert source.read()[1].shape == (24, 32, 3)
+    assert source.get(cv.CAP_PROP_FRAME_WIDTH) == 32
+
+
+def test_parse_source_spec(image_dir, tmp_path):
+    assert parse_source_spec('camera:1') == ('camera', '1')
+    assert parse_source_spec('2') == ('camera', '2')
+    assert parse_source_spec('synthetic') == ('synthetic', '')
+    assert parse_source_spec(image_dir) == ('images', image_dir)
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"")
+    assert parse_source_spec(str(clip)) == ('video', str(clip))
+    with pytest.raises(ValueError):
+        parse_source_spec('nothing-here')
+
+
+def test_open_frame_source(image_dir):
+    source = open_frame_source(f'images:{image_dir}', realtime=False, loop=False)
+    assert isinstance(source, ImageDirectorySource) and not source.loop
+    assert open_frame_source('synthetic:32x24', realtime=False).frame_size() == (32, 24)
+    with pytest.raises(ValueError):
+        open_frame_source('synthetic:wide', realtime=False)
@@ -0,0 +1,255 @@
+"""Headless tracker entry point: no Tk window, no overlay, metrics on a stream.
+
+Usage:
+    python -m src.headless --source video:recording.mp4 --no-render > metrics.jsonl
+"""
+import argparse
+import contextlib
+import json
+import signal
+import struct
+import sys
+import time
+
+import cv2 as cv
+
+from .config import (
+    APP_TITLE,
+    MIRROR_EFFECT_ENABLED, MIRROR_EFFECT_KEY,
+    SHOW_CAMERA, SHOW_CAMERA_KEY,
+    SHOW_PERF_HUD, SHOW_PERF_HUD_KEY,
+    STRABISMUS_THRESHOLD, STRABISMUS_THRESHOLD_KEY,
+    FRAME_SOURCE, FRAME_SOURCE_KEY,
+    FRAME_SOURCE_REALTIME, FRAME_SOURCE_REALTIME_KEY,
+)
+from .frame_sources import open_capture
+from .inference_backend import create_inference_backend
+from .main_model import MainModel
+from .settings import Settings
+
+FORMAT_JSONL = 'jsonl'
+FORMAT_BINARY = 'binary'
+
+# Binary metrics record: frame index, capture timestamp, normalized eye distance,
+# threshold, frame age (ms), achieved fps, face detected, strabismus detected
+METRICS_RECORD = struct.Struct('<QdffffBB')
+
+
+class StateValue:
+    """Plain stand-in for a Tk variable"""
+    def __init__(self, value):
+        self._value = value
+
+    def get(self):
+        """Get value"""
+        return self._value
+
+    def set(self, value):
+        """Set value"""
+        self._value = value
+
+
+class HeadlessAppState:
+    """Subset of AppState the processing pipeline reads, without Tk"""
+    def __init__(self):
+        self.mirror_effect = StateValue(Settings.get(MIRROR_EFFECT_KEY, MIRROR_EFFECT_ENABLED))
+        self.show_camera = StateValue(Settings.get(SHOW_CAMERA_KEY, SHOW_CAMERA))
+        self.show_perf_hud = StateValue(Settings.get(SHOW_PERF_HUD_KEY, SHOW_PERF_HUD))
+        self.threshold_value = StateValue(Settings.get(STRABISMUS_THRESHOLD_KEY, STRABISMUS_THRESHOLD))
+
+
+class HeadlessApp:
+    """Stands in for the main window as MainModel's app reference"""
+    def __init__(self):
+        self.app_state = HeadlessAppState()
+
+    @staticmethod
+    def format_eye_distance(eye_distance):
+        """Format eye distance for display"""
+        if eye_distance is None:
+            return "N/A"
+        return f"{eye_distance:.3f}"
+
+
+class MetricsWriter:
+    """Writes one metrics record per processed frame as JSON lines or binary records"""
+    def __init__(self, stream, output_format=FORMAT_JSONL):
+        self.stream = stream
+        self.output_format = output_format
+        self.frames = 0
+
+    def write(self, results):
+        """Write metrics of one pipeline result"""
+        face_detected = bool(results['mesh_results'].multi_face_landmarks)
+        eye_distance = float(results['normalized_eye_distance'])
+        threshold = float(results['threshold_value'])
+        strabismus_detected = eye_distance > threshold
+
+        if self.output_format == FORMAT_BINARY:
+            self.stream.write(METRICS_RECORD.pack(
+                self.frames,
+                results['frame_timestamp'],
+                eye_distance,
+                threshold,
+                results['frame_age_ms'],
+                results['fps'],
+                face_detected,
+                strabismus_detected,
+            ))
+        else:
+            self.stream.write(json.dumps({
+                'frame': self.frames,
+                'timestamp': results['frame_timestamp'],
+                'face_detected': face_detected,
+                'normalized_eye_distance': eye_distance,
+                'threshold': threshold,
+                'strabismus_detected': strabismus_detected,
+                'frame_age_ms': round(results['frame_age_ms'], 3),
+                'fps': round(results['fps'], 2),
+                'power_state': results['power_state'],
+            }) + '\n')
+        self.stream.flush()
+        self.frames += 1
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.headless',
+        description=f"{APP_TITLE} without GUI: per-frame metrics on stdout or a file",
+    )
+    parser.add_argument(
+        '--source',
+        help="frame source: 'camera:<index>', 'video:<path>', 'images:<directory>' "
+             "or 'synthetic[:<width>x<height>]' (default: camera from settings)",
+    )
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help="play video files and image directories as fast as possible instead of in real time",
+    )
+    parser.add_argument(
+        '--loop',
+        action='store_true',
+        help="restart video files and image directories at their end instead of stopping",
+    )
+    parser.add_argument(
+        '--format',
+        choices=(FORMAT_JSONL, FORMAT_BINARY),
+        default=FORMAT_JSONL,
+        help=f"metrics format (binary: little-endian records of {METRICS_RECORD.size} bytes, "
+             f"struct '{METRICS_RECORD.format}')",
+    )
+    parser.add_argument('--output', default='-', help="metrics file (default: stdout)")
+    parser.add_argument(
+        '--no-render',
+        action='store_true',
+        help="only compute metrics, skip drawing frames",
+    )
+    parser.add_argument('--frames', type=int, help="stop after this many frames")
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    parser.add_argument(
+        '--record',
+        metavar='PATH',
+        help="record the detected face landmarks of every frame to PATH",
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='PORT',
+        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        '--profile',
+        type=float,
+        metavar='SECONDS',
+        help="profile the pipeline threads for SECONDS after start",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the tracker without GUI until the source ends, a limit is hit or Ctrl+C"""
+    start_time = time.monotonic()
+    args = parse_args(argv)
+
+    source = args.source or Settings.get(FRAME_SOURCE_KEY, FRAME_SOURCE)
+    realtime = False if args.fast else Settings.get(FRAME_SOURCE_REALTIME_KEY, FRAME_SOURCE_REALTIME)
+    try:
+        cap = open_capture(source, realtime, loop=args.loop)
+        inference_backend = create_inference_backend()
+    except (ImportError, ValueError, RuntimeError, OSError) as e:
+        print(f"Error starting headless tracker: {e}", file=sys.stderr)
+        return 1
+
+    with contextlib.ExitStack() as stack:
+        if args.output == '-':
+            stream = sys.stdout.buffer if args.format == FORMAT_BINARY else sys.stdout
+            # Keep diagnostic prints of the pipeline out of the metrics stream
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        elif args.format == FORMAT_BINARY:
+            stream = stack.enter_context(open(args.output, 'wb'))
+        else:
+            stream = stack.enter_context(open(args.output, 'w', encoding='utf-8'))
+
+        model = MainModel(
+            HeadlessApp(),
+            {'cv2': cv},
+            cap,
+            inference_backend,
+            record_path=args.record,
+            render=not args.no_render,
+            metrics_port=args.metrics_port,
+            profile_duration=args.profile,
+        )
+        model.start()
+        print(f"Headless tracker started in {(time.monotonic() - start_time) * 1000:.0f} ms", file=sys.stderr)
+        try:
+            run(model, MetricsWriter(stream, args.format), args)
+        finally:
+            model.stop()
+            cap.release()
+
+    return 0
+
+
+def run(model, writer, args):
+    """Write metrics of every result until the source ends, a limit is hit or Ctrl+C"""
+    stopping = False
+
+    def request_stop(*_):
+        nonlocal stopping
+        stopping = True
+    previous_handlers = {
+        signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+
+    run_start = time.monotonic()
+    finished_polls = 0
+    try:
+        while not stopping:
+            if args.frames is not None and writer.frames >= args.frames:
+                break
+            if args.duration is not None and time.monotonic() - run_start >= args.duration:
+                break
+
+            model.profiler.checkpoint()
+            results = model.get_next_result(timeout=0.1)
+            if results is not None:
+                writer.write(results)
+                model.release_result(results)
+                finished_polls = 0
+            elif model.source_finished:
+                # Confirm on the next poll: a stage may just have taken the last item off its input
+                finished_polls += 1
+                if finished_polls > 1:
+                    break
+    except BrokenPipeError:
+        # Metrics consumer went away
+        pass
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+if __name__ == "__main__":
+    sys.exit(main())
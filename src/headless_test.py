@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import types
+from unittest import mock
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from . import headless
+from .headless import METRICS_RECORD
+from .inference_backend import ThreadInferenceBackend
+
+FRAMES = 5
+
+
+class FakeFaceMesh:
+    """FaceMesh stand-in that never finds a face"""
+    def process(self, frame_rgb):  # pylint: disable=unused-argument
+        return types.SimpleNamespace(multi_face_landmarks=None)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(name="image_dir")
+def image_dir_fixture(tmp_path):
+    directory = tmp_path / "frames"
+    directory.mkdir()
+    for index in range(FRAMES):
+        cv.imwrite(str(directory / f"{index:03d}.png"), np.full((48, 64, 3), index * 40, dtype=np.uint8))
+    return str(directory)
+
+
+@pytest.fixture(autouse=True)
+def fake_backend():
+    with mock.patch.object(headless, 'create_inference_backend', lambda: ThreadInferenceBackend(FakeFaceMesh())):
+        yield
+
+
+def read_metrics(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stops_at_the_end_of_the_source(image_dir, tmp_path):
+    output = str(tmp_path / "metrics.jsonl")
+    assert headless.main(['--source', f'images:{image_dir}', '--fast', '--output', output, '--duration', '30']) == 0
+
+    metrics = read_metrics(output)
+    # The capture thread keeps only the newest frame, so some images may be skipped
+    assert 1 <= len(metrics) <= FRAMES
+    assert [record['frame'] for record in metrics] == list(range(len(metrics)))
+    assert not any(record['face_detected'] for record in metrics)
+
+
+def test_loop_runs_until_the_frame_limit(image_dir, tmp_path):
+    output = str(tmp_path / "metrics.jsonl")
+    assert headless.main(['--source', f'images:{image_dir}', '--loop', '--output', output,
+                          '--frames', str(FRAMES + 2), '--no-render']) == 0
+    assert len(read_metrics(output)) == FRAMES + 2
+
+
+def test_stdout_is_restored(image_dir, capsys):
+    stdout = sys.stdout
+    assert headless.main(['--source', f'images:{image_dir}', '--loop', '--frames', '2']) == 0
+    assert sys.stdout is stdout
+
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 2
+    assert "Headless tracker started" in captured.err
+
+
+def test_binary_records(image_dir, tmp_path):
+    output = str(tmp_path / "metrics.bin")
+    assert headless.main(['--source', f'images:{image_dir}', '--loop', '--format', 'binary',
+                          '--output', output, '--frames', '3']) == 0
+    assert os.path.getsize(output) == 3 * METRICS_RECORD.size
+    with open(output, 'rb') as f:
+        frames = [METRICS_RECORD.unpack(record)[0] for record in iter(lambda: f.read(METRICS_RECORD.size), b'')]
+    assert frames == [0, 1, 2]
+
+
+def test_unknown_source_fails(capsys):
+    assert headless.main(['--source', 'nothing-here']) == 1
+    assert "Error starting headless tracker" in capsys.readouterr().err
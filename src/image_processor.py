@@ -1,4 +1,7 @@
+import collections
 import math
+import threading
+import time
 
 import cv2 as cv
 import numpy as np
@@ -10,6 +13,10 @@ from .config import (
     L_H_LEFT, L_H_RIGHT,
     R_H_LEFT, R_H_RIGHT,
     SHOW_DISTANCE,
+    BACKGROUND_CACHE_SIZE,
+    EYE_SPRITE_CACHE_SIZE,
+    RENDER_FRAME_POOL_SIZE,
+    RENDER_FULL_RESTORE_RATIO,
     EYES_DISPLAY_SCALE,
     EYES_VERTICAL_OFFSET,
     EYE_STYLE,
@@ -23,14 +30,21 @@ from .config import (
     EYEBROW_SMOOTHING,
     LINE_THICKNESS,
     LINE_SMOOTHING,
+    LOW_LIGHT_CLAHE_CLIP_LIMIT,
+    LOW_LIGHT_CLAHE_TILE_GRID,
+    LOW_LIGHT_GAMMA,
 )
+from .frame_pool import FramePool
+from .inference_backend import landmarks_to_array
+from .low_light import gamma_table, get_clahe
 
 class ImageProcessor:
     """Image processing and enhancement class"""
 
-    def __init__(self, app, modules):
+    def __init__(self, app, modules, perf_stats=None):
         self.app = app
         self.modules = modules
+        self.perf_stats = perf_stats  # Optional PerfStats for timing and the performance overlay
 
         self.background_dark_color = BACKGROUND_DARK_COLOR
         self.mesh_dark_color = MESH_DARK_COLOR
@@ -39,6 +53,22 @@ class ImageProcessor:
         self.background_color = BACKGROUND_COLOR
         self.brightness_increase = 40
 
+        # Rendered gradient backgrounds, LRU keyed by (height, width, base color, brightness)
+        self._background_cache = collections.OrderedDict()
+        self._background_cache_lock = threading.Lock()
+
+        # Size (width, height) of the frames drawn without camera image, None: camera frame size
+        self.output_size = None
+
+        # Camera-off frames are reused; only the region drawn last time is restored
+        self._frame_pool = FramePool(RENDER_FRAME_POOL_SIZE, RENDER_FULL_RESTORE_RATIO)
+        self._pooled_frame = None  # Pool entry of the frame being rendered
+        self._dirty_rects = []  # Regions drawn into the current frame
+
+        # Pre-rendered eyes, LRU keyed by (radius, eye style, iris color)
+        self._eye_sprite_cache = collections.OrderedDict()
+        self._eye_sprite_cache_lock = threading.Lock()
+
         # Настройки отображения
         self.show_distance = SHOW_DISTANCE
         self.eyes_display_scale = EYES_DISPLAY_SCALE
@@ -68,11 +98,30 @@ class ImageProcessor:
         self._left_eyebrow = np.array([70, 63, 105, 66, 107, 55, 65, 52, 53])
         self._right_eyebrow = np.array([300, 293, 334, 296, 336, 285, 295, 282, 283])
 
-        # Создаем заранее массивы для линий
-        self._left_eye_lines = np.column_stack((self._left_eye_details, np.roll(self._left_eye_details, -1)))
-        self._right_eye_lines = np.column_stack((self._right_eye_details, np.roll(self._right_eye_details, -1)))
-        self._left_eyebrow_lines = np.column_stack((self._left_eyebrow[:-1], self._left_eyebrow[1:]))
-        self._right_eyebrow_lines = np.column_stack((self._right_eyebrow[:-1], self._right_eyebrow[1:]))
+        # Все рисуемые точки одним массивом индексов: контуры глаз, затем брови
+        self._feature_indices = np.concatenate((
+            self._left_eye_details,
+            self._right_eye_details,
+            self._left_eyebrow,
+            self._right_eyebrow,
+        ))
+
+        # Scratch buffers reused every frame; contours are views into _feature_points
+        self._landmarks = None  # Normalized landmarks converted from protobuf input
+        self._landmark_pixels_f = np.empty((0, 2), dtype=np.float64)  # Scaled landmarks before truncation
+        self._feature_points_f = np.empty((len(self._feature_indices), 2), dtype=np.float64)
+        self._feature_points = np.empty((len(self._feature_indices), 2), dtype=np.int32)
+        left_eye_end = len(self._left_eye_details)
+        right_eye_end = left_eye_end + len(self._right_eye_details)
+        left_eyebrow_end = right_eye_end + len(self._left_eyebrow)
+        self._eye_contours = [
+            self._feature_points[:left_eye_end],
+            self._feature_points[left_eye_end:right_eye_end],
+        ]
+        self._eyebrow_contours = [
+            self._feature_points[right_eye_end:left_eyebrow_end],
+            self._feature_points[left_eyebrow_end:],
+        ]
 
     def _update_colors(self):
         """Обновляем цвета в зависимости от текущей темы"""
@@ -97,9 +146,198 @@ class ImageProcessor:
         elif color_name == "Background":
             self.background_color = hex_color
 
+        self._update_colors()
+        self.clear_background_cache()
+        self.clear_eye_sprite_cache()
+
     def update_brightness(self, value):
         """Update brightness increase value"""
         self.brightness_increase = int(value)
+        self.clear_background_cache()
+
+    def set_output_size(self, size):
+        """Set the (width, height) camera-off frames are drawn at, None for the camera frame size"""
+        self.output_size = tuple(size) if size is not None else None
+
+    def _canvas_size(self, frame):
+        """(height, width) of a camera-off frame drawn for the given camera frame"""
+        if self.output_size is not None:
+            return self.output_size[1], self.output_size[0]
+        return frame.shape[0], frame.shape[1]
+
+    def clear_background_cache(self):
+        """Drop all cached backgrounds"""
+        with self._background_cache_lock:
+            self._background_cache.clear()
+
+    def clear_eye_sprite_cache(self):
+        """Drop all pre-rendered eyes"""
+        with self._eye_sprite_cache_lock:
+            self._eye_sprite_cache.clear()
+
+    def _eye_sprite(self, radius):
+        """Pre-rendered eye of the given iris radius from the cache, rendered on a miss.
+
+        Returns (color, transmittance, half_size, scratch): the eye drawn on
+        black and the per-pixel share of the background that shows through,
+        in 255ths, both uint8, so compositing is frame * transmittance / 255
+        + color. scratch is a sprite-sized uint8 buffer for the blend,
+        reused by every draw (the render thread is the only one drawing).
+        """
+        key = (radius, tuple(sorted(self.eye_style.items())), self._iris_color_bgr)
+        with self._eye_sprite_cache_lock:
+            sprite = self._eye_sprite_cache.get(key)
+            if sprite is not None:
+                self._eye_sprite_cache.move_to_end(key)
+                return sprite
+
+        # Draw the eye once on black and once on white: the difference is the coverage
+        iris_thickness = max(1, int(radius * self.eye_style['IRIS_THICKNESS']))
+        half_size = radius + iris_thickness + 2
+        on_black = np.zeros((2 * half_size + 1, 2 * half_size + 1, 3), dtype=np.uint8)
+        on_white = np.full_like(on_black, 255)
+        self._draw_eye_shapes(on_black, (half_size, half_size), radius)
+        self._draw_eye_shapes(on_white, (half_size, half_size), radius)
+
+        # White-on-black coverage is exact in 255ths, so the blend needs no float sprite
+        transmittance = cv.subtract(on_white, on_black)
+        sprite = (on_black, transmittance, half_size, np.empty_like(on_black))
+
+        with self._eye_sprite_cache_lock:
+            self._eye_sprite_cache[key] = sprite
+            while len(self._eye_sprite_cache) > EYE_SPRITE_CACHE_SIZE:
+                self._eye_sprite_cache.popitem(last=False)
+        return sprite
+
+    def _draw_eye_shapes(self, frame, center, radius):
+        """Rasterize the stylized eye: iris ring, pupil and two highlights"""
+        # Рисуем радужку
+        iris_thickness = max(1, int(radius * self.eye_style['IRIS_THICKNESS']))
+        cv.circle(frame, center, radius, self._iris_color_bgr, iris_thickness, cv.LINE_AA)
+
+        # Рисуем зрачок
+        pupil_radius = int(radius * self.eye_style['PUPIL_SCALE'])
+        cv.circle(frame, center, pupil_radius, self._iris_color_bgr, -1, cv.LINE_AA)
+
+        # Добавляем блик
+        highlight_size = int(radius * self.eye_style['HIGHLIGHT_SCALE'])
+        highlight_offset = int(radius * self.eye_style['HIGHLIGHT_OFFSET'])
+
+        # Основной блик
+        highlight_pos = (
+            center[0] + highlight_offset,
+            center[1] - highlight_offset
+        )
+        cv.circle(frame, highlight_pos, highlight_size, (255, 255, 255), -1, cv.LINE_AA)
+
+        # Дополнительный маленький блик для реалистичности
+        small_highlight_pos = (
+            center[0] - highlight_offset // 2,
+            center[1] + highlight_offset // 2
+        )
+        cv.circle(frame, small_highlight_pos, highlight_size // 2,
+                 (255, 255, 255), -1, cv.LINE_AA)
+
+    def _draw_eye_sprite(self, frame, center, radius):
+        """Composite the pre-rendered eye onto frame, clipped at the frame borders"""
+        color, transmittance, half_size, scratch = self._eye_sprite(radius)
+        height, width = frame.shape[:2]
+        x0, y0 = center[0] - half_size, center[1] - half_size
+        fx0, fy0 = max(0, x0), max(0, y0)
+        fx1, fy1 = min(width, x0 + color.shape[1]), min(height, y0 + color.shape[0])
+        if fx1 <= fx0 or fy1 <= fy0:
+            return
+
+        sprite_rows = slice(fy0 - y0, fy1 - y0)
+        sprite_cols = slice(fx0 - x0, fx1 - x0)
+        region = frame[fy0:fy1, fx0:fx1]
+        shaded = scratch[:fy1 - fy0, :fx1 - fx0]
+        cv.multiply(region, transmittance[sprite_rows, sprite_cols], dst=shaded, scale=1 / 255)
+        cv.add(shaded, color[sprite_rows, sprite_cols], dst=region)
+        self._mark_dirty(fx0, fy0, fx1, fy1)
+
+    def _mark_dirty(self, x0, y0, x1, y1):
+        """Record a region drawn over the background of a pooled frame"""
+        if self._pooled_frame is not None:
+            self._dirty_rects.append((x0, y0, x1, y1))
+
+    def _mark_text_dirty(self, text, org, font_scale, thickness=1):
+        """Record the region of a cv.putText call"""
+        if self._pooled_frame is not None:
+            (text_w, text_h), baseline = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+            pad = thickness + 1
+            self._mark_dirty(org[0] - pad, org[1] - text_h - pad, org[0] + text_w + pad, org[1] + baseline + pad)
+
+    def _pooled_background(self, height, width, base_color):
+        """Frame showing the gradient background, ready to draw on.
+
+        Reuses a pooled frame the UI has released and restores only its
+        previously drawn region; falls back to a fresh copy.
+        """
+        background, key = self._cached_background(height, width, base_color)
+        self._pooled_frame = self._frame_pool.acquire(background, key)
+        if self._pooled_frame is not None:
+            return self._pooled_frame.array
+
+        frame = np.empty_like(background)
+        np.copyto(frame, background)
+        return frame
+
+    def _finish_dirty_tracking(self, frame):
+        """Store the drawn region of a pooled frame, clipped to the frame"""
+        pooled = self._pooled_frame
+        self._pooled_frame = None
+        if pooled is not None:
+            height, width = frame.shape[:2]
+            rects = []
+            for x0, y0, x1, y1 in self._dirty_rects:
+                x0, y0, x1, y1 = max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+                if x1 > x0 and y1 > y0:
+                    rects.append((x0, y0, x1, y1))
+            pooled.dirty = rects
+        self._dirty_rects = []
+
+    def release_frame(self, frame):
+        """Let the frame pool reuse a rendered frame once it has been displayed or dropped.
+
+        Frames that do not come from the pool are ignored.
+        """
+        if frame is not None:
+            self._frame_pool.release(frame)
+
+    def detach_frame(self, frame):
+        """Take a rendered frame out of the pool for a holder that keeps it indefinitely"""
+        if frame is not None:
+            self._frame_pool.detach(frame)
+
+    def get_render_stats(self):
+        """Frame pool reuse statistics"""
+        return self._frame_pool.get_stats()
+
+    def _cached_background(self, height, width, base_color):
+        """Gradient background and its cache key, rendered on a cache miss.
+
+        The returned array is shared and must not be drawn on.
+        """
+        key = (height, width, base_color, self.brightness_increase)
+        with self._background_cache_lock:
+            background = self._background_cache.get(key)
+            if background is not None:
+                self._background_cache.move_to_end(key)
+
+        if background is None:
+            background = self.create_gradient_background(
+                height=height,
+                width=width,
+                base_color=base_color,
+                brightness_increase=key[3]
+            )
+            with self._background_cache_lock:
+                self._background_cache[key] = background
+                while len(self._background_cache) > BACKGROUND_CACHE_SIZE:
+                    self._background_cache.popitem(last=False)
+
+        return background, key
 
     @staticmethod
     def hex_to_rgb(hex_color):
@@ -212,7 +450,7 @@ class ImageProcessor:
         # Apply adaptive histogram equalization
         lab = cv.cvtColor(frame, cv.COLOR_BGR2LAB)
         l, a, b = cv.split(lab)
-        clahe = cv.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        clahe = get_clahe(LOW_LIGHT_CLAHE_CLIP_LIMIT, LOW_LIGHT_CLAHE_TILE_GRID)
         cl = clahe.apply(l)
         limg = cv.merge((cl, a, b))
 
@@ -220,18 +458,14 @@ class ImageProcessor:
         enhanced = cv.cvtColor(limg, cv.COLOR_LAB2BGR)
 
         # Apply gamma correction
-        gamma = 1.2  # Can be adjusted based on conditions
-        enhanced = ImageProcessor.adjust_gamma(enhanced, gamma)
+        enhanced = ImageProcessor.adjust_gamma(enhanced, LOW_LIGHT_GAMMA)
 
         return enhanced
 
     @staticmethod
     def adjust_gamma(image, gamma=1.0):
         """Apply gamma correction to image"""
-        inv_gamma = 1.0 / gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255
-            for i in np.arange(0, 256)]).astype("uint8")
-        return cv.LUT(image, table)
+        return cv.LUT(image, gamma_table(gamma))
 
     @staticmethod
     def euclidean_distance_3D(points):
@@ -396,26 +630,34 @@ class ImageProcessor:
         b = max(0, int(b * (1 - factor)))
         return (r, g, b)
 
-    def _prepare_frame(self, frame):
+    def _prepare_frame(self, frame, show_camera):
         """Prepare frame for face mesh processing"""
-        if not self.app.app_state.show_camera.get():
+        if not show_camera:
             background_rgb = self.hex_to_rgb(self.background_color)
             background_bgr = self.rgb_to_bgr(background_rgb)
 
-            return self.create_gradient_background(
-                height=frame.shape[0],
-                width=frame.shape[1],
-                base_color=background_bgr,
-                brightness_increase=self.brightness_increase
-            )
+            return self._pooled_background(*self._canvas_size(frame), background_bgr)
         return frame
 
     def _process_landmarks(self, face_landmarks, img_w, img_h):
-        """Convert landmarks to numpy array and get mesh points"""
-        return np.array([
-            [int(point.x * img_w), int(point.y * img_h)]
-            for point in face_landmarks.landmark
-        ])
+        """Convert landmarks to numpy arrays.
+
+        Returns (mesh_points, landmarks): int32 (N, 2) pixel coordinates and
+        the float32 (N, 3) normalized landmarks they were scaled from. Pass
+        landmarks back in to scale to another size without converting again;
+        unless the input already was an array, it is a buffer reused by the
+        next call.
+        """
+        landmarks = landmarks_to_array(face_landmarks, out=self._landmarks)
+        if landmarks is not face_landmarks:
+            self._landmarks = landmarks
+
+        # Scale in one step; float64 and truncation match int(point.x * img_w)
+        scaled = self._landmark_pixels_f
+        if scaled.shape[0] != len(landmarks):
+            scaled = self._landmark_pixels_f = np.empty((len(landmarks), 2), dtype=np.float64)
+        np.multiply(landmarks[:, :2], (img_w, img_h), out=scaled)
+        return scaled.astype(np.int32), landmarks
 
     def _process_eyes(self, mesh_points):
         """Process eyes and calculate normalized eye distance"""
@@ -452,7 +694,7 @@ class ImageProcessor:
 
         return mesh_points, center_left, center_right
 
-    def _draw_mesh(self, frame, mesh_points, center_left, center_right, l_radius, r_radius):
+    def _draw_mesh(self, frame, mesh_points, center_left, center_right, l_radius, r_radius, show_camera):
         """Draw mesh and eyes on frame"""
         if center_left is None or center_right is None:
             return frame
@@ -465,11 +707,13 @@ class ImageProcessor:
         scale = self.eyes_display_scale
 
         # Инициализируем точки без масштабирования
-        centered_points = mesh_points
         centered_center_left = center_left
         centered_center_right = center_right
+        feature_points = self._feature_points
 
-        if not self.app.app_state.show_camera.get():
+        if show_camera:
+            np.copyto(feature_points, mesh_points[self._feature_indices], casting='unsafe')
+        else:
             # Находим центр между глазами и целевой центр экрана
             eyes_center = (center_left + center_right) * 0.5
 
@@ -477,83 +721,54 @@ class ImageProcessor:
             vertical_offset = height * self.eyes_vertical_offset
             target_center = np.array([width * 0.5, height * 0.5 + vertical_offset])
 
-            # Сначала применяем масштабирование к точкам относительно центра глаз
-            scale_matrix = np.array([[scale, 0], [0, scale]])
-            scaled_points = (mesh_points - eyes_center) @ scale_matrix + eyes_center
-            scaled_center_left = (center_left - eyes_center) @ scale_matrix + eyes_center
-            scaled_center_right = (center_right - eyes_center) @ scale_matrix + eyes_center
+            # Сначала применяем масштабирование к центрам глаз
+            scaled_center_left = (center_left - eyes_center) * scale + eyes_center
+            scaled_center_right = (center_right - eyes_center) * scale + eyes_center
 
             # Затем вычисляем смещение для центрирования масштабированных точек
             scaled_eyes_center = (scaled_center_left + scaled_center_right) * 0.5
             offset = target_center - scaled_eyes_center
-
-            # Применяем смещение к масштабированным точкам
-            centered_points = scaled_points + offset
             centered_center_left = scaled_center_left + offset
             centered_center_right = scaled_center_right + offset
 
-        # Рисуем линии глаз (векторизованная операция)
-        def draw_lines(lines_indices):
-            points = centered_points[lines_indices]
-            points = points.reshape(-1, 2, 2).astype(np.int32)
-            line_thickness = max(1, int(scale * self.eye_style['MESH_LINE_SCALE']))
-            for pt1, pt2 in points:
-                cv.line(frame, tuple(pt1), tuple(pt2),
-                       self._mesh_color_bgr, line_thickness, cv.LINE_AA)
-
-        draw_lines(self._left_eye_lines)
-        draw_lines(self._right_eye_lines)
-        draw_lines(self._left_eyebrow_lines)
-        draw_lines(self._right_eyebrow_lines)
-
-        # Рисуем точки (векторизованная операция)
-        all_points = np.concatenate([
-            centered_points[self._left_eye_details],
-            centered_points[self._right_eye_details],
-            centered_points[self._left_eyebrow],
-            centered_points[self._right_eyebrow]
-        ]).astype(np.int32)
-
+            # Масштабируем и смещаем только рисуемые точки, на месте в буфере
+            points_f = self._feature_points_f
+            np.copyto(points_f, mesh_points[self._feature_indices])
+            np.subtract(points_f, eyes_center, out=points_f)
+            np.multiply(points_f, scale, out=points_f)
+            np.add(points_f, eyes_center, out=points_f)
+            np.add(points_f, offset, out=points_f)
+            np.copyto(feature_points, points_f, casting='unsafe')
+
+        # Рисуем контуры глаз и брови двумя вызовами
+        line_thickness = max(1, int(scale * self.eye_style['MESH_LINE_SCALE']))
+        cv.polylines(frame, self._eye_contours, True, self._mesh_color_bgr, line_thickness, cv.LINE_AA)
+        cv.polylines(frame, self._eyebrow_contours, False, self._mesh_color_bgr, line_thickness, cv.LINE_AA)
+
+        # Рисуем точки
         point_size = max(1, int(scale * self.eye_style['POINT_SCALE']))
-        for point in all_points:
-            cv.circle(frame, tuple(point), point_size, self._mesh_color_bgr, -1, cv.LINE_AA)
-
-        # Оптимизированное рисование глаз
+        for x, y in feature_points.tolist():
+            cv.circle(frame, (x, y), point_size, self._mesh_color_bgr, -1, cv.LINE_AA)
+
+        if self._pooled_frame is not None:
+            # One box per contour: the union would also cover the space between the eyes
+            pad = max(line_thickness, point_size) + 2
+            for contour in self._eye_contours + self._eyebrow_contours:
+                x0, y0 = contour.min(axis=0).tolist()
+                x1, y1 = contour.max(axis=0).tolist()
+                self._mark_dirty(x0 - pad, y0 - pad, x1 + pad + 1, y1 + pad + 1)
+
+        # Глаза накладываются из кэша заранее отрисованных спрайтов
         def draw_eye(center, radius):
             center = tuple(map(int, center))
 
             # Применяем масштаб только если камера выключена
-            if not self.app.app_state.show_camera.get():
+            if not show_camera:
                 scaled_radius = int(radius * scale)
             else:
                 scaled_radius = int(radius)
 
-            # Рисуем радужку
-            iris_thickness = max(1, int(scaled_radius * self.eye_style['IRIS_THICKNESS']))
-            cv.circle(frame, center, scaled_radius, self._iris_color_bgr, iris_thickness, cv.LINE_AA)
-
-            # Рисуем зрачок
-            pupil_radius = int(scaled_radius * self.eye_style['PUPIL_SCALE'])
-            cv.circle(frame, center, pupil_radius, self._iris_color_bgr, -1, cv.LINE_AA)
-
-            # Добавляем блик
-            highlight_size = int(scaled_radius * self.eye_style['HIGHLIGHT_SCALE'])
-            highlight_offset = int(scaled_radius * self.eye_style['HIGHLIGHT_OFFSET'])
-
-            # Основной блик
-            highlight_pos = (
-                center[0] + highlight_offset,
-                center[1] - highlight_offset
-            )
-            cv.circle(frame, highlight_pos, highlight_size, (255, 255, 255), -1, cv.LINE_AA)
-
-            # Дополнительный маленький блик для реалистичности
-            small_highlight_pos = (
-                center[0] - highlight_offset // 2,
-                center[1] + highlight_offset // 2
-            )
-            cv.circle(frame, small_highlight_pos, highlight_size // 2,
-                     (255, 255, 255), -1, cv.LINE_AA)
+            self._draw_eye_sprite(frame, center, scaled_radius)
 
         # Рисуем оба глаза
         draw_eye(centered_center_left, l_radius)
@@ -562,8 +777,10 @@ class ImageProcessor:
         # Добавляем текст с расстоянием (вычисляем только если нужно)
         if self.show_distance:
             eye_distance = np.linalg.norm(centered_center_right - centered_center_left)
-            cv.putText(frame, f"Eye Distance: {eye_distance:.1f}px",
+            distance_text = f"Eye Distance: {eye_distance:.1f}px"
+            cv.putText(frame, distance_text,
                       (10, height - 20), cv.FONT_HERSHEY_SIMPLEX, 0.7, self._mesh_color_bgr, 1, cv.LINE_AA)
+            self._mark_text_dirty(distance_text, (10, height - 20), 0.7)
 
         return frame
 
@@ -579,27 +796,53 @@ class ImageProcessor:
             fontScale=0.4,
             thickness=1)[0]
 
+        org = ((frame.shape[1] - screen_text_size[0]) // 2, frame.shape[0] - 20)
         cv.putText(
             img=frame,
             text=screen_text,
-            org=((frame.shape[1] - screen_text_size[0]) // 2, frame.shape[0] - 20),
+            org=org,
             fontFace=cv.FONT_HERSHEY_SIMPLEX,
             fontScale=0.4,
             color=screen_text_color,
             thickness=1,
             lineType=cv.LINE_AA)
-
-    def _process_face_mesh_impl(self, frame, mesh_results):
+        self._mark_text_dirty(screen_text, org, 0.4)
+
+    def _draw_perf_hud(self, frame):
+        """Draw FPS, stage latencies and dropped frames in the top left corner"""
+        stats = self.perf_stats
+        lines = (
+            f"FPS: {stats.gauge('fps'):.1f}",
+            f"Inference: {stats.mean('inference_ms'):.1f} ms",
+            f"Render: {stats.mean('render_ms'):.1f} ms",
+            f"Display: {stats.mean('display_ms'):.1f} ms",
+            f"Dropped: {stats.gauge('frames_dropped')}",
+        )
+        mesh_dark_rgb = self.hex_to_rgb(self.mesh_dark_color)
+        text_color = self.rgb_to_bgr(mesh_dark_rgb)
+
+        for i, text in enumerate(lines):
+            cv.putText(
+                img=frame,
+                text=text,
+                org=(10, 20 + i * 16),
+                fontFace=cv.FONT_HERSHEY_SIMPLEX,
+                fontScale=0.4,
+                color=text_color,
+                thickness=1,
+                lineType=cv.LINE_AA)
+            self._mark_text_dirty(text, (10, 20 + i * 16), 0.4)
+
+    def _process_face_mesh_impl(self, frame, mesh_results, source_size, show_camera):
         """Process face mesh detection results and draw on frame"""
-        # Get frame dimensions
-        img_h, img_w = frame.shape[:2]
-
         # Prepare frame
-        frame = self._prepare_frame(frame)
+        frame = self._prepare_frame(frame, show_camera)
+
+        # Landmarks are drawn in output frame coordinates
+        img_h, img_w = frame.shape[:2]
 
         # Process landmarks
-        face_landmarks = mesh_results.multi_face_landmarks[0]
-        mesh_points = self._process_landmarks(face_landmarks, img_w, img_h)
+        mesh_points, landmarks = self._process_landmarks(mesh_results.multi_face_landmarks[0], img_w, img_h)
 
         # Process eyes
         (
@@ -610,8 +853,13 @@ class ImageProcessor:
             normalized_eye_distance
         ) = self._process_eyes(mesh_points)
 
+        # Metrics stay in camera space whatever size the frame is drawn at
+        if source_size is not None and tuple(source_size) != (img_w, img_h):
+            normalized_eye_distance = self._process_eyes(
+                self._process_landmarks(landmarks, *source_size)[0])[-1]
+
         # Center mesh points if needed
-        if not self.app.app_state.show_camera.get():
+        if not show_camera:
             mesh_points, center_left, center_right = (
                 self._center_mesh_points(
                     mesh_points,
@@ -623,7 +871,7 @@ class ImageProcessor:
             )
 
         # Draw mesh and eyes
-        frame = self._draw_mesh(frame, mesh_points, center_left, center_right, l_radius, r_radius)
+        frame = self._draw_mesh(frame, mesh_points, center_left, center_right, l_radius, r_radius, show_camera)
 
         # Draw text
         self._draw_text(frame, normalized_eye_distance)
@@ -634,23 +882,18 @@ class ImageProcessor:
             'mesh_points': mesh_points,
         }
 
-    def _process_face_mesh_noface(self, frame):
+    def _process_face_mesh_noface(self, frame, show_camera):
 
         screen_text = "No face detected"
         mesh_dark_rgb = self.hex_to_rgb(self.mesh_dark_color)
         screen_text_color = self.rgb_to_bgr(mesh_dark_rgb)
 
         # If show_camera is off, create a gradient background
-        if not self.app.app_state.show_camera.get():
+        if not show_camera:
             background_dark_rgb = self.hex_to_rgb(self.background_dark_color)
             background_dark_bgr = self.rgb_to_bgr(background_dark_rgb)
 
-            frame = self.create_gradient_background(
-                height=frame.shape[0],
-                width=frame.shape[1],
-                base_color=background_dark_bgr,
-                brightness_increase=self.brightness_increase
-            )
+            frame = self._pooled_background(*self._canvas_size(frame), background_dark_bgr)
 
         screen_text_size = cv.getTextSize(
             text=screen_text,
@@ -658,15 +901,17 @@ class ImageProcessor:
             fontScale=0.4,
             thickness=1)[0]
 
+        org = ((frame.shape[1] - screen_text_size[0]) // 2, frame.shape[0] - 20)
         cv.putText(
             img=frame,
             text=screen_text,
-            org=((frame.shape[1] - screen_text_size[0]) // 2, frame.shape[0] - 20),
+            org=org,
             fontFace=cv.FONT_HERSHEY_SIMPLEX,
             fontScale=0.4,
             color=screen_text_color,
             thickness=1,
             lineType=cv.LINE_AA)
+        self._mark_text_dirty(screen_text, org, 0.4)
 
         return {
             'frame': frame,
@@ -674,16 +919,62 @@ class ImageProcessor:
             'mesh_points': None,
         }
 
-    def process_face_mesh(self, frame, mesh_results):
+    def measure_face_mesh(self, img_w, img_h, mesh_results):
+        """Calculate eye metrics from face mesh results without drawing anything
+
+        Args:
+            img_w: Frame width the landmarks refer to
+            img_h: Frame height the landmarks refer to
+            mesh_results: Face mesh detection results
+
+        Returns:
+            dict: Same keys as process_face_mesh, with frame set to None
+        """
+        if not mesh_results.multi_face_landmarks:
+            return {
+                'frame': None,
+                'normalized_eye_distance': 0,
+                'mesh_points': None,
+            }
+
+        mesh_points = self._process_landmarks(mesh_results.multi_face_landmarks[0], img_w, img_h)[0]
+        normalized_eye_distance = self._process_eyes(mesh_points)[-1]
+        return {
+            'frame': None,
+            'normalized_eye_distance': normalized_eye_distance,
+            'mesh_points': mesh_points,
+        }
+
+    def process_face_mesh(self, frame, mesh_results, source_size=None, show_camera=None):
         """Process face mesh detection results and draw on frame
 
         Args:
-            frame: Input frame
+            frame: Input frame. Without camera image only its size is used and
+                the result is drawn at output_size if set
             mesh_results: Face mesh detection results
+            source_size: (width, height) of the camera frame the landmarks were
+                detected in, if frame was resized; metrics are computed at this size
+            show_camera: Whether frame is the camera image to draw on, as the
+                caller decided when preparing it; read from the app state if None.
+                Without it the frame is never drawn on
 
         Returns:
-            dict: Processing results containing frame and detection flags
+            dict: Processing results containing frame and detection flags.
+            Pass the frame to release_frame once it is no longer needed.
         """
+        start = time.perf_counter()
+        self._pooled_frame = None
+        if show_camera is None:
+            show_camera = self.app.app_state.show_camera.get()
         if mesh_results.multi_face_landmarks:
-            return self._process_face_mesh_impl(frame, mesh_results)
-        return self._process_face_mesh_noface(frame)
+            results = self._process_face_mesh_impl(frame, mesh_results, source_size, show_camera)
+        else:
+            results = self._process_face_mesh_noface(frame, show_camera)
+
+        if self.perf_stats is not None:
+            self.perf_stats.record('process_face_mesh_ms', (time.perf_counter() - start) * 1000)
+            if self.app.app_state.show_perf_hud.get():
+                self._draw_perf_hud(results['frame'])
+
+        self._finish_dirty_tracking(results['frame'])
+        return results
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import cv2 as cv
+import numpy as np
+
+from .headless import HeadlessApp
+from .image_processor import ImageProcessor
+from .inference_backend import FaceMeshResult
+
+WIDTH, HEIGHT = 320, 240
+
+
+def make_app(show_camera):
+    app = HeadlessApp()
+    app.app_state.show_camera.set(show_camera)
+    app.app_state.show_perf_hud.set(False)
+    return app
+
+
+def make_mesh_results(seed):
+    """One face of random landmarks around the frame center, or no face for negative seeds"""
+    if seed < 0:
+        return FaceMeshResult([])
+    landmarks = np.random.default_rng(seed).uniform(0.4, 0.6, (478, 3)).astype(np.float32)
+    return FaceMeshResult([landmarks])
+
+
+def make_frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def per_segment_polylines(img, pts, is_closed, color, thickness, line_type):
+    """cv.polylines as _draw_mesh drew it before: one cv.line per segment"""
+    for contour in pts:
+        ends = np.roll(contour, -1, axis=0) if is_closed else contour[1:]
+        for start, end in zip(contour.tolist(), ends.tolist()):
+            cv.line(img, tuple(start), tuple(end), color, thickness, line_type)
+    return img
+
+
+def test_batched_polylines_match_per_segment_lines():
+    for show_camera in (False, True):
+        app = make_app(show_camera)
+        for seed in range(10):
+            batched = ImageProcessor(app, {}).process_face_mesh(make_frame(seed), make_mesh_results(seed))
+            with mock.patch.object(cv, 'polylines', per_segment_polylines):
+                reference = ImageProcessor(app, {}).process_face_mesh(make_frame(seed), make_mesh_results(seed))
+
+            assert np.array_equal(batched['mesh_points'], reference['mesh_points'])
+            # Shared vertices are blended once instead of twice, nothing else differs
+            difference = np.abs(batched['frame'].astype(np.int16) - reference['frame']).max()
+            assert difference <= 2, difference
+
+
+def test_reused_frames_match_fresh_renders():
+    app = make_app(False)
+    processor = ImageProcessor(app, {})
+    held = []
+    # Faces, no-face frames and the switches between them, with up to three frames held by the UI
+    for seed in (0, 1, 2, -1, -1, 3, 4, -1, 5, 6, 7, 8, 9, 10):
+        frame = processor.process_face_mesh(make_frame(), make_mesh_results(seed))['frame']
+        reference = ImageProcessor(app, {}).process_face_mesh(make_frame(), make_mesh_results(seed))['frame']
+        assert np.array_equal(frame, reference), seed
+
+        held.append(frame)
+        if len(held) > 3:
+            processor.release_frame(held.pop(0))
+
+    stats = processor.get_render_stats()
+    assert stats['frames_reused'] > 0
+    assert stats['frames_in_use'] == len(held)
+
+
+def test_unreleased_frames_are_not_reused():
+    processor = ImageProcessor(make_app(False), {})
+    frames = [processor.process_face_mesh(make_frame(), make_mesh_results(seed))['frame'] for seed in range(3)]
+    snapshots = [frame.copy() for frame in frames]
+    for seed in range(3, 20):
+        processor.process_face_mesh(make_frame(), make_mesh_results(seed))
+
+    # Once the pool is exhausted, rendering falls back to new frames instead of drawing over held ones
+    for frame, snapshot in zip(frames, snapshots):
+        assert np.array_equal(frame, snapshot)
@@ -0,0 +1,407 @@
+"""FaceMesh inference backends"""
+import importlib
+import multiprocessing
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from .config import (
+    MIN_DETECTION_CONFIDENCE, MIN_DETECTION_CONFIDENCE_KEY,
+    MIN_TRACKING_CONFIDENCE, MIN_TRACKING_CONFIDENCE_KEY,
+    INFERENCE_BACKEND, INFERENCE_BACKEND_KEY,
+    INFERENCE_WORKERS, INFERENCE_WORKERS_KEY,
+    LANDMARK_BUFFER_SPARE_SLOTS, LANDMARK_BUFFER_SLOTS_KEY,
+    PIPELINE_QUEUE_SIZE, PIPELINE_QUEUE_SIZE_KEY,
+)
+from .frame_ring import SharedFrameRing
+from .settings import Settings
+
+BACKEND_THREAD = 'thread'
+BACKEND_PROCESS = 'process'
+
+# Seconds to wait for a worker process to import MediaPipe and build FaceMesh
+WORKER_START_TIMEOUT = 60
+WORKER_RESULT_TIMEOUT = 5  # Seconds a worker may take for one frame before it is replaced
+WORKER_POLL_INTERVAL = 0.05  # Seconds between checks for shutdown while waiting on a worker
+
+# Serialized NormalizedLandmarkList: repeated length-delimited landmarks (field 1),
+# each holding fixed32 floats x, y, z and optionally visibility, presence (fields 1-5)
+LANDMARK_LIST_TAG = 0x0a
+LANDMARK_FIELD_TAGS = (0x0d, 0x15, 0x1d, 0x25, 0x2d)
+_landmark_record_dtypes = {}  # Float field count -> structured dtype of one serialized landmark
+
+
+class FaceMeshResult:
+    """Compact FaceMesh result.
+
+    Mirrors the multi_face_landmarks attribute of MediaPipe results, but each
+    face is a float32 array of shape (N, 3) with normalized x, y, z instead of
+    a protobuf landmark list.
+    """
+    def __init__(self, multi_face_landmarks=None):
+        self.multi_face_landmarks = multi_face_landmarks or []
+
+
+def landmark_points(face_landmarks):
+    """Get per-point landmarks of one face: protobuf landmark list or (N, 3) array"""
+    if isinstance(face_landmarks, np.ndarray):
+        return face_landmarks
+    return face_landmarks.landmark
+
+
+def landmarks_to_array(face_landmarks, out=None):
+    """Normalized coordinates of one face as a float32 (N, 3) array.
+
+    Accepts a protobuf NormalizedLandmarkList, its repeated landmark field or
+    an (N, 3) array (returned as is). A landmark list is decoded in bulk from
+    its serialized form, falling back to reading the points one by one when
+    the encoding is not the plain fixed-size one. Writes into out if its
+    shape fits.
+    """
+    if isinstance(face_landmarks, np.ndarray):
+        return face_landmarks.astype(np.float32, copy=False)
+
+    points = getattr(face_landmarks, 'landmark', face_landmarks)
+    if out is None or out.shape != (len(points), 3):
+        out = np.empty((len(points), 3), dtype=np.float32)
+
+    serialize = getattr(face_landmarks, 'SerializeToString', None)
+    if serialize is not None and _decode_landmark_list(serialize(), out):
+        return out
+
+    for i, point in enumerate(points):
+        out[i] = point.x, point.y, point.z
+    return out
+
+
+def _landmark_record_dtype(fields):
+    """Structured dtype of one serialized landmark with the given number of float fields"""
+    dtype = _landmark_record_dtypes.get(fields)
+    if dtype is None:
+        layout = [('tag', 'u1'), ('length', 'u1')]
+        for i in range(fields):
+            layout += [(f'tag{i}', 'u1'), (f'value{i}', '<f4')]
+        dtype = _landmark_record_dtypes[fields] = np.dtype(layout)
+    return dtype
+
+
+def _decode_landmark_list(data, out):
+    """Decode a serialized NormalizedLandmarkList into out.
+
+    Returns False unless every landmark holds the same fields in field order,
+    which is how MediaPipe writes them.
+    """
+    if len(data) < 2 or data[0] != LANDMARK_LIST_TAG:
+        return False
+    length = data[1]
+    fields, remainder = divmod(length, 5)
+    if remainder or not 3 <= fields <= len(LANDMARK_FIELD_TAGS) or len(data) != len(out) * (length + 2):
+        return False
+
+    records = np.frombuffer(data, dtype=_landmark_record_dtype(fields))
+    if not ((records['tag'] == LANDMARK_LIST_TAG).all() and (records['length'] == length).all()):
+        return False
+    if not all((records[f'tag{i}'] == LANDMARK_FIELD_TAGS[i]).all() for i in range(fields)):
+        return False
+
+    for i in range(3):
+        out[:, i] = records[f'value{i}']
+    return True
+
+
+def landmark_buffer_slots():
+    """Landmark array sets in rotation: the setting, or enough for the configured queue size"""
+    queue_size = Settings.get(PIPELINE_QUEUE_SIZE_KEY, PIPELINE_QUEUE_SIZE)
+    return Settings.get(LANDMARK_BUFFER_SLOTS_KEY, 2 * queue_size + LANDMARK_BUFFER_SPARE_SLOTS)
+
+
+class ThreadInferenceBackend:
+    """Runs FaceMesh in the calling thread, returning landmarks as compact FaceMeshResult arrays.
+
+    Landmarks are converted into arrays taken in rotation from landmark_slots
+    sets, so a result stays valid until that many later process() calls.
+    By default the rotation covers the configured pipeline queues.
+    """
+    def __init__(self, face_mesh, landmark_slots=None):
+        if landmark_slots is None:
+            landmark_slots = landmark_buffer_slots()
+        self.face_mesh = face_mesh
+        self._buffers = {}
+        self._landmark_slots = [[] for _ in range(landmark_slots)]  # Per slot: one array per face
+        self._next_landmark_slot = 0
+
+    def input_buffer(self, shape, stream=0):
+        """Reusable uint8 array the next frame of the stream can be written into"""
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(stream)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=np.uint8)
+            self._buffers[stream] = buffer
+        return buffer[:size].reshape(shape)
+
+    def process(self, frame_rgb, stream=0):  # pylint: disable=unused-argument
+        """Run FaceMesh on an RGB frame"""
+        results = self.face_mesh.process(frame_rgb)
+        faces = results.multi_face_landmarks or []
+
+        slot = self._landmark_slots[self._next_landmark_slot]
+        self._next_landmark_slot = (self._next_landmark_slot + 1) % len(self._landmark_slots)
+        slot.extend([None] * (len(faces) - len(slot)))
+        arrays = []
+        for i, face in enumerate(faces):
+            landmarks = landmarks_to_array(face, out=slot[i])
+            if landmarks is not face:
+                # Array input is passed through as is and must not be written into later
+                slot[i] = landmarks
+            arrays.append(landmarks)
+        return FaceMeshResult(arrays)
+
+    def close(self):
+        """Release FaceMesh resources"""
+        self.face_mesh.close()
+
+
+def _worker_main(conn, face_mesh_options):
+    """Worker process entry point: owns a FaceMesh instance and serves frames from conn.
+
+    Frames are not sent through the pipe: each message names the shared input
+    ring of the stream, the slot holding the frame and its shape. A frame that
+    fails is answered with an error reply and the worker keeps serving.
+    """
+    try:
+        import mediapipe as mp  # pylint: disable=import-outside-toplevel
+        face_mesh = mp.solutions.face_mesh.FaceMesh(**face_mesh_options)
+    except (ImportError, ValueError, RuntimeError) as e:
+        conn.send(('error', str(e)))
+        return
+
+    rings = {}  # stream -> attached SharedFrameRing
+    conn.send(('ready', None))
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+
+            try:
+                stream, descriptor, slot_id, shape = message
+                ring = rings.get(stream)
+                if ring is None or ring.name != descriptor[0]:
+                    # Stream input ring was reallocated
+                    if ring is not None:
+                        rings.pop(stream).close()
+                    ring = SharedFrameRing.attach(descriptor)
+                    rings[stream] = ring
+
+                results = face_mesh.process(ring.slot(slot_id, shape))
+                faces = [
+                    landmarks_to_array(face)
+                    for face in results.multi_face_landmarks or []
+                ]
+            except Exception as e:
+                print(f"Error processing frame in FaceMesh worker: {e}")
+                traceback.print_exc()
+                conn.send(('error', f"{type(e).__name__}: {e}"))
+                continue
+
+            conn.send(('result', faces))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for ring in rings.values():
+            ring.close()
+        face_mesh.close()
+
+
+class WorkerProcess:
+    """One FaceMesh worker process, its pipe and the lock serializing requests to it"""
+    def __init__(self, context, face_mesh_options):
+        self.context = context
+        self.face_mesh_options = face_mesh_options
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+
+    def is_alive(self):
+        """True while the process runs"""
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Spawn the process; wait_ready() waits until FaceMesh is built"""
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.face_mesh_options),
+            daemon=True,
+        )
+        try:
+            process.start()
+        finally:
+            child_conn.close()
+        self.process = process
+        self.conn = parent_conn
+
+    def stop(self, timeout=1.0):
+        """Ask the process to exit, terminating it if it does not"""
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=timeout)
+            self.process = None
+
+
+class ProcessInferenceBackend:
+    """Runs FaceMesh in separate processes to keep inference off the UI interpreter's GIL.
+
+    Each stream is pinned to one worker process (stream % workers), because
+    FaceMesh keeps per-stream tracking state between frames. Frames reach the
+    worker through a per-stream SharedFrameRing, so only slot ids cross the
+    pipe; workers return compact landmark arrays wrapped in FaceMeshResult.
+    A worker that dies or stops answering is replaced on the next frame.
+    """
+    def __init__(self, face_mesh_options, workers=1):
+        context = multiprocessing.get_context('spawn')
+        self._workers = [WorkerProcess(context, face_mesh_options) for _ in range(max(1, workers))]
+        self._rings = {}  # stream -> input SharedFrameRing
+        self._closing = threading.Event()
+
+        # Statistics
+        self.workers_restarted = 0
+
+        try:
+            for worker in self._workers:
+                worker.start()
+            for worker in self._workers:
+                self._wait_ready(worker)
+        except (EOFError, OSError) as e:
+            self.close()
+            raise RuntimeError(f"FaceMesh worker process failed: {e}") from e
+        except RuntimeError:
+            self.close()
+            raise
+
+    def input_buffer(self, shape, stream=0):
+        """Shared memory slot the next frame of the stream can be written into"""
+        ring = self._rings.get(stream)
+        if ring is None or not ring.fits(shape):
+            # Grow the ring; the worker re-attaches when it sees the new name
+            if ring is not None:
+                ring.close()
+            ring = SharedFrameRing(1, (int(np.prod(shape)),))
+            self._rings[stream] = ring
+        return ring.slot(0, shape)
+
+    def process(self, frame_rgb, stream=0):
+        """Run FaceMesh on an RGB frame in the worker assigned to the stream"""
+        slot = self.input_buffer(frame_rgb.shape, stream)
+        if not np.may_share_memory(frame_rgb, slot):
+            # Frame was not written into the shared slot by the caller
+            np.copyto(slot, frame_rgb)
+        message = (stream, self._rings[stream].descriptor(), 0, frame_rgb.shape)
+
+        worker = self._workers[stream % len(self._workers)]
+        with worker.lock:
+            if self._closing.is_set():
+                raise RuntimeError("FaceMesh worker processes are shut down")
+
+            if not worker.is_alive():
+                # Crashed or stopped after hanging; FaceMesh tracking starts over
+                print("FaceMesh worker process is gone, starting a new one")
+                worker.stop()
+                worker.start()
+                self.workers_restarted += 1
+                try:
+                    self._wait_ready(worker)
+                except (EOFError, OSError) as e:
+                    worker.stop()
+                    raise RuntimeError(f"FaceMesh worker process failed: {e}") from e
+                except RuntimeError:
+                    worker.stop()
+                    raise
+
+            try:
+                worker.conn.send(message)
+                status, payload = self._wait_reply(worker, WORKER_RESULT_TIMEOUT)
+            except TimeoutError as e:
+                # A hung worker is replaced on the next frame
+                worker.stop()
+                raise RuntimeError(f"FaceMesh worker process did not answer: {e}") from e
+            except (EOFError, OSError) as e:
+                worker.stop()
+                raise RuntimeError(f"FaceMesh worker process is gone: {e}") from e
+
+        if status == 'error':
+            raise RuntimeError(f"FaceMesh failed in worker process: {payload}")
+        return FaceMeshResult(payload)
+
+    def _wait_ready(self, worker):
+        """Wait until a started worker has built FaceMesh"""
+        try:
+            status, message = self._wait_reply(worker, WORKER_START_TIMEOUT)
+        except TimeoutError as e:
+            raise RuntimeError("FaceMesh worker process did not start in time") from e
+        if status != 'ready':
+            raise RuntimeError(f"FaceMesh worker process failed: {message}")
+
+    def _wait_reply(self, worker, timeout):
+        """Receive the next message of a worker.
+
+        Polls in short steps so close() never waits for a slow worker, and
+        raises EOFError if the process exits or TimeoutError after timeout
+        seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while not worker.conn.poll(WORKER_POLL_INTERVAL):
+            if self._closing.is_set():
+                raise RuntimeError("FaceMesh worker processes are shutting down")
+            if not worker.is_alive():
+                raise EOFError("worker process exited")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"no reply within {timeout:g} s")
+        return worker.conn.recv()
+
+    def close(self):
+        """Stop all worker processes and free the input rings"""
+        self._closing.set()
+        for worker in self._workers:
+            # A request in progress gives up within WORKER_POLL_INTERVAL once closing is set
+            with worker.lock:
+                worker.stop()
+        self._workers = []
+
+        for ring in self._rings.values():
+            ring.close()
+        self._rings = {}
+
+
+def default_face_mesh_options():
+    """FaceMesh constructor options from the settings"""
+    return {
+        'max_num_faces': 1,
+        'refine_landmarks': True,
+        'min_detection_confidence': Settings.get(MIN_DETECTION_CONFIDENCE_KEY, MIN_DETECTION_CONFIDENCE),
+        'min_tracking_confidence': Settings.get(MIN_TRACKING_CONFIDENCE_KEY, MIN_TRACKING_CONFIDENCE),
+    }
+
+
+def create_inference_backend():
+    """Create the FaceMesh backend selected in the settings"""
+    options = default_face_mesh_options()
+    if Settings.get(INFERENCE_BACKEND_KEY, INFERENCE_BACKEND) == BACKEND_PROCESS:
+        return ProcessInferenceBackend(
+            options,
+            workers=Settings.get(INFERENCE_WORKERS_KEY, INFERENCE_WORKERS),
+        )
+
+    mp = importlib.import_module('mediapipe')
+    return ThreadInferenceBackend(mp.solutions.face_mesh.FaceMesh(**options))
@@ -0,0 +1,123 @@
+import struct
+import types
+from unittest import mock
+
+import numpy as np
+
+from .config import LANDMARK_BUFFER_SLOTS_KEY, LANDMARK_BUFFER_SPARE_SLOTS, PIPELINE_QUEUE_SIZE_KEY
+from .inference_backend import (
+    LANDMARK_FIELD_TAGS, LANDMARK_LIST_TAG, ThreadInferenceBackend, landmarks_to_array,
+)
+from .settings import Settings
+
+
+class LandmarkList:
+    """NormalizedLandmarkList stand-in with a protobuf wire encoding of the given float fields"""
+    def __init__(self, values, fields=3):
+        self.landmark = [types.SimpleNamespace(x=x, y=y, z=z) for x, y, z in values.tolist()]
+        self._data = b''.join(self._encode(point, fields) for point in values.tolist())
+
+    @staticmethod
+    def _encode(point, fields):
+        point = list(point) + [1.0] * (fields - 3)  # visibility, presence
+        body = b''.join(struct.pack('<Bf', LANDMARK_FIELD_TAGS[i], point[i]) for i in range(fields))
+        return bytes((LANDMARK_LIST_TAG, len(body))) + body
+
+    def SerializeToString(self):  # pylint: disable=invalid-name
+        return self._data
+
+
+def per_point(face_landmarks):
+    """Reference conversion reading the points one by one"""
+    result = np.empty((len(face_landmarks.landmark), 3), dtype=np.float32)
+    for i, point in enumerate(face_landmarks.landmark):
+        result[i] = point.x, point.y, point.z
+    return result
+
+
+def make_values(count=478, seed=0):
+    return np.random.default_rng(seed).uniform(-0.2, 1.2, (count, 3)).astype(np.float32)
+
+
+def test_serialized_matches_per_point():
+    for fields in (3, 4, 5):
+        face = LandmarkList(make_values(), fields)
+        result = landmarks_to_array(face)
+        assert result.dtype == np.float32 and result.shape == (478, 3)
+        assert np.array_equal(result, per_point(face))
+
+
+def test_repeated_field_matches_per_point():
+    # The landmark field alone has no wire encoding and is read point by point
+    face = LandmarkList(make_values())
+    assert np.array_equal(landmarks_to_array(face.landmark), per_point(face))
+
+
+def test_unexpected_encoding_falls_back_to_per_point():
+    face = LandmarkList(make_values())
+    # Fields out of order: MediaPipe never writes them like this, but the loop still handles it
+    data = bytearray(face.SerializeToString())
+    data[2], data[7] = data[7], data[2]
+    face.SerializeToString = lambda: bytes(data)
+    assert np.array_equal(landmarks_to_array(face), per_point(face))
+
+    face.SerializeToString = lambda: b''
+    assert np.array_equal(landmarks_to_array(face), per_point(face))
+
+
+def test_out_is_reused():
+    face = LandmarkList(make_values())
+    out = np.empty((478, 3), dtype=np.float32)
+    assert landmarks_to_array(face, out=out) is out
+    assert np.array_equal(out, per_point(face))
+
+    # An out of the wrong shape is replaced
+    small = np.empty((10, 3), dtype=np.float32)
+    result = landmarks_to_array(face, out=small)
+    assert result is not small and np.array_equal(result, per_point(face))
+
+
+def test_array_passes_through():
+    values = make_values()
+    assert landmarks_to_array(values) is values
+    assert landmarks_to_array(values.astype(np.float64)).dtype == np.float32
+
+
+class SequenceFaceMesh:
+    """FaceMesh stand-in answering with a new face of serialized landmarks per frame"""
+    def __init__(self):
+        self.frames = 0
+
+    def process(self, frame_rgb):  # pylint: disable=unused-argument
+        self.frames += 1
+        return types.SimpleNamespace(multi_face_landmarks=[LandmarkList(make_values(seed=self.frames))])
+
+    def close(self):
+        pass
+
+
+def settings_with(overrides):
+    return mock.patch.object(Settings, 'get', lambda path, default=None: overrides.get(path, default))
+
+
+def test_landmark_slots_follow_the_configured_queue_size():
+    with settings_with({PIPELINE_QUEUE_SIZE_KEY: 7}):
+        backend = ThreadInferenceBackend(SequenceFaceMesh())
+    # pylint: disable-next=protected-access
+    assert len(backend._landmark_slots) == 2 * 7 + LANDMARK_BUFFER_SPARE_SLOTS
+
+    with settings_with({PIPELINE_QUEUE_SIZE_KEY: 7, LANDMARK_BUFFER_SLOTS_KEY: 3}):
+        backend = ThreadInferenceBackend(SequenceFaceMesh())
+    assert len(backend._landmark_slots) == 3  # pylint: disable=protected-access
+
+
+def test_results_stay_valid_for_the_slot_rotation():
+    backend = ThreadInferenceBackend(SequenceFaceMesh(), landmark_slots=4)
+    results = [backend.process(None).multi_face_landmarks[0] for _ in range(4)]
+    for seed, landmarks in enumerate(results, start=1):
+        assert np.array_equal(landmarks, make_values(seed=seed))
+
+    # The fifth result reuses the arrays of the first one, without allocating
+    fifth = backend.process(None).multi_face_landmarks[0]
+    assert fifth is results[0]
+    assert np.array_equal(results[1], make_values(seed=2))
@@ -0,0 +1,293 @@
+"""Compact landmark recording and replay"""
+import os
+import struct
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from .inference_backend import FaceMeshResult, landmarks_to_array
+from .pipeline import BoundedQueue, DROP_OLDEST
+
+# File layout: 64 byte header followed by fixed-size frame records. Records
+# are written in chunks of chunk_frames; with delta encoding the first record
+# of every chunk holds absolute values and the others the difference to the
+# previous record, so each chunk decodes on its own.
+_MAGIC = b'GTLM'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHBBHI')  # magic, version, points, quantization, delta, reserved, chunk_frames
+HEADER_SIZE = 64
+
+QUANTIZATION_INT16 = 'int16'
+QUANTIZATION_FLOAT16 = 'float16'
+_QUANTIZATIONS = (QUANTIZATION_INT16, QUANTIZATION_FLOAT16)
+
+# int16 fixed point: normalized coordinates in [-2, 2) with 1/16384 resolution
+INT16_SCALE = 16384
+
+# Landmarks per face with refined iris landmarks
+FACE_MESH_POINTS = 478
+
+
+def record_dtype(points, quantization):
+    """NumPy dtype of one frame record"""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('width', '<u2'),
+        ('height', '<u2'),
+        ('faces', '<u2'),
+        ('reserved', '<u2'),
+        ('points', '<i2' if quantization == QUANTIZATION_INT16 else '<f2', (points, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """Writes per-frame landmarks to a compact chunked file from a background thread.
+
+    record() only hands the landmarks to the writer thread, conversion,
+    quantization and disk writes happen off the live loop. If the writer
+    falls behind, the oldest pending frames are dropped and counted.
+    """
+    def __init__(self, path, quantization=QUANTIZATION_INT16, delta=False,
+                 chunk_frames=256, points=FACE_MESH_POINTS, queue_size=1024):
+        if quantization not in _QUANTIZATIONS:
+            raise ValueError(f"Unknown landmark quantization: {quantization}")
+        if delta and quantization != QUANTIZATION_INT16:
+            # float16 deltas would accumulate rounding errors
+            raise ValueError("Delta encoding requires int16 quantization")
+
+        self.path = path
+        self.quantization = quantization
+        self.delta = delta
+        self.chunk_frames = chunk_frames
+        self.points = points
+
+        self._file = open(path, 'wb')  # pylint: disable=consider-using-with
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, points, _QUANTIZATIONS.index(quantization), int(delta), 0, chunk_frames)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+        self._chunk = np.zeros(chunk_frames, dtype=record_dtype(points, quantization))
+        self._chunk_length = 0
+
+        self._queue = BoundedQueue(queue_size, DROP_OLDEST)
+        self._thread = threading.Thread(target=self._write_loop, name="landmark-recorder")
+        self._thread.daemon = True
+        self._running = True
+        self._thread.start()
+
+        # Statistics
+        self.frames_written = 0
+        self.frames_invalid = 0
+
+    @property
+    def frames_dropped(self):
+        """Frames discarded because the writer fell behind"""
+        return self._queue.items_dropped
+
+    def record(self, timestamp, frame_w, frame_h, face_landmarks):
+        """Queue one frame: normalized landmarks of the first face (array or protobuf) or None"""
+        if isinstance(face_landmarks, np.ndarray):
+            # Inference backends reuse their arrays for later frames
+            face_landmarks = face_landmarks.copy()
+        self._queue.put((timestamp, frame_w, frame_h, face_landmarks))
+
+    def close(self):
+        """Write all pending frames and close the file"""
+        self._running = False
+        self._thread.join()
+
+    def _write_loop(self):
+        """Writer thread"""
+        try:
+            while True:
+                item = self._queue.get(timeout=0.1)
+                if item is None:
+                    if not self._running and self._queue.qsize() == 0:
+                        break
+                    continue
+                self._append(*item)
+            self._flush_chunk()
+        except (OSError, ValueError) as e:
+            print(f"Error writing landmark recording: {e}")
+            traceback.print_exc()
+        finally:
+            self._file.close()
+
+    def _append(self, timestamp, frame_w, frame_h, face_landmarks):
+        """Quantize one frame into the current chunk"""
+        index = self._chunk_length
+        chunk = self._chunk
+        chunk['timestamp'][index] = timestamp
+        chunk['width'][index] = frame_w
+        chunk['height'][index] = frame_h
+        chunk['faces'][index] = 0
+        chunk['points'][index] = 0
+
+        if face_landmarks is not None:
+            landmarks = landmarks_to_array(face_landmarks)
+            if landmarks.shape == (self.points, 3):
+                chunk['faces'][index] = 1
+                chunk['points'][index] = self._quantize(landmarks)
+            else:
+                self.frames_invalid += 1
+
+        self._chunk_length += 1
+        if self._chunk_length == self.chunk_frames:
+            self._flush_chunk()
+
+    def _quantize(self, landmarks):
+        """Quantize normalized landmarks to the record point type"""
+        if self.quantization == QUANTIZATION_INT16:
+            return np.clip(np.round(landmarks * INT16_SCALE), -32768, 32767).astype(np.int16)
+        return landmarks.astype(np.float16)
+
+    def _flush_chunk(self):
+        """Write the filled part of the current chunk"""
+        if self._chunk_length == 0:
+            return
+        chunk = self._chunk[:self._chunk_length]
+        if self.delta:
+            # int16 arithmetic wraps around, cumulative sums restore the exact values
+            points = chunk['points']
+            chunk = chunk.copy()
+            chunk['points'][1:] = points[1:] - points[:-1]
+
+        self._file.write(chunk.tobytes())
+        self._file.flush()
+        self.frames_written += self._chunk_length
+        self._chunk_length = 0
+
+
+class LandmarkRecording:
+    """Memory-mapped reader of a landmark recording"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Not a landmark recording: {path}")
+        magic, version, points, quantization, delta, _, chunk_frames = _HEADER.unpack_from(header)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a landmark recording: {path}")
+
+        self.path = path
+        self.points = points
+        self.quantization = _QUANTIZATIONS[quantization]
+        self.delta = bool(delta)
+        self.chunk_frames = chunk_frames
+
+        # A partially written last record (e.g. after a crash) is ignored
+        dtype = record_dtype(points, self.quantization)
+        frames = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if frames > 0:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(frames,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+        self._chunk_index = None
+        self._chunk_points = None
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        """Capture timestamps of all frames"""
+        return self.records['timestamp']
+
+    def frame(self, index):
+        """Decode one frame.
+
+        Returns:
+            tuple: (timestamp, (width, height), landmarks) where landmarks is a
+            float32 (N, 3) array of normalized coordinates or None without a face
+        """
+        record = self.records[index]
+        timestamp = float(record['timestamp'])
+        frame_size = (int(record['width']), int(record['height']))
+        if not record['faces']:
+            return timestamp, frame_size, None
+
+        if self.delta:
+            points = self._chunk_points_at(index)
+        else:
+            points = record['points']
+
+        if self.quantization == QUANTIZATION_INT16:
+            landmarks = points.astype(np.float32) / INT16_SCALE
+        else:
+            landmarks = points.astype(np.float32)
+        return timestamp, frame_size, landmarks
+
+    def _chunk_points_at(self, index):
+        """Absolute points of a delta-encoded frame; the containing chunk is decoded once"""
+        chunk_index, offset = divmod(index, self.chunk_frames)
+        if chunk_index != self._chunk_index:
+            start = chunk_index * self.chunk_frames
+            deltas = self.records['points'][start:start + self.chunk_frames]
+            self._chunk_points = np.cumsum(deltas, axis=0, dtype=np.int16)
+            self._chunk_index = chunk_index
+        return self._chunk_points[offset]
+
+
+class LandmarkReplay:
+    """Feeds a recording back as FaceMesh results, at recorded or maximum speed"""
+    def __init__(self, recording, realtime=True, loop=False):
+        if not isinstance(recording, LandmarkRecording):
+            recording = LandmarkRecording(recording)
+        self.recording = recording
+        self.realtime = realtime
+        self.loop = loop
+
+    def __iter__(self):
+        """Yield (timestamp, (width, height), FaceMeshResult) per recorded frame"""
+        while True:
+            start_time = time.monotonic()
+            first_timestamp = None
+            for index in range(len(self.recording)):
+                timestamp, frame_size, landmarks = self.recording.frame(index)
+
+                if self.realtime:
+                    if first_timestamp is None:
+                        first_timestamp = timestamp
+                    delay = start_time + (timestamp - first_timestamp) - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                yield timestamp, frame_size, FaceMeshResult([landmarks] if landmarks is not None else [])
+
+            if not self.loop or not self.recording:
+                return
+
+    def frames(self):
+        """Yield (frame, FaceMeshResult) per recorded frame; frame is a black image of the recorded size"""
+        blank_frames = {}
+        for _, (width, height), mesh_results in self:
+            blank = blank_frames.get((width, height))
+            if blank is None:
+                blank = np.zeros((height, width, 3), dtype=np.uint8)
+                blank_frames[(width, height)] = blank
+
+            # The processor may draw on the frame it gets
+            yield blank.copy(), mesh_results
+
+    def feed(self, image_processor, callback=None):
+        """Run every replayed frame through ImageProcessor.process_face_mesh.
+
+        callback, if given, receives each processing result; its frame goes
+        back to the processor's frame pool once the callback returns.
+
+        Returns:
+            int: Number of frames processed
+        """
+        frames = 0
+        for frame, mesh_results in self.frames():
+            results = image_processor.process_face_mesh(frame, mesh_results)
+            frames += 1
+            try:
+                if callback is not None:
+                    callback(results)
+            finally:
+                image_processor.release_frame(results['frame'])
+        return frames
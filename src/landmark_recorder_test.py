@@ -0,0 +1,164 @@
+import os
+import tempfile
+
+import numpy as np
+
+from .headless import HeadlessApp
+from .image_processor import ImageProcessor
+from .landmark_recorder import (
+    LandmarkRecorder, LandmarkRecording, LandmarkReplay, FACE_MESH_POINTS, HEADER_SIZE, INT16_SCALE,
+    QUANTIZATION_FLOAT16, QUANTIZATION_INT16,
+)
+
+POINTS = 8
+
+
+def make_frames(count, seed=0):
+    """Landmarks per frame, every third frame without a face"""
+    rng = np.random.default_rng(seed)
+    return [
+        None if i % 3 == 2 else rng.uniform(-0.5, 1.5, (POINTS, 3)).astype(np.float32)
+        for i in range(count)
+    ]
+
+
+def record(path, frames, quantization, delta, chunk_frames=4):
+    recorder = LandmarkRecorder(path, quantization=quantization, delta=delta,
+                                chunk_frames=chunk_frames, points=POINTS)
+    for i, landmarks in enumerate(frames):
+        recorder.record(i * 0.1, 640, 480, landmarks)
+    recorder.close()
+    assert recorder.frames_written == len(frames)
+    assert recorder.frames_dropped == 0
+
+
+def check_round_trip(quantization, delta, frames, tolerance):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        # 10 frames in chunks of 4: the last chunk is partial
+        record(path, frames, quantization, delta)
+
+        recording = LandmarkRecording(path)
+        assert len(recording) == len(frames)
+        assert recording.quantization == quantization
+        assert recording.delta == delta
+        for i, expected in enumerate(frames):
+            timestamp, frame_size, landmarks = recording.frame(i)
+            assert timestamp == i * 0.1
+            assert frame_size == (640, 480)
+            if expected is None:
+                assert landmarks is None
+            else:
+                assert landmarks.dtype == np.float32
+                assert np.abs(landmarks - expected).max() <= tolerance
+
+
+def test_int16_round_trip():
+    check_round_trip(QUANTIZATION_INT16, False, make_frames(10), 0.5 / INT16_SCALE)
+
+
+def test_float16_round_trip():
+    # float16 keeps 11 significant bits
+    check_round_trip(QUANTIZATION_FLOAT16, False, make_frames(10), 2.0 ** -10)
+
+
+def test_int16_delta_round_trip():
+    check_round_trip(QUANTIZATION_INT16, True, make_frames(10), 0.5 / INT16_SCALE)
+
+
+def test_int16_delta_wraparound():
+    # Jumps between the ends of the int16 range overflow the deltas, decoding must wrap back
+    frames = [np.full((POINTS, 3), -1.99 if i % 2 else 1.99, dtype=np.float32) for i in range(10)]
+    check_round_trip(QUANTIZATION_INT16, True, frames, 0.5 / INT16_SCALE)
+
+
+def test_partial_last_record_is_ignored():
+    frames = make_frames(10)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        record(path, frames, QUANTIZATION_INT16, True)
+
+        # Cut the file in the middle of the last record, as a crash while writing would
+        record_size = (os.path.getsize(path) - HEADER_SIZE) // len(frames)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - record_size // 2)
+
+        recording = LandmarkRecording(path)
+        assert len(recording) == len(frames) - 1
+        _, _, landmarks = recording.frame(7)
+        assert np.abs(landmarks - frames[7]).max() <= 0.5 / INT16_SCALE
+        # Release the memory map before the directory is removed
+        del recording
+
+
+def test_recorded_array_is_copied():
+    landmarks = np.full((POINTS, 3), 0.25, dtype=np.float32)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        recorder = LandmarkRecorder(path, points=POINTS)
+        recorder.record(0.0, 640, 480, landmarks)
+        # Inference backends reuse their arrays for later frames
+        landmarks.fill(0.75)
+        recorder.close()
+
+        recording = LandmarkRecording(path)
+        assert np.allclose(recording.frame(0)[2], 0.25)
+        del recording
+
+
+def test_replay_round_trip():
+    frames = make_frames(10)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        record(path, frames, QUANTIZATION_INT16, True)
+
+        replayed = list(LandmarkReplay(path, realtime=False))
+        assert len(replayed) == len(frames)
+        for i, (timestamp, frame_size, mesh_results) in enumerate(replayed):
+            assert timestamp == i * 0.1
+            assert frame_size == (640, 480)
+            if frames[i] is None:
+                assert not mesh_results.multi_face_landmarks
+            else:
+                landmarks = mesh_results.multi_face_landmarks[0]
+                assert np.abs(landmarks - frames[i]).max() <= 0.5 / INT16_SCALE
+        del replayed
+
+
+def test_replay_loops():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        record(path, make_frames(4), QUANTIZATION_INT16, False)
+        replay = iter(LandmarkReplay(path, realtime=False, loop=True))
+        timestamps = [next(replay)[0] for _ in range(10)]
+        assert timestamps == [(i % 4) * 0.1 for i in range(10)]
+        del replay
+
+
+def test_feed_returns_frames_to_the_pool():
+    rng = np.random.default_rng(0)
+    # A face in most frames, so both the face and the no-face rendering run
+    frames = [
+        None if i % 5 == 4 else rng.uniform(0.4, 0.6, (FACE_MESH_POINTS, 3)).astype(np.float32)
+        for i in range(20)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'landmarks.rec')
+        recorder = LandmarkRecorder(path)
+        for i, landmarks in enumerate(frames):
+            recorder.record(i / 30, 320, 240, landmarks)
+        recorder.close()
+
+        app = HeadlessApp()
+        app.app_state.show_camera.set(False)
+        app.app_state.show_perf_hud.set(False)
+        processor = ImageProcessor(app, {})
+        distances = []
+        replay = LandmarkReplay(path, realtime=False)
+        assert replay.feed(processor, lambda results: distances.append(results['normalized_eye_distance'])) == 20
+        del replay
+
+    stats = processor.get_render_stats()
+    assert stats['frames_in_use'] == 0
+    assert stats['frames_reused'] > 0
+    assert len(distances) == 20 and distances[4] == 0 and distances[0] > 0
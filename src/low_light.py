@@ -0,0 +1,108 @@
+"""Adaptive low-light enhancement of the FaceMesh input"""
+import functools
+import threading
+
+import cv2 as cv
+import numpy as np
+
+ENHANCEMENT_OFF = 'off'
+ENHANCEMENT_AUTO = 'auto'
+ENHANCEMENT_ON = 'on'
+
+_clahe_instances = threading.local()
+
+
+def get_clahe(clip_limit, tile_grid_size):
+    """CLAHE instance for a parameter set, cached per thread (instances keep working buffers)"""
+    cache = getattr(_clahe_instances, 'cache', None)
+    if cache is None:
+        cache = _clahe_instances.cache = {}
+    key = (clip_limit, tuple(tile_grid_size))
+    clahe = cache.get(key)
+    if clahe is None:
+        clahe = cache[key] = cv.createCLAHE(clipLimit=clip_limit, tileGridSize=key[1])
+    return clahe
+
+
+@functools.lru_cache(maxsize=16)
+def gamma_table(gamma):
+    """Read-only 256-entry lookup table applying gamma correction"""
+    table = (np.power(np.arange(256) / 255.0, 1.0 / gamma) * 255).astype(np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+class LowLightEnhancer:
+    """Brightens the FaceMesh input when the scene is dark.
+
+    In 'auto' mode the mean luminance of a small downscaled copy of each
+    frame decides: enhancement turns on below on_luminance and off again
+    above off_luminance, so lighting near the limit does not make it
+    flicker. Enhancement equalizes the lightness channel with CLAHE and
+    applies a gamma curve; the CLAHE instance, the gamma table and the
+    working buffers are reused between frames.
+    """
+    def __init__(self, mode=ENHANCEMENT_AUTO, on_luminance=60, off_luminance=80,
+                 clip_limit=3.0, tile_grid_size=(8, 8), gamma=1.2, sample_size=(64, 36)):
+        self.mode = mode
+        self.on_luminance = on_luminance
+        self.off_luminance = off_luminance
+        self.clip_limit = clip_limit
+        self.tile_grid_size = tuple(tile_grid_size)
+        self.gamma = gamma
+        self.sample_size = tuple(sample_size)
+
+        self.active = mode == ENHANCEMENT_ON
+        self.luminance = None  # Mean luminance (0-255) of the latest measured frame
+
+        # Working buffers, reallocated when the input size changes
+        self._lab = None
+        self._lightness = None
+        self._equalized = None
+
+        # Statistics
+        self.frames_enhanced = 0
+        self.transitions = 0
+
+    def update(self, frame):
+        """Measure the luminance of a BGR frame and decide whether to enhance. Returns the decision"""
+        if self.mode != ENHANCEMENT_AUTO:
+            return self.active
+
+        # Nearest-neighbour sampling only reads the sampled pixels
+        sample = cv.resize(frame, self.sample_size, interpolation=cv.INTER_NEAREST)
+        self.luminance = cv.mean(cv.cvtColor(sample, cv.COLOR_BGR2GRAY))[0]
+
+        if self.active and self.luminance > self.off_luminance:
+            self.active = False
+            self.transitions += 1
+        elif not self.active and self.luminance < self.on_luminance:
+            self.active = True
+            self.transitions += 1
+        return self.active
+
+    def apply(self, image):
+        """Enhance an RGB image in place"""
+        if self._lab is None or self._lab.shape != image.shape:
+            self._lab = np.empty_like(image)
+            self._lightness = np.empty(image.shape[:2], dtype=np.uint8)
+            self._equalized = np.empty(image.shape[:2], dtype=np.uint8)
+
+        lab = cv.cvtColor(image, cv.COLOR_RGB2LAB, dst=self._lab)
+        cv.extractChannel(lab, 0, dst=self._lightness)
+        get_clahe(self.clip_limit, self.tile_grid_size).apply(self._lightness, dst=self._equalized)
+        cv.insertChannel(self._equalized, lab, 0)
+        cv.cvtColor(lab, cv.COLOR_LAB2RGB, dst=image)
+        cv.LUT(image, gamma_table(self.gamma), dst=image)
+        self.frames_enhanced += 1
+        return image
+
+    def get_stats(self):
+        """Mode, current decision and statistics"""
+        return {
+            'mode': self.mode,
+            'active': self.active,
+            'luminance': self.luminance,
+            'frames_enhanced': self.frames_enhanced,
+            'transitions': self.transitions,
+        }
@@ -0,0 +1,71 @@
+import threading
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from .low_light import ENHANCEMENT_OFF, ENHANCEMENT_ON, LowLightEnhancer, gamma_table, get_clahe
+
+
+def gray_frame(level, width=160, height=90):
+    return np.full((height, width, 3), level, dtype=np.uint8)
+
+
+def dark_image(seed=0, width=160, height=90):
+    return np.random.default_rng(seed).integers(0, 60, (height, width, 3), dtype=np.uint8)
+
+
+def test_auto_mode_hysteresis():
+    enhancer = LowLightEnhancer(on_luminance=60, off_luminance=80)
+    decisions = [enhancer.update(gray_frame(level)) for level in (100, 50, 70, 79, 85, 70, 61, 59)]
+
+    # Between the limits the previous decision holds
+    assert decisions == [False, True, True, True, False, False, False, True]
+    assert enhancer.transitions == 3
+    assert enhancer.luminance == pytest.approx(59)
+
+
+def test_fixed_modes_ignore_luminance():
+    assert LowLightEnhancer(mode=ENHANCEMENT_ON).update(gray_frame(255))
+    assert not LowLightEnhancer(mode=ENHANCEMENT_OFF).update(gray_frame(0))
+
+
+def test_apply_matches_clahe_and_gamma():
+    image = dark_image()
+    lab = cv.cvtColor(image, cv.COLOR_RGB2LAB)
+    lab[:, :, 0] = cv.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(lab[:, :, 0])
+    table = (np.power(np.arange(256) / 255.0, 1.0 / 1.2) * 255).astype(np.uint8)
+    expected = cv.LUT(cv.cvtColor(lab, cv.COLOR_LAB2RGB), table)
+
+    enhancer = LowLightEnhancer(clip_limit=3.0, tile_grid_size=(8, 8), gamma=1.2)
+    result = enhancer.apply(image)
+    assert result is image
+    assert np.array_equal(result, expected)
+    assert enhancer.frames_enhanced == 1
+
+
+def test_buffers_and_tables_are_reused():
+    # pylint: disable=protected-access
+    enhancer = LowLightEnhancer()
+    enhancer.apply(dark_image(0))
+    lab = enhancer._lab
+    enhancer.apply(dark_image(1))
+    assert enhancer._lab is lab
+
+    # A new input size gets new buffers
+    enhancer.apply(dark_image(2, width=80, height=45))
+    assert enhancer._lab is not lab and enhancer._lab.shape == (45, 80, 3)
+
+    assert get_clahe(3.0, (8, 8)) is get_clahe(3.0, [8, 8])
+    assert get_clahe(3.0, (8, 8)) is not get_clahe(2.0, (8, 8))
+    table = gamma_table(1.2)
+    assert gamma_table(1.2) is table
+    assert not table.flags.writeable
+
+
+def test_clahe_instances_are_per_thread():
+    instances = []
+    thread = threading.Thread(target=lambda: instances.append(get_clahe(3.0, (8, 8))))
+    thread.start()
+    thread.join()
+    assert instances[0] is not get_clahe(3.0, (8, 8))
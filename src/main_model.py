@@ -1,93 +1,495 @@
 """Main model for processing video frames"""
-import queue
-import threading
 import time
-import traceback
 
+from .config import (
+    PIPELINE_QUEUE_SIZE, PIPELINE_QUEUE_SIZE_KEY,
+    PIPELINE_DROP_POLICY, PIPELINE_DROP_POLICY_KEY,
+    FRAME_RING_SPARE_SLOTS, FRAME_RING_SLOTS_KEY,
+    TARGET_FPS, TARGET_FPS_KEY,
+    POWER_SAVING_ENABLED, POWER_SAVING_ENABLED_KEY,
+    IDLE_TIMEOUT_S, IDLE_TIMEOUT_S_KEY,
+    IDLE_CAPTURE_RESOLUTION, IDLE_CAPTURE_RESOLUTION_KEY,
+    IDLE_TARGET_FPS, IDLE_TARGET_FPS_KEY,
+    FACE_ROI_TRACKING, FACE_ROI_TRACKING_KEY,
+    FACE_ROI_MARGIN, FACE_ROI_MARGIN_KEY,
+    INFERENCE_RESOLUTION, INFERENCE_RESOLUTION_KEY,
+    ENHANCEMENT_MODE, ENHANCEMENT_MODE_KEY,
+    LOW_LIGHT_ON_LUMINANCE, LOW_LIGHT_OFF_LUMINANCE, LOW_LIGHT_SAMPLE_SIZE,
+    LOW_LIGHT_CLAHE_CLIP_LIMIT, LOW_LIGHT_CLAHE_TILE_GRID, LOW_LIGHT_GAMMA,
+    LANDMARK_RECORDING_PATH, LANDMARK_RECORDING_PATH_KEY,
+    LANDMARK_RECORDING_QUANTIZATION, LANDMARK_RECORDING_QUANTIZATION_KEY,
+    LANDMARK_RECORDING_DELTA, LANDMARK_RECORDING_DELTA_KEY,
+    METRICS_PORT, METRICS_PORT_KEY,
+    PROFILE_DURATION_S, PROFILE_DURATION_S_KEY,
+    PROFILE_OUTPUT_DIR, PROFILE_OUTPUT_DIR_KEY,
+    PROFILE_SAMPLE_INTERVAL_MS,
+)
+from .face_roi import FaceRoiTracker
+from .inference_backend import landmark_points
+from .frame_grabber import FrameGrabber
+from .frame_pacer import FramePacer
 from .image_processor import ImageProcessor
+from .landmark_recorder import LandmarkRecorder
+from .low_light import LowLightEnhancer
+from .metrics_server import MetricsServer
+from .perf_stats import PerfStats
+from .pipeline import BoundedQueue, PipelineStage
+from .profiler import Profiler
+from .power_state import POWER_ACTIVE, POWER_IDLE, PowerStateMachine
 from .screen_state import is_screen_on
+from .settings import Settings
 
 class MainModel:
-    """Model for processing video frames and managing processing thread"""
-    def __init__(self, app, modules, cap, mp_face_mesh, refresh_delay_ms):
+    """Model for processing video frames and managing the processing pipeline.
+
+    Frames flow through three stages, each in its own worker thread:
+    capture (FrameGrabber) -> inference (FaceMesh) -> render (ImageProcessor).
+    Stages are connected by bounded queues, so throughput is limited by the
+    slowest stage and memory stays flat when the UI falls behind. Camera
+    frames stay in the grabber's shared-memory ring until the render stage
+    copies them once; queued inference results only reference ring slots.
+    """
+    def __init__(self, app, modules, cap, mp_face_mesh, record_path=None, render=True,
+                 metrics_port=None, profile_duration=None):
         self.app = app  # Reference to main app for UI elements
         self.modules = modules
         self.cap = cap
         self.mp_face_mesh = mp_face_mesh
-        self.refresh_delay_ms = refresh_delay_ms
+        self.inference_backend = mp_face_mesh  # Thread or process FaceMesh backend
+        self.render = render  # False: only compute metrics, results carry no frame
+
+        # Stage queues
+        queue_size = Settings.get(PIPELINE_QUEUE_SIZE_KEY, PIPELINE_QUEUE_SIZE)
+        drop_policy = Settings.get(PIPELINE_DROP_POLICY_KEY, PIPELINE_DROP_POLICY)
+        self.render_queue = BoundedQueue(queue_size, drop_policy, on_drop=self._release_inference)
+        self.process_queue = BoundedQueue(queue_size, drop_policy, on_drop=self.release_result)
+
+        # On-demand profiling; pipeline threads call its checkpoint every iteration
+        self.profiler = Profiler(
+            Settings.get(PROFILE_OUTPUT_DIR_KEY, PROFILE_OUTPUT_DIR),
+            sample_interval_ms=PROFILE_SAMPLE_INTERVAL_MS,
+        )
+        self.profile_duration = profile_duration or Settings.get(PROFILE_DURATION_S_KEY, PROFILE_DURATION_S)
+
+        # Create capture thread that keeps only the freshest frame
+        self.frame_grabber = FrameGrabber(
+            cap,
+            ring_slots=Settings.get(FRAME_RING_SLOTS_KEY, queue_size + FRAME_RING_SPARE_SLOTS),
+            on_iteration=self.profiler.checkpoint,
+        )
+
+        # Pace inference to the target frame rate
+        self.target_fps = Settings.get(TARGET_FPS_KEY, TARGET_FPS)
+        self.pacer = FramePacer(self.target_fps)
+
+        # Drop to low resolution and frame rate when nobody is in front of the camera
+        self.power_state = PowerStateMachine(
+            idle_timeout=Settings.get(IDLE_TIMEOUT_S_KEY, IDLE_TIMEOUT_S),
+            enabled=Settings.get(POWER_SAVING_ENABLED_KEY, POWER_SAVING_ENABLED),
+        )
+        self.full_resolution = self.frame_grabber.get_resolution()
+        self._idle_frame = None
+        self._idle_frame_key = None  # (display size, mirror, show camera) the idle frame was drawn with
+
+        # Size the UI displays frames at; rendering targets it directly (None: camera resolution)
+        self.display_size = None
+
+        # FaceMesh input is downscaled to this size, rendering keeps the capture resolution
+        self.inference_resolution = Settings.get(INFERENCE_RESOLUTION_KEY, INFERENCE_RESOLUTION)
 
-        # Thread control
-        self.process_queue = queue.Queue()
-        self.processing_thread = None
-        self.should_process = True
+        # Run inference on a crop around the last detected face
+        self.roi_tracker = FaceRoiTracker(
+            margin=Settings.get(FACE_ROI_MARGIN_KEY, FACE_ROI_MARGIN),
+            enabled=Settings.get(FACE_ROI_TRACKING_KEY, FACE_ROI_TRACKING),
+        )
+
+        # Brighten the FaceMesh input while the scene is dark
+        self.low_light = LowLightEnhancer(
+            mode=Settings.get(ENHANCEMENT_MODE_KEY, ENHANCEMENT_MODE),
+            on_luminance=LOW_LIGHT_ON_LUMINANCE,
+            off_luminance=LOW_LIGHT_OFF_LUMINANCE,
+            clip_limit=LOW_LIGHT_CLAHE_CLIP_LIMIT,
+            tile_grid_size=LOW_LIGHT_CLAHE_TILE_GRID,
+            gamma=LOW_LIGHT_GAMMA,
+            sample_size=LOW_LIGHT_SAMPLE_SIZE,
+        )
+
+        # Optional landmark recording, written by a background thread
+        record_path = record_path or Settings.get(LANDMARK_RECORDING_PATH_KEY, LANDMARK_RECORDING_PATH)
+        self.recorder = None
+        if record_path:
+            self.recorder = LandmarkRecorder(
+                record_path,
+                quantization=Settings.get(LANDMARK_RECORDING_QUANTIZATION_KEY, LANDMARK_RECORDING_QUANTIZATION),
+                delta=Settings.get(LANDMARK_RECORDING_DELTA_KEY, LANDMARK_RECORDING_DELTA),
+            )
+
+        # Rolling per-stage latency histograms, shared with the UI, the overlay and the metrics endpoint
+        self.perf_stats = PerfStats()
+        self._above_threshold = False
+
+        # Optional Prometheus endpoint on localhost
+        metrics_port = metrics_port or Settings.get(METRICS_PORT_KEY, METRICS_PORT)
+        self.metrics_server = MetricsServer(self, metrics_port) if metrics_port else None
 
         # Create image processor
-        self.image_processor = ImageProcessor(self.app, self.modules)
+        self.image_processor = ImageProcessor(self.app, self.modules, perf_stats=self.perf_stats)
+
+        # Create inference and render stages
+        self.inference_stage = PipelineStage(
+            "inference",
+            source=self._next_capture,
+            process=self._run_inference,
+            output_queue=self.render_queue,
+            on_iteration=self.profiler.checkpoint,
+        )
+        self.render_stage = PipelineStage(
+            "render",
+            source=self.render_queue.get,
+            process=self._run_render,
+            output_queue=self.process_queue,
+            on_iteration=self.profiler.checkpoint,
+        )
 
         # Screen state caching
         self._last_screen_check = 0
         self._screen_state = True
 
+    @property
+    def should_process(self):
+        """True while the pipeline is running"""
+        return self.inference_stage.is_running
+
+    @property
+    def source_finished(self):
+        """True once a source without looping has ended and its last frame left the pipeline"""
+        return (
+            self.frame_grabber.end_of_stream
+            and not self.frame_grabber.has_pending_frame
+            and not self.inference_stage.is_busy
+            and self.render_queue.qsize() == 0
+            and not self.render_stage.is_busy
+            and self.process_queue.qsize() == 0
+        )
+
     def start(self):
-        """Start processing thread"""
-        self.should_process = True
-        self.processing_thread = threading.Thread(target=self._processing_loop)
-        self.processing_thread.daemon = True
-        self.processing_thread.start()
+        """Start capture, inference and render threads"""
+        self.frame_grabber.start()
+        self.render_stage.start()
+        self.inference_stage.start()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        if self.profile_duration:
+            self.profiler.request(self.profile_duration)
 
     def stop(self):
-        """Stop processing thread"""
-        self.should_process = False
-        if self.processing_thread is not None:
-            self.processing_thread.join(timeout=1.0)
+        """Stop all pipeline threads"""
+        # Write a running profile while the threads can still hand over
+        self.profiler.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.render_queue.close()
+        self.process_queue.close()
+        self.inference_stage.stop()
+        self.render_stage.stop()
+        self.frame_grabber.stop()
+        self.inference_backend.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
-    def get_next_result(self):
-        """Get next processing result if available"""
-        try:
-            return self.process_queue.get_nowait()
-        except queue.Empty:
+    def get_next_result(self, timeout=0):
+        """Get next processing result if available, waiting up to timeout seconds.
+
+        Call release_result once the result's frame has been displayed.
+        """
+        return self.process_queue.get(timeout=timeout)
+
+    def release_result(self, results):
+        """Let the renderer reuse the frame of a consumed or dropped result"""
+        self.image_processor.release_frame(results.get('frame'))
+
+    def get_capture_stats(self):
+        """Get capture statistics (captured/dropped frames, latest frame age)"""
+        return self.frame_grabber.get_stats()
+
+    def get_pipeline_stats(self):
+        """Get queue depths and drop counts of all pipeline stages"""
+        return {
+            'capture': self.frame_grabber.get_stats(),
+            'render_queue': self.render_queue.get_stats(),
+            'result_queue': self.process_queue.get_stats(),
+            'pacing': self.pacer.get_stats(),
+            'power_state': self.power_state.state,
+            'roi_tracking': self.roi_tracker.get_stats(),
+            'low_light': self.low_light.get_stats(),
+            'render_pool': self.image_processor.get_render_stats(),
+            'latency': self.perf_stats.snapshot(),
+            'recording': {
+                'frames_written': self.recorder.frames_written,
+                'frames_dropped': self.recorder.frames_dropped,
+            } if self.recorder is not None else None,
+        }
+
+    def _record_perf_stats(self, timings, results):
+        """Add the stage durations and detection outcome of one frame to the statistics"""
+        stats = self.perf_stats
+        for name, value in timings.items():
+            stats.record(name, value)
+
+        face_detected = bool(results['mesh_results'].multi_face_landmarks)
+        eye_distance = results['normalized_eye_distance']
+        above_threshold = face_detected and eye_distance > results['threshold_value']
+        if above_threshold and not self._above_threshold:
+            stats.increment('threshold_crossings')
+        self._above_threshold = above_threshold
+
+        stats.increment('frames_processed')
+        stats.record('face_present', 1.0 if face_detected else 0.0)
+        stats.set_gauge('normalized_eye_distance', eye_distance)
+        stats.set_gauge('threshold', results['threshold_value'])
+        stats.set_gauge('fps', results['fps'])
+        self.perf_stats.set_gauge(
+            'frames_dropped',
+            self.frame_grabber.frames_dropped + self.render_queue.items_dropped + self.process_queue.items_dropped,
+        )
+
+    def _next_capture(self, timeout):
+        """Inference stage source: freshest captured frame while the screen is on"""
+        # Check if screen is on (caching with 1 second update)
+        current_time = time.time()
+        if current_time - self._last_screen_check >= 1.0:
+            self._screen_state = is_screen_on()
+            self._last_screen_check = current_time
+
+        # Don't keep the camera busy while nobody can see the result
+        self.frame_grabber.set_paused(not self._screen_state)
+        if not self._screen_state:
+            time.sleep(timeout)
+            self.pacer.reset()
             return None
 
-    def _processing_loop(self):
-        """Background thread for continuous frame processing"""
-        while self.should_process:
-            try:
-                # Check if screen is on (caching with 1 second update)
-                current_time = time.time()
-                if current_time - self._last_screen_check >= 1.0:
-                    self._screen_state = is_screen_on()
-                    self._last_screen_check = current_time
-
-                # Use cached screen state
-                if self._screen_state:
-                    # Get required modules
-                    cv = self.modules['cv2']
-                    # Image = self.modules['PIL']
-
-                    ret, frame = self.cap.read()
-                    if ret and not frame is None:
-                        # Apply mirror effect if enabled
-                        if self.app.app_state.mirror_effect.get():
-                            frame = cv.flip(frame, 1)
-
-                        # Convert frame for FaceMesh
-                        frame_rgb = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-
-                        # Process frame using FaceMesh
-                        mesh_results = self.mp_face_mesh.process(frame_rgb)
-
-                        results = self.image_processor.process_face_mesh(
-                            frame,
-                            mesh_results,
-                        )
-                        results['mesh_results'] = mesh_results
-                        results['threshold_value'] = self.app.app_state.threshold_value.get()
-                        self.process_queue.put(results)
-
-                # Wait for next frame
-                time.sleep(self.refresh_delay_ms / 1000)
-
-            except Exception as e:
-                print(f"Error in processing loop: {e}")
-                traceback.print_exc()
-                time.sleep(self.refresh_delay_ms / 1000)
+        # Sleep only the slack left until the next frame deadline
+        self.pacer.wait()
+
+        return self.frame_grabber.get_latest(timeout=timeout)
+
+    def _run_inference(self, capture):
+        """Inference stage: run FaceMesh on a captured frame.
+
+        The frame is read straight from its ring slot; the mirror effect is
+        applied to the downscaled FaceMesh input only.
+        """
+        try:
+            mirror = self.app.app_state.mirror_effect.get()
+            timings = {'capture_read_ms': capture.read_ms}
+            mesh_results = self._detect_face_mesh(capture.frame, mirror, timings)
+
+            if self.recorder is not None:
+                faces = mesh_results.multi_face_landmarks
+                self.recorder.record(
+                    capture.timestamp,
+                    capture.frame.shape[1],
+                    capture.frame.shape[0],
+                    faces[0] if faces else None,
+                )
+
+            # Switch power mode on face presence changes
+            transition = self.power_state.update(bool(mesh_results.multi_face_landmarks))
+            if transition is not None:
+                self._apply_power_state(transition)
+        except Exception:
+            capture.release()
+            raise
+
+        return {
+            'capture': capture,
+            'mirror': mirror,
+            'frame_timestamp': capture.timestamp,
+            'mesh_results': mesh_results,
+            'power_state': self.power_state.state,
+            'timings': timings,
+            'inference_done': time.perf_counter(),
+        }
+
+    @staticmethod
+    def _release_inference(inference):
+        """Unpin the ring slot of an inference result that will not be rendered"""
+        inference['capture'].release()
+
+    def _detect_face_mesh(self, frame, mirror, timings):
+        """Run FaceMesh on the tracked face region, falling back to the full frame"""
+        img_h, img_w = frame.shape[:2]
+
+        # Decide on low-light enhancement from the whole frame
+        self.low_light.update(frame)
+
+        region, roi = self.roi_tracker.crop(frame, mirror)
+
+        # Process frame using FaceMesh
+        mesh_results = self._infer(region, img_w, img_h, mirror, timings)
+
+        if roi is not None:
+            if mesh_results.multi_face_landmarks:
+                self.roi_tracker.remap(landmark_points(mesh_results.multi_face_landmarks[0]), roi, img_w, img_h)
+            else:
+                # Tracking lost: detect again on the full frame
+                self.roi_tracker.lost()
+                mesh_results = self._infer(frame, img_w, img_h, mirror, timings)
+
+        if mesh_results.multi_face_landmarks:
+            self.roi_tracker.update(landmark_points(mesh_results.multi_face_landmarks[0]), img_w, img_h)
+        else:
+            self.roi_tracker.reset()
+
+        return mesh_results
+
+    def _infer(self, region, frame_w, frame_h, mirror, timings):
+        """Convert a frame region and run FaceMesh on it, adding up conversion and inference time"""
+        start = time.perf_counter()
+        inference_input = self._to_inference_input(region, frame_w, frame_h, mirror)
+        converted = time.perf_counter()
+        mesh_results = self.inference_backend.process(inference_input)
+
+        timings['convert_ms'] = timings.get('convert_ms', 0.0) + (converted - start) * 1000
+        timings['inference_ms'] = timings.get('inference_ms', 0.0) + (time.perf_counter() - converted) * 1000
+        return mesh_results
+
+    def _to_inference_input(self, region, frame_w, frame_h, mirror=False):
+        """Downscale a frame region to the inference resolution and convert it for FaceMesh.
+
+        The scale is derived from the full frame size, so crops keep the same
+        pixel density as full-frame inference. FaceMesh returns normalized
+        landmarks, so no coordinate correction is needed afterwards. The result
+        is written into the backend's input buffer (shared memory for worker
+        processes). In dim lighting the input is enhanced in place.
+        """
+        cv = self.modules['cv2']
+
+        max_w, max_h = self.inference_resolution
+        scale = min(1.0, max_w / frame_w, max_h / frame_h)
+        if scale < 1.0:
+            size = (
+                max(1, round(region.shape[1] * scale)),
+                max(1, round(region.shape[0] * scale)),
+            )
+            region = cv.resize(region, size, interpolation=cv.INTER_AREA)
+
+        buffer = self.inference_backend.input_buffer(region.shape)
+
+        # Apply mirror effect if enabled
+        if mirror:
+            cv.flip(region, 1, dst=buffer)
+            region = buffer
+
+        # Convert frame for FaceMesh
+        inference_input = cv.cvtColor(region, cv.COLOR_BGR2RGB, dst=buffer)
+        if self.low_light.active:
+            self.low_light.apply(inference_input)
+        return inference_input
+
+    def _apply_power_state(self, state):
+        """Reconfigure capture and pacing for the given power state"""
+        if state == POWER_IDLE:
+            width, height = Settings.get(IDLE_CAPTURE_RESOLUTION_KEY, IDLE_CAPTURE_RESOLUTION)
+            idle_fps = Settings.get(IDLE_TARGET_FPS_KEY, IDLE_TARGET_FPS)
+            self.frame_grabber.request_resolution(width, height, idle_fps)
+            self.pacer.set_target_fps(idle_fps)
+        elif state == POWER_ACTIVE:
+            width, height = self.full_resolution
+            self.frame_grabber.request_resolution(width, height, self.target_fps)
+            self.pacer.set_target_fps(self.target_fps)
+            # Start the next full quality frame right away
+            self.pacer.reset()
+
+    def _run_render(self, inference):
+        """Render stage: draw FaceMesh results and build the UI result"""
+        render_start = time.perf_counter()
+        timings = inference['timings']
+        timings['render_queue_wait_ms'] = (render_start - inference['inference_done']) * 1000
+
+        capture = inference['capture']
+        # Read once per frame: the UI may toggle it meanwhile, and a frame prepared for
+        # camera-off rendering is the ring slot itself, which must not be drawn on
+        show_camera = self.app.app_state.show_camera.get()
+        try:
+            if not self.render:
+                results = self.image_processor.measure_face_mesh(
+                    capture.frame.shape[1],
+                    capture.frame.shape[0],
+                    inference['mesh_results'],
+                )
+            elif inference['power_state'] == POWER_IDLE:
+                # Draw the "No face detected" frame once and reuse it while idle
+                idle_frame_key = (self.display_size, inference['mirror'], show_camera)
+                if self._idle_frame is None or self._idle_frame_key != idle_frame_key:
+                    self._idle_frame_key = idle_frame_key
+                    self._idle_frame = self.image_processor.process_face_mesh(
+                        self._render_frame(capture.frame, inference['mirror'], show_camera),
+                        inference['mesh_results'],
+                        show_camera=show_camera,
+                    )['frame']
+                    # Shown repeatedly, so the frame pool must not hand it out again
+                    self.image_processor.detach_frame(self._idle_frame)
+                results = {
+                    'frame': self._idle_frame,
+                    'normalized_eye_distance': 0,
+                    'mesh_points': None,
+                }
+            else:
+                self._idle_frame = None
+                results = self.image_processor.process_face_mesh(
+                    self._render_frame(capture.frame, inference['mirror'], show_camera),
+                    inference['mesh_results'],
+                    source_size=(capture.frame.shape[1], capture.frame.shape[0]),
+                    show_camera=show_camera,
+                )
+        finally:
+            capture.release()
+
+        results['mesh_results'] = inference['mesh_results']
+        results['threshold_value'] = self.app.app_state.threshold_value.get()
+        results['frame_timestamp'] = inference['frame_timestamp']
+        results['frame_age_ms'] = self.frame_grabber.frame_age(inference['frame_timestamp']) * 1000
+        results['frames_dropped'] = self.frame_grabber.frames_dropped
+        results['fps'] = self.pacer.achieved_fps()
+        results['power_state'] = inference['power_state']
+
+        # Per-stage latency of this frame; render_done lets the consumer measure its queue wait
+        render_done = time.perf_counter()
+        timings['render_ms'] = (render_done - render_start) * 1000
+        self._record_perf_stats(timings, results)
+        results['timings'] = timings
+        results['render_done'] = render_done
+        return results
+
+    def set_display_size(self, width, height):
+        """Render frames at the size they are displayed at (None, None: camera resolution)"""
+        size = (int(width), int(height)) if width and height else None
+        if size != self.display_size:
+            self.display_size = size
+            self.image_processor.set_output_size(size)
+
+    def _render_frame(self, frame, mirror, show_camera):
+        """Frame the image processor draws on.
+
+        The camera image leaves its ring slot exactly once: resized to the
+        display size if one is set, otherwise copied, flipped on the way when
+        mirrored. Without the camera view only the frame size is used, so the
+        slot is passed as is.
+        """
+        cv = self.modules['cv2']
+        if not show_camera:
+            return frame
+
+        display_size = self.display_size
+        if display_size is not None and display_size != (frame.shape[1], frame.shape[0]):
+            # Bilinear unless shrinking enough to alias; INTER_AREA is slow at fractional ratios
+            strong_shrink = display_size[0] * 2 <= frame.shape[1] and display_size[1] * 2 <= frame.shape[0]
+            resized = cv.resize(
+                frame, display_size, interpolation=cv.INTER_AREA if strong_shrink else cv.INTER_LINEAR)
+            if mirror:
+                cv.flip(resized, 1, dst=resized)
+            return resized
+        if mirror:
+            return cv.flip(frame, 1)
+        return frame.copy()
@@ -0,0 +1,74 @@
+import time
+from unittest import mock
+
+import cv2 as cv
+import numpy as np
+
+from .config import FRAME_RING_SPARE_SLOTS, PIPELINE_QUEUE_SIZE_KEY
+from .frame_ring import FrameRef
+from .frame_sources import SyntheticSource
+from .headless import HeadlessApp
+from .inference_backend import FaceMeshResult
+from .main_model import MainModel
+from .power_state import POWER_IDLE
+from .settings import Settings
+
+WIDTH, HEIGHT = 320, 240
+
+
+class StubBackend:
+    """Inference backend that is never asked for results"""
+    def close(self):
+        pass
+
+
+def make_model():
+    app = HeadlessApp()
+    app.app_state.show_perf_hud.set(False)
+    return MainModel(app, {'cv2': cv}, SyntheticSource(WIDTH, HEIGHT, realtime=False), StubBackend())
+
+
+def render_idle(model, mirror=False, show_camera=False):
+    """Render a no-face frame in idle mode and return the displayed frame"""
+    model.app.app_state.show_camera.set(show_camera)
+    frame = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    inference = {
+        'capture': FrameRef(frame, time.monotonic(), 0),
+        'mirror': mirror,
+        'frame_timestamp': time.monotonic(),
+        'mesh_results': FaceMeshResult([]),
+        'power_state': POWER_IDLE,
+        'timings': {},
+        'inference_done': time.perf_counter(),
+    }
+    return model._run_render(inference)['frame']  # pylint: disable=protected-access
+
+
+def test_idle_frame_is_reused():
+    model = make_model()
+    assert render_idle(model) is render_idle(model)
+
+
+def test_idle_frame_is_redrawn_on_setting_changes():
+    model = make_model()
+    frame = render_idle(model)
+
+    camera = render_idle(model, show_camera=True)
+    assert camera is not frame
+    mirrored = render_idle(model, mirror=True, show_camera=True)
+    assert mirrored is not camera
+    # The camera image is flipped, the idle frame must show that
+    assert not np.array_equal(mirrored, camera)
+    assert render_idle(model, mirror=True, show_camera=True) is mirrored
+
+    model.set_display_size(160, 120)
+    resized = render_idle(model, mirror=True, show_camera=True)
+    assert resized.shape[:2] == (120, 160)
+
+
+def test_ring_slots_follow_the_configured_queue_size():
+    overrides = {PIPELINE_QUEUE_SIZE_KEY: 5}
+    with mock.patch.object(Settings, 'get', lambda path, default=None: overrides.get(path, default)):
+        model = make_model()
+    assert model.render_queue.maxsize == 5
+    assert model.frame_grabber.ring_slots == 5 + FRAME_RING_SPARE_SLOTS
@@ -0,0 +1,159 @@
+"""Localhost HTTP endpoint serving pipeline metrics in Prometheus text format"""
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import METRICS_HOST
+
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'eye_tracker_'
+
+
+class MetricsBuilder:
+    """Accumulates metric families in Prometheus exposition format"""
+    def __init__(self):
+        self._lines = []
+
+    def family(self, name, metric_type, help_text):
+        """Start a metric family"""
+        self._lines.append(f"# HELP {PREFIX}{name} {help_text}")
+        self._lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+
+    def sample(self, name, value, labels=None):
+        """Add one sample of the current family"""
+        if labels:
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            self._lines.append(f"{PREFIX}{name}{{{label_text}}} {format_value(value)}")
+        else:
+            self._lines.append(f"{PREFIX}{name} {format_value(value)}")
+
+    def histogram(self, name, histogram, labels, scale=0.001):
+        """Add the cumulative buckets, sum and count of a RollingHistogram (ms exported as seconds)"""
+        cumulative = histogram.cumulative_buckets()
+        for bound, count in zip(histogram.buckets, cumulative):
+            self.sample(f"{name}_bucket", count, {**labels, 'le': format_value(bound * scale)})
+        # Count from the bucket snapshot keeps +Inf and _count consistent while the stage records
+        self.sample(f"{name}_bucket", cumulative[-1], {**labels, 'le': '+Inf'})
+        self.sample(f"{name}_sum", histogram.total * scale, labels)
+        self.sample(f"{name}_count", cumulative[-1], labels)
+
+    def text(self):
+        """Exposition text"""
+        return '\n'.join(self._lines) + '\n'
+
+
+def format_value(value):
+    """Format a sample value"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render_metrics(model):
+    """Prometheus exposition text for the current state of a MainModel.
+
+    Reads counters and histograms the pipeline threads update without
+    locks, so a scrape never blocks the hot path; values read mid-update
+    are at most one frame apart.
+    """
+    stats = model.perf_stats
+    grabber = model.frame_grabber
+    queues = {'render': model.render_queue, 'result': model.process_queue}
+    metrics = MetricsBuilder()
+
+    metrics.family('frames_captured_total', 'counter', "Frames read from the frame source")
+    metrics.sample('frames_captured_total', grabber.frames_captured)
+
+    metrics.family('frames_processed_total', 'counter', "Frames that went through inference and rendering")
+    metrics.sample('frames_processed_total', stats.counter('frames_processed'))
+
+    metrics.family('frames_dropped_total', 'counter', "Frames discarded because a later stage was busy")
+    metrics.sample('frames_dropped_total', grabber.frames_dropped, {'stage': 'capture'})
+    for name, queue in queues.items():
+        metrics.sample('frames_dropped_total', queue.items_dropped, {'stage': f"{name}_queue"})
+
+    metrics.family('stage_latency_seconds', 'histogram', "Per-frame duration of each pipeline stage")
+    for name, histogram in sorted(stats.histograms().items()):
+        if name.endswith('_ms'):
+            metrics.histogram('stage_latency_seconds', histogram, {'stage': name[:-3]})
+
+    face_present = stats.histograms().get('face_present')
+    metrics.family('face_present_ratio', 'gauge', "Share of recent frames with a detected face")
+    metrics.sample('face_present_ratio', face_present.mean() if face_present is not None else 0.0)
+
+    metrics.family('normalized_eye_distance', 'gauge', "Normalized eye distance of the latest frame")
+    metrics.sample('normalized_eye_distance', stats.gauge('normalized_eye_distance', 0.0))
+
+    metrics.family('threshold', 'gauge', "Strabismus detection threshold")
+    metrics.sample('threshold', stats.gauge('threshold', 0.0))
+
+    metrics.family('threshold_crossings_total', 'counter', "Times the eye distance rose above the threshold")
+    metrics.sample('threshold_crossings_total', stats.counter('threshold_crossings'))
+
+    metrics.family('queue_depth', 'gauge', "Items waiting in a stage queue")
+    for name, queue in queues.items():
+        metrics.sample('queue_depth', queue.qsize(), {'queue': name})
+
+    metrics.family('queue_capacity', 'gauge', "Capacity of a stage queue")
+    for name, queue in queues.items():
+        metrics.sample('queue_capacity', queue.maxsize, {'queue': name})
+
+    metrics.family('fps', 'gauge', "Achieved processing frame rate")
+    metrics.sample('fps', stats.gauge('fps', 0.0))
+
+    return metrics.text()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics"""
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer a scrape"""
+        if self.path.split('?', 1)[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = render_metrics(self.server.model).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep scrapes out of the console"""
+
+
+class MetricsServer:
+    """Background HTTP server exposing a MainModel's metrics on localhost"""
+    def __init__(self, model, port, host=METRICS_HOST):
+        self.model = model
+        self.port = port
+        self.host = host
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Bind and serve in a daemon thread. Returns False if the port is unavailable"""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        except OSError as e:
+            print(f"Error starting metrics endpoint on {self.host}:{self.port}: {e}")
+            traceback.print_exc()
+            return False
+        self._server.daemon_threads = True
+        self._server.model = self.model
+        self.port = self._server.server_address[1]  # Actual port when 0 was requested
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        print(f"Metrics endpoint: http://{self.host}:{self.port}{METRICS_PATH}")
+        return True
+
+    def stop(self):
+        """Shut the server down"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
@@ -0,0 +1,108 @@
+import re
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+
+from .metrics_server import CONTENT_TYPE, PREFIX, MetricsServer, render_metrics
+from .perf_stats import LATENCY_BUCKETS_MS, PerfStats
+from .pipeline import BoundedQueue
+
+SAMPLE_LINE = re.compile(r'^(\w+)(?:\{([^}]*)\})? (\S+)$')
+
+
+def make_model():
+    """Just the parts of MainModel render_metrics reads"""
+    stats = PerfStats()
+    for value in (0.5, 3.0, 3.0, 40.0, 2000.0):
+        stats.record('inference_ms', value)
+    stats.record('render_ms', 7.0)
+    stats.record('face_present', 1.0)
+    stats.record('face_present', 0.0)
+    stats.increment('frames_processed', 5)
+    stats.set_gauge('fps', 29.5)
+
+    render_queue = BoundedQueue(2)
+    render_queue.put('frame')
+    return types.SimpleNamespace(
+        perf_stats=stats,
+        frame_grabber=types.SimpleNamespace(frames_captured=9, frames_dropped=4),
+        render_queue=render_queue,
+        process_queue=BoundedQueue(3),
+    )
+
+
+def parse(text):
+    """Exposition text as {family: type} and a list of (name, labels, value)"""
+    families = {}
+    samples = []
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            families[name] = metric_type
+        elif not line.startswith('#'):
+            match = SAMPLE_LINE.match(line)
+            assert match, line
+            name, labels, value = match.groups()
+            labels = dict(re.findall(r'(\w+)="([^"]*)"', labels or ''))
+            samples.append((name, labels, float(value)))
+    return families, samples
+
+
+def find(samples, name, **labels):
+    return [value for sample_name, sample_labels, value in samples
+            if sample_name == PREFIX + name and all(sample_labels.get(k) == v for k, v in labels.items())]
+
+
+def test_exposition_format():
+    text = render_metrics(make_model())
+    assert text.endswith('\n')
+    families, samples = parse(text)
+
+    # Every sample belongs to a declared family
+    for name, _, _ in samples:
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in families else name
+        assert family in families, name
+    assert families[PREFIX + 'stage_latency_seconds'] == 'histogram'
+
+    assert find(samples, 'frames_captured_total') == [9]
+    assert find(samples, 'frames_processed_total') == [5]
+    assert find(samples, 'frames_dropped_total', stage='capture') == [4]
+    assert find(samples, 'queue_depth', queue='render') == [1]
+    assert find(samples, 'queue_capacity', queue='result') == [3]
+    assert find(samples, 'face_present_ratio') == [0.5]
+    assert find(samples, 'fps') == [29.5]
+
+
+def test_histogram_buckets_are_consistent():
+    _, samples = parse(render_metrics(make_model()))
+    buckets = [(labels['le'], value) for name, labels, value in samples
+               if name == PREFIX + 'stage_latency_seconds_bucket' and labels['stage'] == 'inference']
+
+    bounds = [le for le, _ in buckets]
+    assert bounds[:-1] == [repr(bound / 1000) for bound in LATENCY_BUCKETS_MS]
+    assert bounds[-1] == '+Inf'
+    counts = [count for _, count in buckets]
+    assert counts == sorted(counts)
+    # 0.5 ms; 3 ms twice; 40 ms; 2 s beyond the last bound
+    assert counts[0] == 1 and counts[LATENCY_BUCKETS_MS.index(5)] == 3 and counts[-2] == 4
+    assert counts[-1] == 5
+    assert find(samples, 'stage_latency_seconds_count', stage='inference') == [5]
+    assert find(samples, 'stage_latency_seconds_sum', stage='inference') == [pytest.approx(2.0465)]
+
+
+def test_server_answers_scrapes():
+    server = MetricsServer(make_model(), 0)
+    assert server.start()
+    try:
+        url = f"http://{server.host}:{server.port}"
+        with urllib.request.urlopen(url + '/metrics', timeout=5) as response:
+            assert response.headers['Content-Type'] == CONTENT_TYPE
+            assert PREFIX + 'fps 29.5' in response.read().decode('utf-8')
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + '/other', timeout=5)  # pylint: disable=consider-using-with
+        assert error.value.code == 404
+    finally:
+        server.stop()
@@ -0,0 +1,132 @@
+"""Always-on performance instrumentation: rolling histograms of stage durations"""
+import bisect
+import threading
+
+import numpy as np
+
+# Samples kept per histogram
+HISTOGRAM_WINDOW = 256
+
+# Upper bounds (ms) of the cumulative latency buckets exported to Prometheus
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 20, 33, 50, 100, 250, 500, 1000)
+
+
+class RollingHistogram:
+    """Fixed-size ring of the latest samples plus running totals.
+
+    Recording writes into a preallocated NumPy array, so the hot path does
+    not allocate. Each histogram is meant to have a single writer thread;
+    readers may see a sample being replaced, which is fine for statistics.
+    Lifetime bucket counts (for Prometheus) are kept next to the window.
+    """
+    def __init__(self, window=HISTOGRAM_WINDOW, buckets=LATENCY_BUCKETS_MS):
+        self._values = np.zeros(window, dtype=np.float64)
+        self._index = 0
+        self.count = 0  # Samples recorded since start
+        self.total = 0.0  # Sum of all samples since start
+        self.last = 0.0
+        self.buckets = tuple(buckets)
+        self._bucket_counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+
+    def record(self, value):
+        """Add one sample"""
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self._bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def cumulative_buckets(self):
+        """Lifetime sample counts per bucket upper bound, cumulative; the last entry is +Inf"""
+        cumulative = []
+        running = 0
+        for count in list(self._bucket_counts):
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+    def _window(self):
+        """Samples currently held in the ring"""
+        return self._values[:min(self.count, len(self._values))]
+
+    def mean(self):
+        """Mean of the rolling window"""
+        window = self._window()
+        return float(window.mean()) if len(window) else 0.0
+
+    def percentile(self, q):
+        """Percentile of the rolling window"""
+        window = self._window()
+        return float(np.percentile(window, q)) if len(window) else 0.0
+
+    def summary(self):
+        """Window statistics"""
+        window = self._window()
+        if len(window) == 0:
+            return {'count': self.count, 'last': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        p50, p95 = np.percentile(window, (50, 95))
+        return {
+            'count': self.count,
+            'last': self.last,
+            'mean': float(window.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'max': float(window.max()),
+        }
+
+
+class PerfStats:
+    """Registry of named rolling histograms and gauges shared by the pipeline and the UI"""
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.window = window
+        self._histograms = {}
+        self._gauges = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        """Get (or create) the histogram for name"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, RollingHistogram(self.window))
+        return histogram
+
+    def record(self, name, value):
+        """Add one duration sample (ms) to the histogram for name"""
+        self.histogram(name).record(value)
+
+    def set_gauge(self, name, value):
+        """Set the current value of a gauge (e.g. FPS, dropped frames)"""
+        self._gauges[name] = value
+
+    def gauge(self, name, default=0):
+        """Current value of a gauge"""
+        return self._gauges.get(name, default)
+
+    def increment(self, name, amount=1):
+        """Add to a monotonic counter (single writer per counter)"""
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counter(self, name):
+        """Current value of a counter"""
+        return self._counters.get(name, 0)
+
+    def histograms(self):
+        """Name to histogram mapping, safe to iterate while stages record"""
+        with self._lock:
+            return dict(self._histograms)
+
+    def mean(self, name):
+        """Rolling mean of a histogram, 0 if nothing was recorded"""
+        histogram = self._histograms.get(name)
+        return histogram.mean() if histogram is not None else 0.0
+
+    def snapshot(self):
+        """Summaries of all histograms and current gauge values"""
+        return {
+            'histograms': {name: histogram.summary() for name, histogram in self.histograms().items()},
+            'gauges': dict(self._gauges),
+            'counters': dict(self._counters),
+        }
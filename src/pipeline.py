@@ -0,0 +1,194 @@
+"""Bounded queues and worker threads for the staged processing pipeline"""
+import collections
+import threading
+import time
+import traceback
+
+# Queue overflow policies
+DROP_OLDEST = 'drop_oldest'  # Discard the oldest queued item to make room for the new one
+KEEP_LATEST = 'keep_latest'  # Discard everything queued and keep only the new item
+BLOCK = 'block'  # Make the producer wait for free space (backpressure)
+
+DROP_POLICIES = (DROP_OLDEST, KEEP_LATEST, BLOCK)
+
+
+class BoundedQueue:
+    """Thread-safe bounded queue with a configurable overflow policy.
+
+    Unlike queue.Queue, the queue never grows past maxsize: depending on the
+    drop policy a full queue either drops items or blocks the producer, so
+    memory stays flat when a downstream stage falls behind. on_drop is called
+    with every discarded item, e.g. to release resources the item holds.
+    """
+    def __init__(self, maxsize=2, drop_policy=DROP_OLDEST, on_drop=None):
+        if maxsize < 1:
+            raise ValueError(f"Queue size must be positive: {maxsize}")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.on_drop = on_drop
+        self._items = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Statistics
+        self.items_put = 0
+        self.items_dropped = 0
+
+    def put(self, item, timeout=None):
+        """Put item into the queue, applying the drop policy when full.
+
+        Returns:
+            bool: False if the item was not queued (queue closed or timed out)
+        """
+        dropped = []
+        with self._condition:
+            timed_out = False
+            if self.drop_policy == BLOCK:
+                timed_out = not self._condition.wait_for(
+                    lambda: len(self._items) < self.maxsize or self._closed,
+                    timeout)
+            elif self.drop_policy == KEEP_LATEST:
+                dropped.extend(self._items)
+                self.items_dropped += len(self._items)
+                self._items.clear()
+            elif len(self._items) >= self.maxsize:
+                dropped.append(self._items.popleft())
+                self.items_dropped += 1
+
+            queued = not timed_out and not self._closed
+            if queued:
+                self._items.append(item)
+                self.items_put += 1
+                self._condition.notify_all()
+            else:
+                dropped.append(item)
+
+        # Callbacks run outside the lock
+        if self.on_drop is not None:
+            for dropped_item in dropped:
+                self.on_drop(dropped_item)
+        return queued
+
+    def get(self, timeout=None):
+        """Get the oldest item, waiting up to timeout seconds.
+
+        Returns:
+            Queued item or None if the queue stayed empty
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def get_nowait(self):
+        """Get the oldest item if available"""
+        return self.get(timeout=0)
+
+    def qsize(self):
+        """Current number of queued items"""
+        return len(self._items)
+
+    def close(self):
+        """Wake up all waiting producers and consumers, discard queued items and reject new ones"""
+        with self._condition:
+            self._closed = True
+            dropped = list(self._items)
+            self._items.clear()
+            self._condition.notify_all()
+
+        if self.on_drop is not None:
+            for item in dropped:
+                self.on_drop(item)
+
+    def get_stats(self):
+        """Get queue statistics"""
+        return {
+            'depth': len(self._items),
+            'capacity': self.maxsize,
+            'items_put': self.items_put,
+            'items_dropped': self.items_dropped,
+        }
+
+
+class PipelineStage:
+    """Worker thread running a single pipeline stage.
+
+    The stage repeatedly pulls an item from source, transforms it with process
+    and pushes the result to output_queue. source is a callable taking a
+    timeout in seconds and returning an item or None; process may return None
+    to skip producing output for the item. on_iteration, if given, is called
+    from the worker thread at the top of every loop (profiler hook).
+    """
+    def __init__(self, name, source, process, output_queue=None, poll_timeout=0.1, error_delay=0.1,
+                 on_iteration=None):
+        self.name = name
+        self.source = source
+        self.process = process
+        self.output_queue = output_queue
+        self.poll_timeout = poll_timeout
+        self.error_delay = error_delay
+        self.on_iteration = on_iteration
+
+        self._thread = None
+        self._running = False
+        self._busy = False
+
+        # Statistics
+        self.items_processed = 0
+
+    @property
+    def is_running(self):
+        """True while the worker thread is active"""
+        return self._running
+
+    @property
+    def is_busy(self):
+        """True while an item taken from source is being processed"""
+        return self._busy
+
+    def start(self):
+        """Start worker thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-stage")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop worker thread"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        """Worker loop"""
+        while self._running:
+            try:
+                if self.on_iteration is not None:
+                    self.on_iteration()
+
+                item = self.source(self.poll_timeout)
+                if item is None:
+                    continue
+
+                self._busy = True
+                result = self.process(item)
+                self.items_processed += 1
+
+                if result is not None and self.output_queue is not None:
+                    self.output_queue.put(result)
+
+            except Exception as e:
+                print(f"Error in {self.name} stage: {e}")
+                traceback.print_exc()
+                time.sleep(self.error_delay)
+            finally:
+                self._busy = False
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from .pipeline import BoundedQueue, BLOCK, DROP_OLDEST, KEEP_LATEST
+
+
+def test_drop_oldest():
+    dropped = []
+    queue = BoundedQueue(2, DROP_OLDEST, on_drop=dropped.append)
+    for item in range(5):
+        assert queue.put(item)
+
+    assert dropped == [0, 1, 2]
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0) == 4
+    assert queue.get(timeout=0) is None
+    assert queue.get_stats() == {'depth': 0, 'capacity': 2, 'items_put': 5, 'items_dropped': 3}
+
+
+def test_keep_latest():
+    dropped = []
+    queue = BoundedQueue(3, KEEP_LATEST, on_drop=dropped.append)
+    for item in range(4):
+        assert queue.put(item)
+
+    # Every put discards whatever was still queued
+    assert dropped == [0, 1, 2]
+    assert queue.qsize() == 1
+    assert queue.get(timeout=0) == 3
+
+
+def test_block():
+    dropped = []
+    queue = BoundedQueue(1, BLOCK, on_drop=dropped.append)
+    assert queue.put('first')
+
+    # A full queue times out instead of dropping; the rejected item goes to on_drop
+    assert not queue.put('second', timeout=0.05)
+    assert dropped == ['second']
+    assert queue.items_dropped == 0
+
+    # A blocked producer resumes once the consumer makes room
+    producer = threading.Thread(target=queue.put, args=('third',))
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive()
+    assert queue.get(timeout=1) == 'first'
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert queue.get(timeout=1) == 'third'
+
+
+def test_close_drops_queued_items():
+    dropped = []
+    queue = BoundedQueue(3, DROP_OLDEST, on_drop=dropped.append)
+    queue.put('a')
+    queue.put('b')
+    queue.close()
+
+    assert dropped == ['a', 'b']
+    assert not queue.put('c')
+    assert dropped == ['a', 'b', 'c']
+    assert queue.get(timeout=0) is None
+
+
+def test_close_wakes_blocked_producer():
+    queue = BoundedQueue(1, BLOCK)
+    queue.put('first')
+    results = []
+    producer = threading.Thread(target=lambda: results.append(queue.put('second')))
+    producer.start()
+    time.sleep(0.05)
+    queue.close()
+    producer.join(timeout=1)
+    assert results == [False]
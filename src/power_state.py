@@ -0,0 +1,53 @@
+"""Power state machine switching between full quality and idle low-power mode"""
+import time
+
+POWER_ACTIVE = 'active'
+POWER_IDLE = 'idle'
+
+
+class PowerStateMachine:
+    """Tracks face presence and decides when the pipeline may idle.
+
+    The machine enters the idle state after idle_timeout seconds without a
+    detected face and returns to the active state on the first frame that
+    contains a face again.
+    """
+    def __init__(self, idle_timeout, enabled=True):
+        self.idle_timeout = idle_timeout
+        self.enabled = enabled
+        self.state = POWER_ACTIVE
+        self._last_face_time = time.monotonic()
+
+        # Statistics
+        self.transitions = 0
+
+    @property
+    def is_idle(self):
+        """True while in low-power mode"""
+        return self.state == POWER_IDLE
+
+    def update(self, face_present, now=None):
+        """Feed the face presence of the latest frame.
+
+        Returns:
+            str: New state if the state changed on this frame, otherwise None
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if face_present:
+            self._last_face_time = now
+            return self._set_state(POWER_ACTIVE)
+
+        if self.enabled and now - self._last_face_time >= self.idle_timeout:
+            return self._set_state(POWER_IDLE)
+
+        return None
+
+    def _set_state(self, state):
+        """Switch state and report the transition"""
+        if state == self.state:
+            return None
+        self.state = state
+        self.transitions += 1
+        return state
@@ -0,0 +1,40 @@
+from .power_state import PowerStateMachine, POWER_ACTIVE, POWER_IDLE
+
+
+def make_machine(idle_timeout=2.0, enabled=True):
+    machine = PowerStateMachine(idle_timeout, enabled=enabled)
+    machine.update(True, now=0.0)
+    return machine
+
+
+def test_active_idle_active():
+    machine = make_machine()
+    assert machine.state == POWER_ACTIVE
+
+    assert machine.update(False, now=2.0) == POWER_IDLE
+    assert machine.is_idle
+    # The first frame with a face wakes the pipeline up
+    assert machine.update(True, now=2.1) == POWER_ACTIVE
+    assert not machine.is_idle
+    assert machine.transitions == 2
+
+
+def test_idle_only_after_the_timeout():
+    machine = make_machine()
+    for now in (0.5, 1.0, 1.99):
+        assert machine.update(False, now=now) is None
+    assert machine.state == POWER_ACTIVE
+
+    # A face in between restarts the timeout
+    machine.update(True, now=1.5)
+    assert machine.update(False, now=3.0) is None
+    assert machine.update(False, now=3.5) == POWER_IDLE
+    # Transitions are reported once
+    assert machine.update(False, now=10.0) is None
+    assert machine.transitions == 1
+
+
+def test_disabled_never_idles():
+    machine = make_machine(enabled=False)
+    assert machine.update(False, now=100.0) is None
+    assert machine.state == POWER_ACTIVE
@@ -0,0 +1,170 @@
+"""On-demand profile capture of the pipeline threads and the Tk main thread"""
+import collections
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+
+
+class Profiler:
+    """Captures a cProfile and a sampled collapsed-stack profile for a fixed duration.
+
+    Threads take part by calling checkpoint() once per loop iteration: while a
+    capture runs, the first checkpoint enables cProfile for that thread and the
+    first one after it ends hands the profile over. A sampler thread records
+    the stacks of all threads at a fixed interval for flame graphs. When no
+    capture is running, checkpoint() costs two attribute reads.
+
+    Output: <output_dir>/profile-<timestamp>.prof (pstats, all threads merged)
+    and profile-<timestamp>.collapsed ("thread;outer;...;inner count" lines).
+    """
+    def __init__(self, output_dir, sample_interval_ms=5, handover_timeout=1.0):
+        self.output_dir = output_dir
+        self.sample_interval_ms = sample_interval_ms
+        self.handover_timeout = handover_timeout
+
+        self._active = False
+        self._generation = 0
+        self._running = {}  # Thread ident -> (generation, name, cProfile.Profile)
+        self._finished = []  # (generation, name, cProfile.Profile)
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self.last_outputs = None  # Paths written by the latest capture
+
+    @property
+    def is_capturing(self):
+        """True while a capture is in progress"""
+        return self._sampler is not None
+
+    def request(self, duration_s):
+        """Start capturing for duration_s seconds. Returns False if a capture is already running"""
+        with self._lock:
+            if self._sampler is not None:
+                return False
+            self._generation += 1
+            self._stop_event.clear()
+            self._active = True
+            self._sampler = threading.Thread(
+                target=self._capture,
+                args=(self._generation, duration_s),
+                name="profiler",
+                daemon=True,
+            )
+            self._sampler.start()
+        print(f"Profiling for {duration_s:g} s")
+        return True
+
+    def stop(self):
+        """End a running capture early and wait until its files are written"""
+        sampler = self._sampler
+        if sampler is not None:
+            self._stop_event.set()
+            sampler.join()
+
+    def checkpoint(self):
+        """Called by profiled threads once per iteration"""
+        if not self._active and not self._running:
+            return
+
+        ident = threading.get_ident()
+        entry = self._running.get(ident)
+        if self._active:
+            if entry is None or entry[0] != self._generation:
+                if entry is not None and entry[2] is not None:
+                    entry[2].disable()  # Left over from a capture this thread did not hand over in time
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Python 3.12+ allows one active cProfile per process; the sampler still covers this thread
+                    profile = None
+                self._running[ident] = (self._generation, threading.current_thread().name, profile)
+        elif entry is not None:
+            del self._running[ident]
+            if entry[2] is not None:
+                entry[2].disable()
+                with self._lock:
+                    self._finished.append(entry)
+
+    def _capture(self, generation, duration_s):
+        """Sampler thread: collect stacks until the deadline, then write the results"""
+        try:
+            stacks = self._sample(duration_s)
+            self._active = False
+            profiles = self._collect_profiles(generation)
+            self._write(stacks, profiles)
+        except Exception as e:
+            print(f"Error capturing profile: {e}")
+            traceback.print_exc()
+        finally:
+            self._active = False
+            with self._lock:
+                self._sampler = None
+
+    def _sample(self, duration_s):
+        """Count collapsed stacks of all other threads"""
+        stacks = collections.Counter()
+        own_ident = threading.get_ident()
+        interval = self.sample_interval_ms / 1000
+        deadline = time.perf_counter() + duration_s
+
+        while time.perf_counter() < deadline and not self._stop_event.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if ident == own_ident:
+                    continue
+                stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+        return stacks
+
+    @staticmethod
+    def _collapse(thread_name, frame):
+        """Collapsed-stack line of a frame, outermost call first"""
+        calls = []
+        while frame is not None:
+            code = frame.f_code
+            calls.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        calls.append(thread_name)
+        return ';'.join(reversed(calls))
+
+    def _collect_profiles(self, generation):
+        """Wait for the threads to hand over their profiles, taking stragglers as they are"""
+        deadline = time.perf_counter() + self.handover_timeout
+        while time.perf_counter() < deadline and any(
+                entry[0] == generation for entry in list(self._running.values())):
+            time.sleep(0.01)
+
+        with self._lock:
+            finished, self._finished = self._finished, []
+        # Threads that ended or block elsewhere never reached another checkpoint
+        finished.extend(entry for entry in list(self._running.values()) if entry[0] == generation)
+        return [
+            (name, profile) for entry_generation, name, profile in finished
+            if entry_generation == generation and profile is not None
+        ]
+
+    def _write(self, stacks, profiles):
+        """Write the pstats and collapsed-stack files"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        outputs = []
+
+        if profiles:
+            stats = pstats.Stats(profiles[0][1])
+            for _, profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(base + '.prof')
+            outputs.append(base + '.prof')
+
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        outputs.append(base + '.collapsed')
+
+        self.last_outputs = outputs
+        threads = ', '.join(sorted(name for name, _ in profiles)) or "none"
+        print(f"Profile written to {', '.join(outputs)} (cProfile threads: {threads})")
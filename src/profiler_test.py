@@ -0,0 +1,75 @@
+import os
+import pstats
+import threading
+import time
+
+from .profiler import Profiler
+
+
+def busy_work():
+    return sum(i * i for i in range(2000))
+
+
+def test_checkpoint_without_capture_does_nothing(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    profiler.checkpoint()
+    assert not profiler.is_capturing
+    assert not profiler._running  # pylint: disable=protected-access
+
+
+def test_profile_handover_across_generations(tmp_path):
+    # pylint: disable=protected-access
+    profiler = Profiler(str(tmp_path))
+    profiler._generation = 1
+    profiler._active = True
+    profiler.checkpoint()
+    first = profiler._running[threading.get_ident()]
+    assert first[0] == 1
+
+    # The thread missed the end of capture 1 and sees capture 2 next: the old profile is dropped
+    profiler._generation = 2
+    profiler.checkpoint()
+    second = profiler._running[threading.get_ident()]
+    assert second[0] == 2 and second[2] is not first[2]
+
+    # First checkpoint after the capture ended hands the profile over
+    profiler._active = False
+    busy_work()
+    profiler.checkpoint()
+    assert not profiler._running
+    profiles = profiler._collect_profiles(2)
+    assert [profile for _, profile in profiles] == [second[2]]
+    # Profiles of another capture are not mixed in
+    profiler._finished.append(first)
+    assert not profiler._collect_profiles(2)
+
+
+def test_capture_writes_profiles_of_checkpointing_threads(tmp_path):
+    profiler = Profiler(str(tmp_path), sample_interval_ms=1)
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            profiler.checkpoint()
+            busy_work()
+        profiler.checkpoint()
+
+    thread = threading.Thread(target=worker, name="test-worker")
+    thread.start()
+    try:
+        assert profiler.request(0.2)
+        assert not profiler.request(0.2)
+        time.sleep(0.1)
+        # Ends the capture early and waits for the files
+        profiler.stop()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert not profiler.is_capturing
+    prof_path, collapsed_path = profiler.last_outputs
+    assert os.path.dirname(prof_path) == str(tmp_path)
+    functions = {name for _, _, name in pstats.Stats(prof_path).stats}
+    assert 'busy_work' in functions
+    with open(collapsed_path, encoding='utf-8') as f:
+        assert any(line.startswith('test-worker;') for line in f)
@@ -1,5 +1,9 @@
-import win32con
-import win32gui
+try:
+    import win32con
+    import win32gui
+except ImportError:
+    # Not on Windows (or pywin32 is missing): the screen is assumed to be on
+    win32con = win32gui = None
 
 # pylint: disable=c-extension-no-member
 def is_screen_on():
@@ -9,6 +13,9 @@ def is_screen_on():
     Returns:
         bool: True if screen is on and system is not locked, False otherwise
     """
+    if win32gui is None:
+        return True
+
     try:
         # Check desktop lock state
         h_desktop = win32gui.OpenDesktop("Default", 0, False, win32con.MAXIMUM_ALLOWED)
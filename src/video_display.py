@@ -0,0 +1,93 @@
+"""Backends showing rendered frames in the video label"""
+import warnings
+
+import customtkinter as ctk
+import numpy as np
+
+from .config import DISPLAY_BACKEND, DISPLAY_BACKEND_KEY
+from .settings import Settings
+
+DISPLAY_BACKEND_PHOTOIMAGE = 'photoimage'
+DISPLAY_BACKEND_CTKIMAGE = 'ctkimage'
+
+
+class PhotoFrameBuffer:
+    """Reusable RGB image that ImageTk.PhotoImage.paste copies from directly.
+
+    paste() first converts every image that is not block-allocated in the
+    photo's mode into a new block. Image.new and Image.frombuffer never
+    return block images, so the buffer is allocated as one and each BGR
+    frame is decoded into it in place, swapping the channels on the way.
+    The buffer is only reallocated when the size changes.
+    """
+    def __init__(self, modules):
+        self.cv = modules['cv2']
+        self.Image = modules['PIL']  # pylint: disable=invalid-name
+        self.size = None
+        self.image = None
+        self._resized = None  # Frames not rendered at the display size yet are resized into it
+
+    def convert(self, frame, size):
+        """RGB PIL image of frame at size (width, height), valid until the next call"""
+        if self.size != size:
+            self.size = size
+            block = self.Image.core.new_block('RGB', size)
+            self.image = self.Image.Image()._new(block)  # pylint: disable=protected-access
+            self._resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+
+        if (frame.shape[1], frame.shape[0]) != size:
+            # The render stage has not caught up with a resize yet
+            frame = self.cv.resize(frame, size, dst=self._resized, interpolation=self.cv.INTER_LINEAR)
+        self.image.frombytes(np.ascontiguousarray(frame), 'raw', 'BGR')
+        return self.image
+
+
+class PhotoImageDisplay:
+    """Updates one Tk photo image in place.
+
+    The PhotoImage is created at the label size and only recreated when the
+    label is resized; every frame is pasted into it from a PhotoFrameBuffer
+    of the same mode, so paste() converts nothing.
+    Frames are rendered at the label's pixel size, so CTkImage's HighDPI
+    scaling is not needed.
+    """
+    def __init__(self, label, modules):
+        self.label = label
+        self.ImageTk = modules['ImageTk']  # pylint: disable=invalid-name
+        self.buffer = PhotoFrameBuffer(modules)
+        self.photo = None
+        self.photos_created = 0
+
+    def show(self, frame, size):
+        """Display frame at size (width, height)"""
+        image = self.buffer.convert(frame, size)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != size:
+            self.photo = self.ImageTk.PhotoImage('RGB', size)
+            self.photos_created += 1
+            with warnings.catch_warnings():
+                # CTkLabel warns that plain Tk images are not scaled on HighDPI displays
+                warnings.simplefilter('ignore')
+                self.label.configure(image=self.photo)
+        self.photo.paste(image)
+
+
+class CTkImageDisplay:
+    """Creates a CTkImage per frame (resized by CustomTkinter on HighDPI displays)"""
+    def __init__(self, label, modules):
+        self.label = label
+        self.cv = modules['cv2']
+        self.Image = modules['PIL']  # pylint: disable=invalid-name
+
+    def show(self, frame, size):
+        """Display frame at size (width, height)"""
+        image = self.Image.fromarray(self.cv.cvtColor(frame, self.cv.COLOR_BGR2RGB))
+        ctk_image = ctk.CTkImage(image, size=size)
+        self.label.configure(image=ctk_image)
+        self.label.image = ctk_image
+
+
+def create_video_display(label, modules):
+    """Create the display backend selected in the settings"""
+    if Settings.get(DISPLAY_BACKEND_KEY, DISPLAY_BACKEND) == DISPLAY_BACKEND_CTKIMAGE:
+        return CTkImageDisplay(label, modules)
+    return PhotoImageDisplay(label, modules)